@@ -2,26 +2,28 @@ import asyncio
 import httpx
 from uuid import uuid4
 
-from a2a.client import Client, ClientConfig, ClientFactory, A2ACardResolver
+from a2a.client import ClientConfig, A2ACardResolver
 from a2a.types import Message, Part, Role, TextPart, TransportProtocol
 
+from agent_client import AgentClient
+
 AGENT_URL = "http://localhost:9999"
 
 async def main():
     async with httpx.AsyncClient() as async_client:
         print("--> 1. Discovering agent and creating client...\n")
 
-        # --- Create the client config and factory ---
+        # --- Create the client config ---
         config = ClientConfig(
             httpx_client=async_client,
             supported_transports=[TransportProtocol.jsonrpc] 
         )
-        factory = ClientFactory(config)
         
         card_resolver = A2ACardResolver(async_client, AGENT_URL)
         agent_card = await card_resolver.get_agent_card()
 
-        client: Client = factory.create(agent_card)
+        # Each call picks streaming or blocking itself, so one client can be shared freely
+        client = AgentClient(config, agent_card)
         
         print(f"--- Client Initialized for: {agent_card.name} ---\n")
 
@@ -35,12 +37,7 @@ async def main():
             kind="message",
         )
         
-        client._config.streaming = False # Force non-streaming for this call
-        
-        final_response = None
-        # The iterator will yield one item and finish for non-streaming calls
-        async for response in client.send_message(request=user_message):
-            final_response = response
+        final_response = await client.send(user_message, timeout=10.0)
         
         print("--- Response (non-streaming) ---")
         if isinstance(final_response, Message):
@@ -52,10 +49,8 @@ async def main():
         # === Part 3: Send a streaming message ===
         print("--> 3. Sending a 'message/stream' request...\n")
         
-        client._config.streaming = True # Re-enable streaming
-        
         print("--- Response (streaming) ---")
-        stream = client.send_message(request=user_message)
+        stream = client.stream(user_message, timeout=10.0)
         
         async for event in stream:
             if isinstance(event, Message):
@@ -65,6 +60,18 @@ async def main():
         
         print("Stream finished.")
         print("--------------------------------\n")
+
+        # === Part 4: Mix both kinds of calls concurrently on the same client ===
+        print("--> 4. Sending 20 concurrent requests, alternating blocking and streaming...\n")
+
+        async def collect(stream) -> list:
+            return [event async for event in stream]
+
+        results = await asyncio.gather(*(
+            client.send(user_message, timeout=10.0) if i % 2 == 0 else collect(client.stream(user_message, timeout=10.0))
+            for i in range(20)
+        ))
+        print(f"All {len(results)} requests answered.")
         
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
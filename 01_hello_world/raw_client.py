@@ -1,20 +1,44 @@
+import argparse
+import asyncio
+import math
+import time
 import requests
+import httpx
 import json
 from uuid import uuid4
 
 AGENT_URL = "http://localhost:9999"
 
+def build_send_payload(text: str) -> dict:
+    """Builds a JSON-RPC 2.0 `message/send` request payload."""
+    return {
+        "jsonrpc": "2.0",
+        "id": str(uuid4()),
+        "method": "message/send",
+        "params": {
+            "message": {
+                "role": "user",
+                "parts": [{"kind": "text", "text": text}],
+                "messageId": str(uuid4()),
+                "kind": "message",
+            }
+        }
+    }
+
 def main():
+    # One session keeps the TCP connection alive across both requests.
+    session = requests.Session()
+
     # === Part 1: Agent Discovery ===
     # A2A agents expose their capabilities via an Agent Card at a well-known URL.
     agent_card_url = f"{AGENT_URL}/.well-known/agent-card.json"
     print(f"--> 1. Fetching Agent Card from: {agent_card_url}\n")
-    
+
     try:
-        response = requests.get(agent_card_url)
+        response = session.get(agent_card_url)
         response.raise_for_status()
         agent_card = response.json()
-        
+
         print("--- Agent Card Received ---")
         print(json.dumps(agent_card, indent=2))
         print("---------------------------\n")
@@ -28,27 +52,15 @@ def main():
         # === Part 2: Agent Interaction (JSON-RPC) ===
         # We construct a JSON-RPC 2.0 request payload.
         # The method is `message/send`, as defined by the A2A spec.
-        request_id = str(uuid4())
-        payload = {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "method": "message/send",
-            "params": {
-                "message": {
-                    "role": "user",
-                    "parts": [{"kind": "text", "text": "Can you say hello?"}],
-                    "messageId": str(uuid4()),
-                    "kind": "message",
-                }
-            }
-        }
+        payload = build_send_payload("Can you say hello?")
+        request_id = payload["id"]
 
         print(f"--> 2. Sending JSON-RPC request to: {rpc_endpoint}\n")
         print("--- Request Payload ---")
         print(json.dumps(payload, indent=2))
         print("-----------------------\n")
-        
-        rpc_response = requests.post(rpc_endpoint, json=payload)
+
+        rpc_response = session.post(rpc_endpoint, json=payload)
         rpc_response.raise_for_status()
         response_data = rpc_response.json()
 
@@ -67,6 +79,101 @@ def main():
 
     except requests.exceptions.RequestException as e:
         print(f"HTTP Request failed: {e}")
+    finally:
+        session.close()
+
+# === Load Driver ===
+# The same raw JSON-RPC calls, sent at a fixed rate to measure server overhead
+# without any SDK in the way.
+
+class LatencyHistogram:
+    """
+    A small HDR-style histogram: values are bucketed to a fixed number of
+    significant digits, so memory stays constant no matter how many are recorded.
+    """
+    def __init__(self, significant_digits: int = 3):
+        self.significant_digits = significant_digits
+        self.counts: dict[float, int] = {}
+        self.total = 0
+        self.max_value = 0.0
+
+    def record(self, value_ms: float) -> None:
+        if value_ms > 0:
+            digits = self.significant_digits - 1 - math.floor(math.log10(value_ms))
+            value_ms = round(value_ms, digits)
+        self.counts[value_ms] = self.counts.get(value_ms, 0) + 1
+        self.total += 1
+        self.max_value = max(self.max_value, value_ms)
+
+    def percentile(self, percentile: float) -> float:
+        target = math.ceil(self.total * percentile / 100)
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if seen >= target:
+                return value
+        return self.max_value
+
+    def print_distribution(self) -> None:
+        print(f"{'Value (ms)':>12} {'Percentile':>12} {'TotalCount':>12}")
+        for percentile in (50, 75, 90, 95, 99, 99.9, 99.99, 100):
+            count = math.ceil(self.total * percentile / 100)
+            print(f"{self.percentile(percentile):>12.3f} {percentile / 100:>12.6f} {count:>12}")
+        print(f"#[Max = {self.max_value:.3f} ms, Total count = {self.total}]")
+
+async def run_load(rpc_endpoint: str, rate: float, duration: float, connections: int) -> None:
+    """
+    Sends `message/send` calls open-loop: call i is scheduled at `i / rate`
+    seconds whether or not earlier calls have returned, and its latency is
+    measured from that scheduled time. A slow server therefore shows up as
+    queueing delay instead of silently lowering the request rate
+    (coordinated omission).
+    """
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    histogram = LatencyHistogram()
+    errors = 0
+    total_requests = int(rate * duration)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as http_client:
+        async def send_one(scheduled_at: float) -> None:
+            nonlocal errors
+            try:
+                response = await http_client.post(rpc_endpoint, json=build_send_payload("Can you say hello?"))
+                # Non-200 responses, such as a proxy's HTML error page, are not parsed
+                if response.status_code != 200 or "error" in response.json():
+                    errors += 1
+            except (httpx.HTTPError, ValueError):
+                # ValueError: a body that is not valid JSON, e.g. a truncated response
+                errors += 1
+            histogram.record((time.perf_counter() - scheduled_at) * 1000)
+
+        print(f"--> Sending {total_requests} requests at {rate:g} req/s over up to {connections} connections...\n")
+        start = time.perf_counter()
+        in_flight = set()
+        for i in range(total_requests):
+            scheduled_at = start + i / rate
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(send_one(scheduled_at))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        await asyncio.gather(*in_flight)
+        elapsed = time.perf_counter() - start
+
+    print("--- Latency Distribution (from scheduled send time) ---")
+    histogram.print_distribution()
+    print(f"\nAchieved {histogram.total / elapsed:.1f} req/s, {errors} errors.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Raw A2A JSON-RPC client and load driver.")
+    parser.add_argument("--load", action="store_true", help="Run the load driver instead of the walkthrough.")
+    parser.add_argument("--rate", type=float, default=100.0, help="Target request rate (req/s).")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to send requests for.")
+    parser.add_argument("--connections", type=int, default=20, help="Size of the keep-alive connection pool.")
+    args = parser.parse_args()
+
+    if args.load:
+        asyncio.run(run_load(f"{AGENT_URL}/", args.rate, args.duration, args.connections))
+    else:
+        main()
@@ -0,0 +1,62 @@
+# Canonical copy: 01_hello_world/agent_client.py; 02_stateful_task_agent/agent_client.py
+# mirrors it. Each example project is standalone, so edit both and keep them identical.
+import asyncio
+import dataclasses
+from collections.abc import AsyncIterator
+
+from a2a.client import ClientCallContext, ClientConfig, ClientEvent, ClientFactory
+from a2a.types import AgentCard, Message, Task
+
+
+class AgentClient:
+    """
+    A client for one agent where every call chooses streaming or blocking, and its own timeout.
+
+    The SDK `Client` reads `streaming` from its config when a message is sent, so
+    flipping `client._config.streaming` before each call races with any other
+    coroutine using the same client. This wrapper creates one `Client` per mode
+    up front, both sharing the connection pool of `config.httpx_client`, and never
+    changes either of them afterwards. A single `AgentClient` can therefore serve
+    streaming and blocking calls from any number of coroutines at once.
+    """
+
+    def __init__(self, config: ClientConfig, agent_card: AgentCard):
+        self.agent_card = agent_card
+        self._blocking = ClientFactory(dataclasses.replace(config, streaming=False)).create(agent_card)
+        self._streaming = ClientFactory(dataclasses.replace(config, streaming=True)).create(agent_card)
+
+    @staticmethod
+    def _call_context(timeout: float | None) -> ClientCallContext | None:
+        # Lets the JSON-RPC transport apply the timeout to the HTTP request too,
+        # instead of the httpx client's default
+        return ClientCallContext(state={"http_kwargs": {"timeout": timeout}}) if timeout is not None else None
+
+    async def send(self, message: Message, timeout: float | None = None) -> Task | Message:
+        """Sends `message` with `message/send` and returns the agent's final Task or Message."""
+        result = None
+        async with asyncio.timeout(timeout):
+            async for event in self._blocking.send_message(message, context=self._call_context(timeout)):
+                result = event[0] if isinstance(event, tuple) else event
+        return result
+
+    async def stream(self, message: Message, timeout: float | None = None) -> AsyncIterator[ClientEvent | Message]:
+        """
+        Sends `message` with `message/stream` and yields its events as they arrive.
+
+        `timeout` bounds the whole stream. Only the waits for the next event are
+        timed, so time spent by the caller between events also counts against it
+        but is never interrupted.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        events = self._streaming.send_message(message, context=self._call_context(timeout))
+        try:
+            while True:
+                async with asyncio.timeout_at(deadline):
+                    try:
+                        event = await anext(events)
+                    except StopAsyncIteration:
+                        return
+                yield event
+        finally:
+            await events.aclose()
@@ -1,42 +1,45 @@
 import asyncio
+import grpc
 import httpx
+import sys
 from uuid import uuid4
-from a2a.client import Client, ClientConfig, ClientFactory, A2ACardResolver
+from a2a.client import ClientConfig, A2ACardResolver
 from a2a.types import Message, Part, Role, TextPart, TransportProtocol, Task
 
+from agent_client import AgentClient
+
 AGENT_URL = "http://localhost:10002"
 
 async def main():
     async with httpx.AsyncClient() as async_client:
-        config = ClientConfig(supported_transports=[TransportProtocol.jsonrpc])
-        factory = ClientFactory(config)
+        # Prefer gRPC when the agent card offers it, otherwise fall back to JSON-RPC
+        config = ClientConfig(
+            httpx_client=async_client,
+            supported_transports=[TransportProtocol.grpc, TransportProtocol.jsonrpc],
+            use_client_preference=True,
+            grpc_channel_factory=grpc.aio.insecure_channel,
+        )
         
         card_resolver = A2ACardResolver(async_client, AGENT_URL)
         agent_card = await card_resolver.get_agent_card()
-        client: Client = factory.create(agent_card)
+        client = AgentClient(config, agent_card)
         
         print(f"--- Client Initialized for: {agent_card.name} ---\n")
         
+        # e.g. `uv run client.py "1000000 x 3d6+2 seed 42"` picks the bulk roll skill
+        bulk_request = sys.argv[1] if len(sys.argv) > 1 else None
         user_message = Message(
             role=Role.user,
-            parts=[Part(root=TextPart(text="Roll the die!"))],
+            parts=[Part(root=TextPart(text=bulk_request or "Roll the die!"))],
             message_id=str(uuid4()),
+            metadata={"skill_id": "bulk_roll" if bulk_request else "dice_roller"},
         )
 
-        client._config.streaming = False
-        
         print("--> Sending 'message/send' request...\n")
         
-        final_task_object = None
-        # The iterator yields events. For a non-streaming task, it yields one event.
-        async for event in client.send_message(request=user_message):
-            # The event for a task is a tuple (Task, UpdateEvent | None)
-            if isinstance(event, tuple):
-                # The Task object is the first element of the tuple.
-                final_task_object = event[0]
-            else:
-                # This would handle cases where the agent returns a simple Message, not a Task.
-                final_task_object = event
+        # A blocking call returns the final Task (or a Message, if the agent replies with one).
+        # Bulk rolls can take a while, so allow them more time than a single roll.
+        final_task_object = await client.send(user_message, timeout=600.0)
 
         print("--- Final Task Object Received ---")
         if final_task_object:
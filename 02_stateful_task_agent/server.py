@@ -1,13 +1,37 @@
+import asyncio
+import grpc
+import re
+import time
 import uvicorn
 import random
+from collections.abc import Iterator
+from dataclasses import dataclass
 
+import numpy as np
+
+from a2a.grpc import a2a_pb2_grpc
 from a2a.server.apps import A2AStarletteApplication
-from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.request_handlers import DefaultRequestHandler, GrpcHandler
 from a2a.server.tasks import InMemoryTaskStore, TaskUpdater
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
-from a2a.types import AgentCard, AgentSkill, AgentCapabilities, Part, TextPart
+from a2a.types import (
+    AgentCard,
+    AgentSkill,
+    AgentCapabilities,
+    AgentInterface,
+    DataPart,
+    Part,
+    TaskNotCancelableError,
+    TaskState,
+    TextPart,
+    TransportProtocol,
+)
 from a2a.utils import new_task
+from a2a.utils.errors import ServerError
+
+PORT = 10002
+GRPC_PORT = 50002
 
 # --- 1. Agent Card ---
 skill = AgentSkill(
@@ -16,28 +40,148 @@ skill = AgentSkill(
     description="Rolls a standard 6-sided die.",
     tags=["dice", "game"],
 )
+bulk_skill = AgentSkill(
+    id="bulk_roll",
+    name="Bulk Roll",
+    description=(
+        "Rolls NdM dice with modifiers up to a billion times and returns a histogram "
+        "and summary statistics. Send the count and dice, optionally with a seed, "
+        "with 'skill_id': 'bulk_roll' in the message metadata."
+    ),
+    tags=["dice", "simulation"],
+    examples=["1000000 x 3d6+2", "1000000000 x 1d20 seed 42"],
+    output_modes=["text", "application/json"],
+)
 agent_card = AgentCard(
     name="Stateful Dice Agent",
     description="An agent that demonstrates the A2A Task lifecycle.",
-    url="http://localhost:10002/",
+    url=f"http://localhost:{PORT}/",
+    preferred_transport=TransportProtocol.jsonrpc,
+    # The same agent is also served over gRPC; clients that support it may pick it instead
+    additional_interfaces=[
+        AgentInterface(url=f"http://localhost:{PORT}/", transport=TransportProtocol.jsonrpc),
+        AgentInterface(url=f"localhost:{GRPC_PORT}", transport=TransportProtocol.grpc),
+    ],
     version="1.0.0",
     default_input_modes=["text"],
     default_output_modes=["text"],
     capabilities=AgentCapabilities(streaming=True),
-    skills=[skill],
+    skills=[skill, bulk_skill],
 )
 
 # --- 2. Agent Logic ---
+MAX_ROLLS = 10**9
+MAX_DICE = 100
+MAX_SIDES = 1000
+# Dice values generated per chunk; bounds memory whatever the number of rolls
+CHUNK_VALUES = 1 << 23
+# Message metadata key that picks the skill; requests without it get a single roll
+SKILL_METADATA_KEY = "skill_id"
+
+BULK_PATTERN = re.compile(
+    r"^\s*(?P<count>\d[\d,_]*)\s*[x*]\s*(?P<dice>\d*)d(?P<sides>\d+)"
+    r"(?P<modifiers>(?:\s*[+-]\s*\d+)*)(?:\s+seed\s*=?\s*(?P<seed>\d+))?\s*$",
+    re.IGNORECASE,
+)
+
+@dataclass
+class BulkRoll:
+    """`count` rolls of `dice`d`sides`, each total shifted by `modifier`."""
+    count: int
+    dice: int
+    sides: int
+    modifier: int = 0
+    seed: int | None = None
+
+    @property
+    def notation(self) -> str:
+        return f"{self.dice}d{self.sides}" + (f"{self.modifier:+d}" if self.modifier else "")
+
+    @classmethod
+    def parse(cls, text: str) -> "BulkRoll":
+        """Parses requests like '1000000 x 3d6+2 seed 42'. Raises ValueError for anything else."""
+        match = BULK_PATTERN.match(text)
+        if not match:
+            raise ValueError(f"Expected a bulk roll like '1000000 x 3d6+2 seed 42', got '{text}'.")
+        modifiers = re.findall(r"[+-]\s*\d+", match["modifiers"])
+        bulk = cls(
+            count=int(re.sub(r"[,_]", "", match["count"])),
+            dice=int(match["dice"] or 1),
+            sides=int(match["sides"]),
+            modifier=sum(int(m.replace(" ", "")) for m in modifiers),
+            seed=int(match["seed"]) if match["seed"] else None,
+        )
+        if not 1 <= bulk.count <= MAX_ROLLS:
+            raise ValueError(f"The number of rolls must be between 1 and {MAX_ROLLS:,}.")
+        if not (1 <= bulk.dice <= MAX_DICE and 2 <= bulk.sides <= MAX_SIDES):
+            raise ValueError(f"Dice must be between 1d2 and {MAX_DICE}d{MAX_SIDES}.")
+        return bulk
+
+class RollHistogram:
+    """Counts of every possible total, accumulated chunk by chunk."""
+    def __init__(self, bulk: BulkRoll):
+        self.bulk = bulk
+        self.counts = np.zeros(bulk.dice * bulk.sides + 1, dtype=np.int64)  # Indexed by unmodified total
+        self.rolled = 0
+
+    def add(self, totals: np.ndarray) -> None:
+        self.counts += np.bincount(totals, minlength=len(self.counts))
+        self.rolled += len(totals)
+
+    def summary(self) -> dict:
+        nonzero = np.flatnonzero(self.counts)
+        low, high = int(nonzero[0]), int(nonzero[-1])
+        counts = self.counts[low:high + 1]
+        values = np.arange(low, high + 1, dtype=np.float64) + self.bulk.modifier
+        mean = float(np.dot(counts, values) / self.rolled)
+        variance = float(np.dot(counts, (values - mean) ** 2) / self.rolled)
+        cumulative = np.cumsum(counts)
+        percentiles = {
+            f"p{p}": int(values[np.searchsorted(cumulative, p / 100 * self.rolled)])
+            for p in (5, 25, 50, 75, 95)
+        }
+        return {
+            "dice": self.bulk.notation,
+            "rolls": self.rolled,
+            "seed": self.bulk.seed,
+            "mean": mean,
+            "std": variance ** 0.5,
+            "min": low + self.bulk.modifier,
+            "max": high + self.bulk.modifier,
+            **percentiles,
+            # counts[i] is the number of rolls that totalled start + i
+            "histogram": {"start": low + self.bulk.modifier, "counts": counts.tolist()},
+        }
+
 class DiceAgent:
     """The agent's business logic."""
     def roll(self) -> int:
         print("Agent Logic: Rolling a 6-sided die...")
         return random.randint(1, 6)
 
+    def roll_bulk(self, bulk: BulkRoll) -> Iterator[RollHistogram]:
+        """Rolls in chunks of at most `CHUNK_VALUES` dice, yielding the histogram after each chunk."""
+        print(f"Agent Logic: Rolling {bulk.notation} {bulk.count:,} times...")
+        rng = np.random.default_rng(bulk.seed)
+        dtype = np.uint8 if bulk.sides < 256 else np.uint16
+        chunk_rolls = max(1, CHUNK_VALUES // bulk.dice)
+        histogram = RollHistogram(bulk)
+        while histogram.rolled < bulk.count:
+            rolls = min(chunk_rolls, bulk.count - histogram.rolled)
+            faces = rng.integers(1, bulk.sides, size=(rolls, bulk.dice), dtype=dtype, endpoint=True)
+            totals = faces[:, 0] if bulk.dice == 1 else faces.sum(axis=1, dtype=np.int32)
+            histogram.add(totals)
+            yield histogram
+
 # --- 3. The A2A Executor ---
 class DiceAgentExecutor(AgentExecutor):
+    # Minimum seconds between two progress updates of a bulk roll
+    PROGRESS_INTERVAL = 1.0
+
     def __init__(self):
         self.agent = DiceAgent()
+        # Set when a running bulk roll is canceled, by task ID
+        self._bulk_rolls: dict[str, asyncio.Event] = {}
 
     async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
         """Handles the request and manages the task lifecycle."""
@@ -56,6 +200,23 @@ class DiceAgentExecutor(AgentExecutor):
         await updater.start_work()
         print(f"Task {task.id}: State -> WORKING")
         
+        # The client names the skill it wants; the message text only holds its arguments
+        skill_id = (context.message.metadata or {}).get(SKILL_METADATA_KEY, skill.id)
+        if skill_id == bulk_skill.id:
+            try:
+                bulk = BulkRoll.parse(context.get_user_input())
+            except ValueError as e:
+                await updater.failed(message=updater.new_agent_message([Part(root=TextPart(text=str(e)))]))
+                print(f"Task {task.id}: State -> FAILED ({e})")
+                return
+            await self._roll_bulk(bulk, updater)
+            return
+        if skill_id != skill.id:
+            error = f"Unknown skill '{skill_id}'; expected one of {[s.id for s in agent_card.skills]}."
+            await updater.failed(message=updater.new_agent_message([Part(root=TextPart(text=error))]))
+            print(f"Task {task.id}: State -> FAILED ({error})")
+            return
+
         # 3. Perform the actual work.
         roll_result = self.agent.roll()
 
@@ -69,17 +230,78 @@ class DiceAgentExecutor(AgentExecutor):
         await updater.complete()
         print(f"Task {task.id}: State -> COMPLETED")
     
+    async def _roll_bulk(self, bulk: BulkRoll, updater: TaskUpdater) -> None:
+        """Runs a bulk roll off the event loop, streaming progress as status updates."""
+        canceled = self._bulk_rolls[updater.task_id] = asyncio.Event()
+        try:
+            await self._roll_chunks(bulk, updater, canceled)
+        finally:
+            del self._bulk_rolls[updater.task_id]
+
+    async def _roll_chunks(self, bulk: BulkRoll, updater: TaskUpdater, canceled: asyncio.Event) -> None:
+        rolls = self.agent.roll_bulk(bulk)
+        histogram = None
+        last_update = time.monotonic()
+        # Each chunk runs in a worker thread so the server keeps serving other tasks
+        while (chunk_histogram := await asyncio.to_thread(next, rolls, None)) is not None:
+            histogram = chunk_histogram
+            if canceled.is_set():
+                # cancel() has already reported the task as canceled
+                rolls.close()
+                print(f"Task {updater.task_id}: Stopped after {histogram.rolled:,} of {bulk.count:,} rolls")
+                return
+            if histogram.rolled < bulk.count and time.monotonic() - last_update >= self.PROGRESS_INTERVAL:
+                last_update = time.monotonic()
+                await updater.update_status(
+                    TaskState.working,
+                    message=updater.new_agent_message([Part(root=TextPart(
+                        text=f"Rolled {histogram.rolled:,} of {bulk.count:,} ({histogram.rolled / bulk.count:.0%})"
+                    ))]),
+                    metadata={"rolled": histogram.rolled, "total": bulk.count},
+                )
+
+        summary = histogram.summary()
+        text = (
+            f"Rolled {bulk.notation} {bulk.count:,} times: mean {summary['mean']:.3f}, "
+            f"std {summary['std']:.3f}, range {summary['min']}-{summary['max']}."
+        )
+        await updater.add_artifact(
+            [Part(root=TextPart(text=text)), Part(root=DataPart(data=summary))],
+            name='bulk_roll_result',
+        )
+        await updater.complete()
+        print(f"Task {updater.task_id}: State -> COMPLETED")
+
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
-        raise NotImplementedError()
+        """Stops a running bulk roll after its current chunk. Single rolls finish too fast to cancel."""
+        canceled = self._bulk_rolls.get(context.task_id)
+        if canceled is None:
+            raise ServerError(error=TaskNotCancelableError(message="Only a running bulk roll can be canceled."))
+        canceled.set()
+        await TaskUpdater(event_queue, context.task_id, context.context_id).cancel()
+        print(f"Task {context.task_id}: State -> CANCELED")
 
 # --- 4. Main Server Setup ---
+async def serve(request_handler: DefaultRequestHandler) -> None:
+    """Serves the agent over JSON-RPC (HTTP) and gRPC at the same time."""
+    grpc_server = grpc.aio.server()
+    a2a_pb2_grpc.add_A2AServiceServicer_to_server(GrpcHandler(agent_card, request_handler), grpc_server)
+    grpc_server.add_insecure_port(f"[::]:{GRPC_PORT}")
+    await grpc_server.start()
+
+    server_app_builder = A2AStarletteApplication(
+        agent_card=agent_card, http_handler=request_handler
+    )
+    config = uvicorn.Config(server_app_builder.build(), host='0.0.0.0', port=PORT)
+    try:
+        await uvicorn.Server(config).serve()
+    finally:
+        await grpc_server.stop(grace=5)
+
 if __name__ == '__main__':
     request_handler = DefaultRequestHandler(
         agent_executor=DiceAgentExecutor(),
         task_store=InMemoryTaskStore(),
     )
-    server_app_builder = A2AStarletteApplication(
-        agent_card=agent_card, http_handler=request_handler
-    )
-    print("Starting Stateful Dice Agent Server on http://localhost:10002")
-    uvicorn.run(server_app_builder.build(), host='0.0.0.0', port=10002)
+    print(f"Starting Stateful Dice Agent Server on http://localhost:{PORT} (gRPC on localhost:{GRPC_PORT})")
+    asyncio.run(serve(request_handler))
@@ -0,0 +1,175 @@
+# Canonical copy: 01_hello_world/tests/test_agent_client.py; 02_stateful_task_agent/tests/
+# test_agent_client.py mirrors it. Edit both together.
+import asyncio
+import random
+from uuid import uuid4
+
+import pytest
+from a2a.client import ClientCallContext, ClientConfig, ClientFactory
+from a2a.client.transports.base import ClientTransport
+from a2a.types import (
+    AgentCapabilities,
+    AgentCard,
+    Message,
+    MessageSendParams,
+    Part,
+    Role,
+    Task,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+
+import agent_client
+from agent_client import AgentClient
+
+FAKE_TRANSPORT = "FAKE"
+
+
+class FakeTransport(ClientTransport):
+    """
+    Answers in process after a short random delay, recording how it was called.
+
+    Each task carries the method that produced it and the timeout its call
+    context asked for, so the test can tell whether a call used the right mode.
+    """
+
+    def __init__(self, delay: float = 0.002):
+        self.delay = delay
+
+    @staticmethod
+    def _task(request: MessageSendParams, state: TaskState, mode: str, context: ClientCallContext | None) -> Task:
+        timeout = context.state["http_kwargs"]["timeout"] if context else None
+        return Task(
+            id=request.message.message_id,
+            context_id="ctx",
+            status=TaskStatus(state=state),
+            metadata={"mode": mode, "timeout": timeout},
+        )
+
+    async def send_message(self, request, *, context=None):
+        await asyncio.sleep(random.uniform(self.delay / 2, self.delay))
+        return self._task(request, TaskState.completed, "blocking", context)
+
+    async def send_message_streaming(self, request, *, context=None):
+        task = self._task(request, TaskState.submitted, "streaming", context)
+        yield task
+        for state in (TaskState.working, TaskState.completed):
+            await asyncio.sleep(random.uniform(self.delay / 2, self.delay))
+            yield TaskStatusUpdateEvent(
+                task_id=task.id,
+                context_id=task.context_id,
+                status=TaskStatus(state=state),
+                final=state == TaskState.completed,
+            )
+
+    async def get_task(self, request, *, context=None):
+        raise NotImplementedError()
+
+    async def cancel_task(self, request, *, context=None):
+        raise NotImplementedError()
+
+    async def set_task_callback(self, request, *, context=None):
+        raise NotImplementedError()
+
+    async def get_task_callback(self, request, *, context=None):
+        raise NotImplementedError()
+
+    async def resubscribe(self, request, *, context=None):
+        raise NotImplementedError()
+        yield
+
+    async def get_card(self, *, context=None):
+        raise NotImplementedError()
+
+    async def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def transport(monkeypatch) -> FakeTransport:
+    transport = FakeTransport()
+
+    class FakeClientFactory(ClientFactory):
+        def __init__(self, config: ClientConfig):
+            super().__init__(config)
+            self.register(FAKE_TRANSPORT, lambda card, url, config, interceptors: transport)
+
+    monkeypatch.setattr(agent_client, "ClientFactory", FakeClientFactory)
+    return transport
+
+
+def make_client() -> AgentClient:
+    card = AgentCard(
+        name="Fake Agent",
+        description="Answers without a network.",
+        url="fake://agent",
+        version="1.0.0",
+        preferred_transport=FAKE_TRANSPORT,
+        capabilities=AgentCapabilities(streaming=True),
+        default_input_modes=["text"],
+        default_output_modes=["text"],
+        skills=[],
+    )
+    return AgentClient(ClientConfig(supported_transports=[FAKE_TRANSPORT]), card)
+
+
+def make_message() -> Message:
+    return Message(role=Role.user, parts=[Part(root=TextPart(text="Hello"))], message_id=uuid4().hex)
+
+
+def test_mixed_concurrent_calls_keep_their_mode(transport):
+    async def blocking_call(client: AgentClient, message: Message):
+        task = await client.send(message, timeout=5.0)
+        assert task.id == message.message_id
+        assert task.metadata == {"mode": "blocking", "timeout": 5.0}
+        assert task.status.state == TaskState.completed
+        return "blocking"
+
+    async def streaming_call(client: AgentClient, message: Message):
+        states = []
+        async for task, update in client.stream(message, timeout=5.0):
+            assert task.id == message.message_id
+            assert task.metadata == {"mode": "streaming", "timeout": 5.0}
+            states.append(task.status.state)
+        assert states == [TaskState.submitted, TaskState.working, TaskState.completed]
+        return "streaming"
+
+    async def main():
+        client = make_client()
+        calls = [random.choice([blocking_call, streaming_call]) for _ in range(1_000)]
+        results = await asyncio.gather(*(call(client, make_message()) for call in calls))
+        assert results == [call.__name__.removesuffix("_call") for call in calls]
+
+    asyncio.run(main())
+
+
+def test_calls_without_a_timeout_keep_the_client_default(transport):
+    async def main():
+        task = await make_client().send(make_message())
+        assert task.metadata == {"mode": "blocking", "timeout": None}
+
+    asyncio.run(main())
+
+
+def test_timeouts_apply_per_call(transport):
+    transport.delay = 0.5
+
+    async def main():
+        client = make_client()
+        with pytest.raises(TimeoutError):
+            await client.send(make_message(), timeout=0.01)
+        with pytest.raises(TimeoutError):
+            async for _ in client.stream(make_message(), timeout=0.01):
+                pass
+        # A slow call does not hold up a concurrent call with a longer timeout
+        slow, fast = await asyncio.gather(
+            client.send(make_message(), timeout=0.01),
+            client.send(make_message(), timeout=5.0),
+            return_exceptions=True,
+        )
+        assert isinstance(slow, TimeoutError)
+        assert fast.status.state == TaskState.completed
+
+    asyncio.run(main())
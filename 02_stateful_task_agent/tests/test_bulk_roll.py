@@ -0,0 +1,115 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import (
+    Message,
+    MessageSendConfiguration,
+    MessageSendParams,
+    Part,
+    Role,
+    Task,
+    TaskIdParams,
+    TaskNotCancelableError,
+    TaskState,
+    TextPart,
+)
+from a2a.utils.errors import ServerError
+
+import server
+from server import BulkRoll, DiceAgentExecutor
+
+
+def send_params(text: str, skill_id: str | None = None, blocking: bool = True) -> MessageSendParams:
+    return MessageSendParams(
+        message=Message(
+            role=Role.user,
+            parts=[Part(root=TextPart(text=text))],
+            message_id=str(uuid4()),
+            metadata={"skill_id": skill_id} if skill_id else None,
+        ),
+        configuration=MessageSendConfiguration(blocking=blocking),
+    )
+
+
+def status_text(task: Task) -> str:
+    return task.status.message.parts[0].root.text
+
+
+def test_parse_rejects_text_that_is_not_a_bulk_roll():
+    assert BulkRoll.parse("1,000 x 3d6+2 seed 7") == BulkRoll(count=1000, dice=3, sides=6, modifier=2, seed=7)
+    with pytest.raises(ValueError, match="Expected a bulk roll"):
+        BulkRoll.parse("Roll the die!")
+
+
+def test_skill_is_chosen_by_skill_id_not_by_text():
+    async def scenario():
+        handler = DefaultRequestHandler(agent_executor=DiceAgentExecutor(), task_store=InMemoryTaskStore())
+        # Looks like a bulk roll, but names no skill: a single roll
+        single = await handler.on_message_send(send_params("1000 x 3d6"))
+        bulk = await handler.on_message_send(send_params("1000 x 3d6 seed 1", "bulk_roll"))
+        not_bulk = await handler.on_message_send(send_params("Roll the die!", "bulk_roll"))
+        unknown = await handler.on_message_send(send_params("Roll the die!", "coin_flip"))
+        return single, bulk, not_bulk, unknown
+
+    single, bulk, not_bulk, unknown = asyncio.run(scenario())
+
+    assert single.status.state == TaskState.completed
+    assert single.artifacts[0].name == "dice_roll_result"
+    assert bulk.status.state == TaskState.completed
+    assert bulk.artifacts[0].name == "bulk_roll_result"
+    assert bulk.artifacts[0].parts[1].root.data["rolls"] == 1000
+    assert not_bulk.status.state == TaskState.failed
+    assert "Expected a bulk roll" in status_text(not_bulk)
+    assert unknown.status.state == TaskState.failed
+    assert "Unknown skill 'coin_flip'" in status_text(unknown)
+
+
+def test_bulk_roll_stops_between_chunks_when_canceled(monkeypatch):
+    # Many small chunks, so the roll is still running when the cancel arrives
+    monkeypatch.setattr(server, "CHUNK_VALUES", 1000)
+    executor = DiceAgentExecutor()
+    rolled = []
+    roll_bulk = executor.agent.roll_bulk
+
+    def recording_roll_bulk(bulk):
+        for histogram in roll_bulk(bulk):
+            rolled.append(histogram.rolled)
+            yield histogram
+
+    monkeypatch.setattr(executor.agent, "roll_bulk", recording_roll_bulk)
+
+    async def scenario():
+        handler = DefaultRequestHandler(agent_executor=executor, task_store=InMemoryTaskStore())
+        task = await handler.on_message_send(send_params(f"{server.MAX_ROLLS} x 1d6", "bulk_roll", blocking=False))
+        # Cancel once the roll is under way, as a client watching its progress would
+        while (await handler.task_store.get(task.id)).status.state != TaskState.working:
+            await asyncio.sleep(0.01)
+        canceled = await handler.on_cancel_task(TaskIdParams(id=task.id))
+        chunks_at_cancel = len(rolled)
+        await asyncio.sleep(0.2)
+        stored = await handler.task_store.get(task.id)
+        return canceled, stored, chunks_at_cancel
+
+    canceled, stored, chunks_at_cancel = asyncio.run(scenario())
+
+    assert canceled.status.state == stored.status.state == TaskState.canceled
+    assert not canceled.artifacts
+    # At most the chunk in progress finishes after the cancel
+    assert len(rolled) <= chunks_at_cancel + 1
+    assert rolled[-1] < server.MAX_ROLLS
+    assert not executor._bulk_rolls
+
+
+def test_only_running_bulk_rolls_can_be_canceled():
+    async def scenario():
+        handler = DefaultRequestHandler(agent_executor=DiceAgentExecutor(), task_store=InMemoryTaskStore())
+        # The task store only holds finished tasks here, so there is nothing to stop
+        task = await handler.on_message_send(send_params("Roll the die!"))
+        await handler.on_cancel_task(TaskIdParams(id=task.id))
+
+    with pytest.raises(ServerError) as e:
+        asyncio.run(scenario())
+    assert isinstance(e.value.error, TaskNotCancelableError)
@@ -1,6 +1,14 @@
 import uvicorn
 import os
+import asyncio
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dotenv import load_dotenv
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
 
 # OpenAI Agents SDK imports
 from agents import Agent, Runner, RunResultStreaming, function_tool, ToolCallItem, set_tracing_disabled
@@ -12,9 +20,21 @@ from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.tasks import InMemoryTaskStore, TaskUpdater
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
-from a2a.types import AgentCard, AgentSkill, AgentCapabilities, TaskState, Part, TextPart
+from a2a.types import (
+    AgentCard,
+    AgentSkill,
+    AgentCapabilities,
+    Artifact,
+    TaskArtifactUpdateEvent,
+    TaskStatusUpdateEvent,
+    TaskState,
+    Part,
+    TextPart,
+)
 from a2a.utils import new_task
 
+from tool_limits import limit_tool, track_tool_calls
+
 # Load .env file
 load_dotenv()
 
@@ -23,18 +43,77 @@ set_tracing_disabled(True)
 
 # --- 1. The Real Agent Logic ---
 
+class WeatherBackend(ABC):
+    """Where forecasts come from. Subclass it to call a real weather API."""
+    @abstractmethod
+    async def fetch(self, city: str) -> str:
+        """Returns the forecast for one city."""
+
+class FakeWeatherBackend(WeatherBackend):
+    """A local, deterministic backend for running the example without a weather API."""
+    CONDITIONS = ["sunny", "cloudy", "rainy", "windy", "snowy"]
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency  # Simulated network delay per city
+
+    async def fetch(self, city: str) -> str:
+        await asyncio.sleep(self.latency)
+        seed = zlib.crc32(city.lower().encode("utf-8"))
+        return f"The weather in {city} is {self.CONDITIONS[seed % len(self.CONDITIONS)]} and {40 + seed % 50}°F."
+
+class WeatherService:
+    """
+    Looks up many cities at once against a backend.
+
+    Each city's forecast is cached for `ttl` seconds in a bounded LRU cache of
+    at most `max_entries` cities.
+    """
+    def __init__(self, backend: WeatherBackend, ttl: float = 600.0, max_concurrency: int = 10, max_entries: int = 1024):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    async def _lookup(self, city: str) -> str:
+        key = city.strip().lower()
+        entry = self.cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.cache.move_to_end(key)
+            return entry[1]
+        self.cache.pop(key, None)
+        async with self.semaphore:
+            forecast = await self.backend.fetch(city.strip())
+        self.cache[key] = (time.monotonic() + self.ttl, forecast)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+        return forecast
+
+    async def lookup(self, cities: list[str]) -> dict[str, str]:
+        unique = list(dict.fromkeys(city.strip() for city in cities if city.strip()))
+        forecasts = await asyncio.gather(*(self._lookup(city) for city in unique))
+        return dict(zip(unique, forecasts))
+
+weather_service = WeatherService(FakeWeatherBackend())
+
+# The SDK reports a raised `ToolTimeout` to the model as a failed call
 @function_tool
-def get_weather(city: str) -> str:
-    """Returns weather info for the specified city."""
-    # In a real scenario, this would call a weather API.
-    return f"The weather in {city} is sunny and 75°F."
+@limit_tool(max_concurrency=5, timeout=10.0)
+async def get_weather(cities: list[str]) -> str:
+    """Returns weather info for each of the specified cities. Pass every city in one call."""
+    forecasts = await weather_service.lookup(cities)
+    return "\n".join(forecasts.values())
 
 class WeatherAgent:
     """A wrapper for the OpenAI Agent."""
     def __init__(self):
         self.agent = Agent(
             name="Weather agent",
-            instructions="You are a weather agent. Always use the provided tool to get weather information.",
+            instructions=(
+                "You are a weather agent. Always use the provided tool to get weather information. "
+                "When asked about several cities, call the tool once with all of them."
+            ),
             model=LitellmModel(model="gemini/gemini-2.0-flash", api_key=os.getenv("GOOGLE_API_KEY")),
             tools=[get_weather],
         )
@@ -58,8 +137,10 @@ class WeatherAgentExecutor(AgentExecutor):
         await updater.submit()
         print(f"\n--- A2A Task {task.id} Started ---")
 
-        # Get the run result streaming object from our agent
-        result = self.agent.run(user_input)
+        # Get the run result streaming object from our agent. The run starts in
+        # the background, so the tool call records must be set up before it.
+        with track_tool_calls() as tool_calls:
+            result = self.agent.run(user_input)
 
         # Stream events from the agent and map them to A2A events
         async for event in result.stream_events():
@@ -68,6 +149,7 @@ class WeatherAgentExecutor(AgentExecutor):
                 continue
 
             a2a_update_message = ""
+            metadata = None
             if event.type == "agent_updated_stream_event":
                 a2a_update_message = f"Agent updated: {event.new_agent.name}"
             elif event.type == "run_item_stream_event":
@@ -75,12 +157,14 @@ class WeatherAgentExecutor(AgentExecutor):
                     a2a_update_message = f"Calling tool: {event.item.raw_item.name}"
                 elif event.item.type == "tool_call_output_item":
                     a2a_update_message = f"Tool output: {event.item.output}"
+                    # Surface the latency of the tool calls finished so far
+                    metadata = {"tool_calls": list(tool_calls)}
 
             if a2a_update_message:
                 print(f"Streaming update: {a2a_update_message}")
                 await updater.update_status(TaskState.working, message=updater.new_agent_message(
                     parts=[Part(root=TextPart(text=a2a_update_message))]
-                ))
+                ), metadata=metadata)
 
         # Once the stream is done, get the final output
         final_output_message = result.final_output
@@ -96,13 +180,118 @@ class WeatherAgentExecutor(AgentExecutor):
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
         raise NotImplementedError()
 
-# --- 3. A2A Server Setup ---
+# --- 3. Result Memoization ---
+
+class ResultCache:
+    """A bounded, TTL-limited cache of final task artifacts that keeps hit/miss counts."""
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[tuple[str, str], tuple[float, list[Artifact]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[str, str]) -> list[Artifact] | None:
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self.entries.pop(key, None)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: tuple[str, str], artifacts: list[Artifact], ttl: float) -> None:
+        self.entries[key] = (time.monotonic() + ttl, artifacts)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+class RecordingEventQueue:
+    """Forwards events to the real queue and keeps the artifacts and final state of the task."""
+    def __init__(self, event_queue: EventQueue):
+        self.event_queue = event_queue
+        self.artifacts: dict[str, Artifact] = {}
+        self.completed = False
+
+    async def enqueue_event(self, event) -> None:
+        if isinstance(event, TaskArtifactUpdateEvent):
+            artifact = event.artifact
+            if event.append and artifact.artifact_id in self.artifacts:
+                self.artifacts[artifact.artifact_id].parts.extend(artifact.parts)
+            else:
+                self.artifacts[artifact.artifact_id] = artifact.model_copy(deep=True)
+        elif isinstance(event, TaskStatusUpdateEvent):
+            self.completed = event.status.state == TaskState.completed
+        await self.event_queue.enqueue_event(event)
+
+    def __getattr__(self, name):
+        return getattr(self.event_queue, name)
+
+class MemoizingAgentExecutor(AgentExecutor):
+    """
+    Replays the final artifacts of an earlier identical request instead of running the agent.
+
+    Memoization is opt-in per skill: `memoized_skills` maps the ID of each
+    deterministic skill to how long its results stay valid, in seconds. A
+    request is matched to a skill by the `skill_id` in its message metadata,
+    or to the agent's only skill.
+    """
+    def __init__(self, executor: AgentExecutor, skills: list[AgentSkill], memoized_skills: dict[str, float], cache: ResultCache | None = None):
+        self.executor = executor
+        self.skill_ids = [skill.id for skill in skills]
+        self.memoized_skills = memoized_skills
+        self.cache = cache or ResultCache()
+
+    def _skill_id(self, context: RequestContext) -> str | None:
+        metadata = context.message.metadata or {}
+        if metadata.get("skill_id") in self.skill_ids:
+            return metadata["skill_id"]
+        return self.skill_ids[0] if len(self.skill_ids) == 1 else None
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        skill_id = self._skill_id(context)
+        # Only new tasks are memoized; a follow-up message depends on the task so far
+        if context.current_task or skill_id not in self.memoized_skills:
+            await self.executor.execute(context, event_queue)
+            return
+
+        key = (skill_id, " ".join(context.get_user_input().lower().split()))
+        artifacts = self.cache.get(key)
+        if artifacts is not None:
+            task = new_task(context.message)
+            updater = TaskUpdater(event_queue, task.id, task.context_id)
+            await event_queue.enqueue_event(task)
+            for artifact in artifacts:
+                await updater.add_artifact(parts=artifact.parts, name=artifact.name)
+            await updater.update_status(TaskState.completed, final=True, metadata={"memoized": True})
+            print(f"--- A2A Task {task.id} Replayed from cache ({skill_id}) ---")
+            return
+
+        recorder = RecordingEventQueue(event_queue)
+        await self.executor.execute(context, recorder)
+        if recorder.completed and recorder.artifacts:
+            self.cache.put(key, list(recorder.artifacts.values()), self.memoized_skills[skill_id])
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        await self.executor.cancel(context, event_queue)
+
+# --- 4. A2A Server Setup ---
 
 if __name__ == "__main__":
     skill = AgentSkill(
         id="get_weather",
         name="Get Weather",
-        description="Returns weather for a city.",
+        description="Returns weather for one or more cities.",
+        examples=["What is the weather in Paris, Tokyo and Lima?"],
         tags=["weather"],
     )
 
@@ -117,12 +306,20 @@ if __name__ == "__main__":
         skills=[skill],
     )
 
+    # The weather for a city is a pure function of the city, so it is safe to
+    # replay for a few minutes instead of running the LLM again
+    executor = MemoizingAgentExecutor(WeatherAgentExecutor(), skills=[skill], memoized_skills={"get_weather": 300.0})
+
+    async def cache_metrics(request: Request) -> JSONResponse:
+        return JSONResponse(executor.cache.metrics())
+
     request_handler = DefaultRequestHandler(
-        agent_executor=WeatherAgentExecutor(),
+        agent_executor=executor,
         task_store=InMemoryTaskStore(),
     )
     server_app_builder = A2AStarletteApplication(
         agent_card=agent_card, http_handler=request_handler
     )
+    app = server_app_builder.build(routes=[Route("/cache/metrics", cache_metrics, methods=["GET"])])
     print("Starting Streaming Weather Agent Server on http://localhost:10003")
-    uvicorn.run(server_app_builder.build(), host='0.0.0.0', port=10003)
+    uvicorn.run(app, host='0.0.0.0', port=10003)
@@ -1,4 +1,6 @@
 import os
+import asyncio
+from collections import defaultdict
 from typing import Any
 
 from langchain_core.tools import tool
@@ -9,17 +11,21 @@ from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.types import interrupt, Command
 from dotenv import load_dotenv
 
+from parking import ApprovalParking
+
 load_dotenv()
 
 os.environ["GOOGLE_API_KEY"] = os.getenv("GOOGLE_API_KEY")
 
 # --- 1. Define Tool with Human-in-the-loop ---
 
-@tool
+# The tool returns (content, artifact): the content goes to the model, while the
+# artifact is a structured result the executor uses to detect completion.
+@tool(response_format="content_and_artifact")
 def send_diet_plan(
     email: str,
     diet_plan: str,
-) -> str:
+) -> tuple[str, dict]:
     """
     Sends the diet plan to the user's email.
 
@@ -38,9 +44,18 @@ def send_diet_plan(
 
     # Step 2: Handle the user's approval response
     if approval_response and str(approval_response).lower() in ['yes', 'true', 'approve']:
-        return f"Diet plan successfully sent to {email}."
+        return f"Diet plan successfully sent to {email}.", {"diet_plan_sent": True}
     else:
-        return "User cancelled the action. The diet plan was not sent."
+        return "User cancelled the action. The diet plan was not sent.", {"diet_plan_sent": False}
+
+
+def diet_plan_sent(chunk: dict) -> bool:
+    """Checks a streamed chunk for a successful `send_diet_plan` tool result."""
+    for message in chunk.get("tools", {}).get("messages", []):
+        artifact = getattr(message, "artifact", None)
+        if isinstance(artifact, dict) and artifact.get("diet_plan_sent"):
+            return True
+    return False
 
 
 # --- 2. Create the Agent Class ---
@@ -52,10 +67,11 @@ class DietPlannerAgent:
         """Initializes the Diet Planner agent."""
 
         # 3. Create the agent
+        self.checkpointer = InMemorySaver()
         self.agent = create_react_agent(
             model="google_genai:gemini-2.5-flash",
             tools=[send_diet_plan],
-            checkpointer=InMemorySaver(),
+            checkpointer=self.checkpointer,
             prompt=(
                 "You are a friendly and helpful diet planner assistant."
                 "Your goal is to collect all necessary information from the user "
@@ -102,4 +118,52 @@ class DietPlannerAgent:
         config = {"configurable": {"thread_id": thread_id}}
 
         async for chunk in self.agent.astream(resume_command, config=config):
-            yield chunk
\ No newline at end of file
+            yield chunk
+
+    async def park(self, thread_id: str, parking: ApprovalParking) -> None:
+        """
+        Moves a thread paused on an approval out of memory and onto disk.
+
+        Only the latest checkpoint and its pending writes (which hold the
+        interrupt) are kept; that is all the graph needs to resume.
+        """
+        config = {"configurable": {"thread_id": thread_id}}
+        checkpoint_tuple = self.checkpointer.get_tuple(config)
+        if checkpoint_tuple is None:
+            return
+
+        state = {
+            "parent_config": checkpoint_tuple.parent_config,
+            "checkpoint": checkpoint_tuple.checkpoint,
+            "metadata": checkpoint_tuple.metadata,
+            "pending_writes": checkpoint_tuple.pending_writes or [],
+        }
+        await asyncio.to_thread(parking.park, "threads", thread_id, state)
+        self.checkpointer.delete_thread(thread_id)
+
+    async def rehydrate(self, thread_id: str, parking: ApprovalParking) -> bool:
+        """
+        Loads a parked thread back into the checkpointer.
+
+        The parked copy is left on disk, so a resume that fails can be retried
+        from it; the caller discards it once the resumed turn has run.
+
+        Returns:
+            bool: False if the thread was not parked or its approval expired.
+        """
+        state = await asyncio.to_thread(parking.peek, "threads", thread_id)
+        if state is None:
+            return False
+
+        config = state["parent_config"] or {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+        checkpoint = state["checkpoint"]
+        saved_config = self.checkpointer.put(
+            config, checkpoint, state["metadata"], checkpoint["channel_versions"]
+        )
+
+        writes_by_task = defaultdict(list)
+        for task_id, channel, value in state["pending_writes"]:
+            writes_by_task[task_id].append((channel, value))
+        for task_id, writes in writes_by_task.items():
+            self.checkpointer.put_writes(saved_config, writes, task_id)
+        return True
@@ -15,6 +15,8 @@ from a2a.types import (
     DataPart,
 )
 
+from compression import ACCEPT_ENCODING
+
 AGENT_URL = "http://localhost:10004"
 
 def create_user_message(user_input: str, thread_info: dict) -> Message:
@@ -73,8 +75,9 @@ def handle_agent_response(task: Task | None) -> str:
                 return input("\033[92m\nYou: \033[0m")
 
 async def main():
-    async with httpx.AsyncClient(timeout=60.0) as async_client:
-        config = ClientConfig(supported_transports=[TransportProtocol.jsonrpc])
+    # Advertise compression; the server then compresses its long status streams
+    async with httpx.AsyncClient(timeout=60.0, headers={"Accept-Encoding": ACCEPT_ENCODING}) as async_client:
+        config = ClientConfig(httpx_client=async_client, supported_transports=[TransportProtocol.jsonrpc])
         factory = ClientFactory(config)
         
         card_resolver = A2ACardResolver(async_client, AGENT_URL)
@@ -0,0 +1,189 @@
+# Canonical copy: 04_interactive_agent/compression.py; 05_image_generation/compression.py mirrors it.
+# Each example project is standalone, so edit both and keep them identical. Tests live in 04.
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+# Content types whose bytes are already compressed
+INCOMPRESSIBLE_PREFIXES = ("image/", "video/", "audio/", "application/zip", "application/gzip", "application/zstd")
+
+# The Accept-Encoding header the demo clients send
+ACCEPT_ENCODING = "zstd, gzip" if zstandard else "gzip"
+
+
+class _Compressor:
+    """A streaming compressor for one response body."""
+
+    def __init__(self, encoding: str, level: int):
+        if encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+            self._flush_mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+            self._flush_mode = zlib.Z_SYNC_FLUSH
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        """Compresses a chunk; with `flush`, everything so far can be decoded by the client."""
+        out = self._obj.compress(data)
+        return out + self._obj.flush(self._flush_mode) if flush else out
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+def _quality(params: list[str]) -> float:
+    """The q-value of an Accept-Encoding entry; a malformed one refuses the encoding."""
+    for param in params:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value.strip())
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def _parse_accept_encoding(accept_encoding: str) -> dict[str, float]:
+    """Maps each coding in an Accept-Encoding header to its q-value; the first entry for a coding wins."""
+    qualities: dict[str, float] = {}
+    for token in accept_encoding.split(","):
+        coding, *params = token.split(";")
+        coding = coding.strip().lower()
+        if coding:
+            qualities.setdefault(coding, _quality(params))
+    return qualities
+
+
+def _choose_encoding(accept_encoding: str) -> tuple[str | None, bool]:
+    """
+    Picks the content coding for a response from the client's Accept-Encoding.
+
+    The supported coding with the highest q-value wins, and ties go to zstd.
+    `*` sets the q-value of codings not listed. No compression is chosen if
+    nothing supported has a q-value above 0, or if the client lists identity
+    with a higher q-value than the best coding.
+
+    Returns:
+        tuple[str | None, bool]: The coding, or None to send the body as is; and
+            whether the client accepts an uncompressed body at all, which
+            "identity;q=0", or "*;q=0" without an identity entry, rule out.
+    """
+    qualities = _parse_accept_encoding(accept_encoding)
+    wildcard = qualities.get("*")
+
+    def quality(coding: str) -> float:
+        return qualities.get(coding, wildcard if wildcard is not None else 0.0)
+
+    supported = ["zstd", "gzip"] if zstandard else ["gzip"]
+    best = max(supported, key=quality)  # max() keeps the first of equal values, so zstd wins ties
+    encoding = best if quality(best) > 0 else None
+    if encoding and "identity" in qualities and qualities["identity"] > quality(encoding):
+        encoding = None
+    identity_acceptable = qualities.get("identity", 0.0 if wildcard == 0 else 1.0) > 0
+    return encoding, identity_acceptable
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with the best encoding the client accepts (zstd, then gzip).
+
+    - Regular responses are compressed only if they are larger than `minimum_size`
+      and a sample of the body actually shrinks, so payloads that are mostly
+      already-compressed bytes are sent as they are.
+    - Server-sent event streams are compressed with one streaming compressor
+      per response, flushed after every event, so repeated status updates
+      compress against each other without delaying any of them.
+    - Content that is already compressed (images, archives) is not touched,
+      unless the client refuses uncompressed bodies with "identity;q=0".
+    - A client that accepts no supported coding gets the body uncompressed.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, zstd_level: int = 3):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "zstd": zstd_level}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding, identity_acceptable = _choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponse(self, encoding, send, always=not identity_acceptable).run(scope, receive)
+
+
+class _CompressedResponse:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send, always: bool = False):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.always = always  # Compress even small or incompressible bodies
+        self.start: Message | None = None
+        self.compressor: _Compressor | None = None
+        self.streaming = False
+        self.passthrough = False
+
+    async def run(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.on_send)
+
+    async def on_send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = "content-encoding" in headers or (
+                not self.always and content_type.startswith(INCOMPRESSIBLE_PREFIXES)
+            )
+            self.streaming = content_type.startswith("text/event-stream")
+            self.start = message  # Held back until the first body chunk decides the encoding
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send_start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None and not self.streaming and not self.always:
+            if (not more_body and len(body) < self.middleware.minimum_size) or not self._is_compressible(body):
+                self.passthrough = True
+                await self._send_start()
+                await self.send(message)
+                return
+
+        if self.compressor is None:
+            self.compressor = _Compressor(self.encoding, self.middleware.levels[self.encoding])
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            del headers["Content-Length"]
+            self.start["headers"] = headers.raw
+            await self._send_start()
+
+        if more_body:
+            # Flush each SSE event at once; other bodies only when they end
+            chunk = self.compressor.compress(body, flush=self.streaming)
+        else:
+            chunk = self.compressor.compress(body) + self.compressor.finish()
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def _is_compressible(self, body: bytes) -> bool:
+        sample = body[:65536]
+        if not sample:
+            return True
+        return len(zlib.compress(sample, 1)) < 0.9 * len(sample)
+
+    async def _send_start(self) -> None:
+        if self.start is not None:
+            await self.send(self.start)
+            self.start = None
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import time
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from typing import Any
+
+
+class InterruptKind(str, Enum):
+    """Why a conversation is waiting for the user."""
+    approval = "approval"  # A tool call is paused until the user approves it
+    question = "question"  # The agent asked a clarifying question
+
+
+@dataclass
+class PendingInterrupt:
+    """A conversation paused for user input, with what the user was asked."""
+    context_id: str
+    task_id: str
+    kind: InterruptKind
+    payload: dict[str, Any] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "kind": self.kind.value}
+
+
+class PendingInterruptRegistry:
+    """
+    Pending interrupts indexed by context_id.
+
+    The executor uses it to decide between resuming and continuing a
+    conversation without inspecting the stored task, and operators use it
+    to list and expire paused conversations. The index is held in memory
+    only; after a restart the executor rebuilds approvals from parked state.
+    Entries older than `ttl` are treated as gone.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.pending: dict[str, PendingInterrupt] = {}
+
+    def _is_live(self, interrupt: PendingInterrupt | None) -> bool:
+        return interrupt is not None and time.time() - interrupt.created_at <= self.ttl
+
+    def add(self, interrupt: PendingInterrupt) -> None:
+        self.pending[interrupt.context_id] = interrupt
+
+    def get(self, context_id: str | None) -> PendingInterrupt | None:
+        interrupt = self.pending.get(context_id) if context_id else None
+        return interrupt if self._is_live(interrupt) else None
+
+    def pop(self, context_id: str | None) -> PendingInterrupt | None:
+        interrupt = self.pending.pop(context_id, None) if context_id else None
+        return interrupt if self._is_live(interrupt) else None
+
+    def remove(self, interrupt: PendingInterrupt) -> None:
+        """Removes an interrupt once answered, unless a newer one has replaced it."""
+        if self.pending.get(interrupt.context_id) is interrupt:
+            del self.pending[interrupt.context_id]
+
+    def list(self, kind: InterruptKind | None = None) -> list[PendingInterrupt]:
+        return [i for i in self.pending.values() if (kind is None or i.kind == kind) and self._is_live(i)]
+
+    def expire(self, older_than: float, kind: InterruptKind | None = None) -> list[PendingInterrupt]:
+        """Removes and returns the interrupts pending for longer than `older_than` seconds."""
+        cutoff = time.time() - older_than
+        expired = [i for i in self.pending.values() if (kind is None or i.kind == kind) and i.created_at <= cutoff]
+        for interrupt in expired:
+            del self.pending[interrupt.context_id]
+        return expired
@@ -0,0 +1,140 @@
+import asyncio
+import hashlib
+import os
+import time
+import zlib
+
+from a2a.server.context import ServerCallContext
+from a2a.server.tasks import InMemoryTaskStore, TaskStore
+from a2a.types import Task, TaskState
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+# Parked approvals older than this are discarded (24 hours)
+APPROVAL_TTL = 24 * 60 * 60
+
+PARKING_DIR = "parked_approvals"
+
+
+class ApprovalParking:
+    """
+    Stores parked approvals on disk as small compressed files, one per key.
+
+    Anything parked here is no longer held in memory; it is loaded back only
+    when the human's answer arrives, and dropped once it is older than `ttl`.
+    Values are encoded with LangGraph's checkpoint serializer, so loading a
+    file never runs arbitrary code the way unpickling would.
+    """
+
+    def __init__(self, directory: str = PARKING_DIR, ttl: float = APPROVAL_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        self.serde = JsonPlusSerializer()
+
+    def _path(self, kind: str, key: str) -> str:
+        # Keys come from clients, so they are hashed into safe file names
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, kind, name)
+
+    def park(self, kind: str, key: str, value) -> None:
+        """Serializes a value to disk under (kind, key)."""
+        path = self._path(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        type_, data = self.serde.dumps_typed(value)
+        with open(path, "wb") as f:
+            # The encoding type goes first, on its own line
+            f.write(zlib.compress(type_.encode("ascii") + b"\n" + data))
+
+    def peek(self, kind: str, key: str):
+        """Loads a parked value and leaves it parked. Returns None if it is missing or expired."""
+        path = self._path(kind, key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, "rb") as f:
+                type_, _, data = zlib.decompress(f.read()).partition(b"\n")
+            return self.serde.loads_typed((type_.decode("ascii"), data))
+        except FileNotFoundError:
+            return None
+
+    def unpark(self, kind: str, key: str):
+        """Loads and removes a parked value. Returns None if it is missing or expired."""
+        value = self.peek(kind, key)
+        self.discard(kind, key)
+        return value
+
+    def discard(self, kind: str, key: str) -> None:
+        """Removes a parked value without loading it."""
+        try:
+            os.remove(self._path(kind, key))
+        except FileNotFoundError:
+            pass
+
+    def is_parked(self, kind: str, key: str) -> bool:
+        return os.path.exists(self._path(kind, key))
+
+    def sweep(self) -> int:
+        """Deletes expired approvals. Returns how many were deleted."""
+        now = time.time()
+        removed = 0
+        try:
+            kinds = os.listdir(self.directory)
+        except FileNotFoundError:
+            return 0
+        for kind in kinds:
+            with os.scandir(os.path.join(self.directory, kind)) as entries:
+                for entry in entries:
+                    try:
+                        if now - entry.stat().st_mtime > self.ttl:
+                            os.remove(entry.path)
+                            removed += 1
+                    except FileNotFoundError:
+                        # Unparked by a resume while we were sweeping
+                        pass
+        return removed
+
+
+def is_waiting_for_approval(task: Task) -> bool:
+    """True if a task is paused on a tool approval interrupt."""
+    return (
+        task.status.state == TaskState.input_required
+        and bool(task.metadata)
+        and task.metadata.get("interrupt_type") == "approval"
+    )
+
+
+class ParkingTaskStore(TaskStore):
+    """
+    An in-memory task store that moves tasks waiting for approval to disk.
+
+    Parked tasks are read from disk on every lookup, so polling a task that
+    waits for approval does not bring it back into memory. It leaves the disk
+    only once it is saved in another state, when the follow-up message resumes it.
+    """
+
+    def __init__(self, parking: ApprovalParking):
+        self.parking = parking
+        self.active = InMemoryTaskStore()
+
+    async def save(self, task: Task, context: ServerCallContext | None = None) -> None:
+        if is_waiting_for_approval(task):
+            await asyncio.to_thread(self.parking.park, "tasks", task.id, task.model_dump(mode="json"))
+            if await self.active.get(task.id, context) is not None:
+                await self.active.delete(task.id, context)
+            return
+        if await self.active.get(task.id, context) is None:
+            # The task is new, or is leaving the disk because it was resumed
+            await asyncio.to_thread(self.parking.discard, "tasks", task.id)
+        await self.active.save(task, context)
+
+    async def get(self, task_id: str, context: ServerCallContext | None = None) -> Task | None:
+        task = await self.active.get(task_id, context)
+        if task is None:
+            task_json = await asyncio.to_thread(self.parking.peek, "tasks", task_id)
+            if task_json is not None:
+                task = Task.model_validate(task_json)
+        return task
+
+    async def delete(self, task_id: str, context: ServerCallContext | None = None) -> None:
+        await self.active.delete(task_id, context)
+        await asyncio.to_thread(self.parking.discard, "tasks", task_id)
@@ -1,14 +1,23 @@
+import asyncio
+import json
 import uvicorn
+from contextlib import asynccontextmanager
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.middleware import Middleware
+from starlette.routing import Route
 
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore, TaskUpdater
+from a2a.server.tasks import TaskUpdater
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
 from a2a.types import (
     AgentCard,
     AgentSkill,
     AgentCapabilities,
+    Task,
     TaskState,
     Part,
     TextPart,
@@ -17,7 +26,11 @@ from a2a.types import (
 from a2a.utils import new_task
 
 # Import the LangGraph agent
-from agent import DietPlannerAgent
+from agent import DietPlannerAgent, diet_plan_sent
+from compression import CompressionMiddleware
+from context_locks import ConcurrentTurns, ContextBusy, ContextLocks
+from interrupts import InterruptKind, PendingInterrupt, PendingInterruptRegistry
+from parking import ApprovalParking, ParkingTaskStore
 
 # --- 1. Agent Card ---
 skill = AgentSkill(
@@ -39,12 +52,19 @@ agent_card = AgentCard(
 
 # --- 2. The A2A Executor ---
 class DietPlannerAgentExecutor(AgentExecutor):
-    def __init__(self):
+    def __init__(self, parking: ApprovalParking, task_store: ParkingTaskStore):
         self.agent = DietPlannerAgent()
+        # Approvals can take hours, so paused threads are parked on disk meanwhile
+        self.parking = parking
+        self.task_store = task_store
+        # Why each paused conversation is waiting, indexed by context_id.
+        # Entries live as long as parked approvals do.
+        self.interrupts = PendingInterruptRegistry(ttl=parking.ttl)
+        # Serializes turns per context_id; concurrent turns queue rather than being refused.
+        # A turn reports through its own task's updater, so duplicates are not coalesced.
+        self.context_locks = ContextLocks(ConcurrentTurns.queue)
 
     async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
-        user_input = context.get_user_input()
-
         task = context.current_task or new_task(context.message)
         thread_id = task.context_id
 
@@ -52,18 +72,55 @@ class DietPlannerAgentExecutor(AgentExecutor):
 
         print(f"\n--- A2A Task {task.id} (Thread: {thread_id}) ---")
 
+        # Two overlapping turns on one thread would both stream against the
+        # same LangGraph checkpoint, so turns on a context run one at a time
+        try:
+            await self.context_locks.run(
+                thread_id,
+                context.message.message_id,
+                lambda: self._run_turn(context, task, updater),
+            )
+        except ContextBusy as e:
+            await updater.update_status(
+                TaskState.rejected,
+                message=updater.new_agent_message(parts=[Part(root=TextPart(text=str(e)))]),
+                final=True,
+            )
+
+    async def _run_turn(self, context: RequestContext, task: Task, updater: TaskUpdater) -> None:
+        # The registry says why this conversation paused, without loading the task.
+        # The entry stays until the turn has run, so a turn that fails can be retried.
+        pending = self.interrupts.get(task.context_id)
+        await self._stream_turn(context, task, updater, pending)
+        if pending is not None:
+            self.interrupts.remove(pending)
+
+    async def _stream_turn(
+        self, context: RequestContext, task: Task, updater: TaskUpdater, pending: PendingInterrupt | None
+    ) -> None:
+        user_input = context.get_user_input()
+        thread_id = task.context_id
         agent_stream = None
 
         # --- Multi-Turn Logic with State Tracking ---
-        is_resuming_from_approval = (
-            task.status.state == TaskState.input_required and
-            task.metadata and
-            task.metadata.get('interrupt_type') == 'approval'
-        )
+        if pending is not None:
+            is_resuming_from_approval = pending.kind == InterruptKind.approval
+        else:
+            # The registry is not persisted. After a restart, a thread parked on
+            # disk still means the conversation is waiting for an approval.
+            is_resuming_from_approval = await asyncio.to_thread(self.parking.is_parked, "threads", thread_id)
 
         if is_resuming_from_approval:
             # The last pause was for a tool approval. We MUST RESUME.
             print(f"Resuming task from approval with: '{user_input}'")
+            # An expired approval never gets here: its parked task is gone, so the
+            # request handler answers "task not found". This only catches a task
+            # whose thread was not parked, e.g. the server stopped in between.
+            if not await self.agent.rehydrate(thread_id, self.parking):
+                await updater.failed(message=updater.new_agent_message(
+                    parts=[Part(root=TextPart(text="This approval request can no longer be resumed. Please start again."))]
+                ))
+                return
             agent_stream = self.agent.resume(resume_value=user_input, thread_id=thread_id)
         else:
             # This is a new task or a regular conversational turn. We STREAM.
@@ -75,6 +132,7 @@ class DietPlannerAgentExecutor(AgentExecutor):
         # --- Stream Mapping ---
         final_message_content = ""
         interrupted_for_approval = False
+        plan_sent = False
 
         async for chunk in agent_stream:
             if "__interrupt__" in chunk:
@@ -91,9 +149,19 @@ class DietPlannerAgentExecutor(AgentExecutor):
                     final=True,
                     metadata={'interrupt_type': 'approval'} # State tracking!
                 )
-                print("--- A2A Task Paused for Approval ---")
+                self.interrupts.add(PendingInterrupt(
+                    context_id=thread_id,
+                    task_id=task.id,
+                    kind=InterruptKind.approval,
+                    payload=interrupt_data,
+                ))
+                await self.agent.park(thread_id, self.parking)
+                print("--- A2A Task Paused for Approval (parked on disk) ---")
                 return
 
+            # The tool reports a structured result once the plan has been sent
+            plan_sent = plan_sent or diet_plan_sent(chunk)
+
             messages = chunk.get("agent", {}).get("messages", [])
             if messages:
                 last_message = messages[-1]
@@ -107,17 +175,32 @@ class DietPlannerAgentExecutor(AgentExecutor):
                     message=updater.new_agent_message(parts=[Part(root=TextPart(text=final_message_content))])
                 )
 
+        if is_resuming_from_approval:
+            # The resumed turn went through, so the parked copy of the thread can go
+            await asyncio.to_thread(self.parking.discard, "threads", thread_id)
+
         # --- Task Completion or Continuation ---
         if not interrupted_for_approval:
             # Clear any previous interrupt metadata
             task.metadata = None 
 
-            if not final_message_content.startswith("Success!"):
+            if not plan_sent:
                 print(">>> Agent is asking a question. Setting state to 'input_required'.")
                 question_message = updater.new_agent_message(
                     parts=[Part(root=TextPart(text=final_message_content))]
                 )
-                await updater.requires_input(message=question_message, final=True)
+                self.interrupts.add(PendingInterrupt(
+                    context_id=thread_id,
+                    task_id=task.id,
+                    kind=InterruptKind.question,
+                    payload={"question": final_message_content},
+                ))
+                await updater.update_status(
+                    TaskState.input_required,
+                    message=question_message,
+                    final=True,
+                    metadata={'interrupt_type': 'question'}
+                )
                 print("--- A2A Task Paused for Information ---")
             else:
                 print(f"Agent finished. Final output: {final_message_content}")
@@ -128,17 +211,103 @@ class DietPlannerAgentExecutor(AgentExecutor):
                 await updater.complete()
                 print(f"--- A2A Task {task.id} Completed ---")
 
+    async def expire_interrupts(
+        self, older_than: float, kind: InterruptKind | None = None
+    ) -> list[PendingInterrupt]:
+        """Drops paused conversations older than `older_than` seconds, with their threads and tasks."""
+        expired = self.interrupts.expire(older_than, kind)
+        for interrupt in expired:
+            self.agent.checkpointer.delete_thread(interrupt.context_id)
+            await asyncio.to_thread(self.parking.discard, "threads", interrupt.context_id)
+            await self.task_store.delete(interrupt.task_id)
+        return expired
+
+    async def sweep_expired(self) -> None:
+        """Expires conversations paused for longer than the parking TTL, every tenth of it."""
+        while True:
+            await asyncio.sleep(self.parking.ttl / 10)
+            try:
+                await self.expire_interrupts(self.parking.ttl)
+                # Also catches approvals parked before a restart, which the registry no longer knows
+                await asyncio.to_thread(self.parking.sweep)
+            except Exception as e:
+                # One failed sweep must not stop the next ones
+                print(f"Sweeping expired approvals failed: {e!r}")
+
+    @asynccontextmanager
+    async def lifespan(self, app: Starlette):
+        sweep_task = asyncio.create_task(self.sweep_expired())
+        yield
+        sweep_task.cancel()
+
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
         raise NotImplementedError()
 
-# --- 3. Main Server Setup ---
+# --- 3. Operator Endpoints ---
+def interrupt_admin_routes(executor: DietPlannerAgentExecutor) -> list[Route]:
+    """Routes for listing and bulk-expiring paused conversations."""
+
+    def bad_request(message: str) -> JSONResponse:
+        return JSONResponse({"error": message}, status_code=400)
+
+    def parse_kind(kind: str | None) -> InterruptKind | None:
+        if not kind:
+            return None
+        try:
+            return InterruptKind(kind)
+        except ValueError:
+            raise ValueError(f"Unknown kind '{kind}'; expected one of {[k.value for k in InterruptKind]}.")
+
+    async def list_interrupts(request: Request) -> JSONResponse:
+        try:
+            kind = parse_kind(request.query_params.get("kind"))
+        except ValueError as e:
+            return bad_request(str(e))
+        interrupts = executor.interrupts.list(kind)
+        return JSONResponse({"interrupts": [i.to_dict() for i in interrupts]})
+
+    async def expire_interrupts(request: Request) -> JSONResponse:
+        # Body: {"older_than_seconds": 3600, "kind": "approval"}; kind is optional
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            return bad_request("The body must be a JSON object.")
+        if not isinstance(body, dict):
+            return bad_request("The body must be a JSON object.")
+        older_than = body.get("older_than_seconds")
+        # Required, so an empty body cannot expire every paused conversation
+        if isinstance(older_than, bool) or not isinstance(older_than, (int, float)) or older_than < 0:
+            return bad_request("'older_than_seconds' is required and must be a non-negative number.")
+        try:
+            kind = parse_kind(body.get("kind"))
+        except ValueError as e:
+            return bad_request(str(e))
+        expired = await executor.expire_interrupts(older_than=float(older_than), kind=kind)
+        return JSONResponse({"expired": [i.to_dict() for i in expired]})
+
+    return [
+        Route("/admin/interrupts", list_interrupts, methods=["GET"]),
+        Route("/admin/interrupts/expire", expire_interrupts, methods=["POST"]),
+    ]
+
+# --- 4. Main Server Setup ---
 if __name__ == '__main__':
+    parking = ApprovalParking()
+    task_store = ParkingTaskStore(parking)
+    agent_executor = DietPlannerAgentExecutor(parking, task_store)
     request_handler = DefaultRequestHandler(
-        agent_executor=DietPlannerAgentExecutor(),
-        task_store=InMemoryTaskStore(),
+        agent_executor=agent_executor,
+        task_store=task_store,
     )
     server_app_builder = A2AStarletteApplication(
         agent_card=agent_card, http_handler=request_handler
     )
+    app = server_app_builder.build(
+        routes=interrupt_admin_routes(agent_executor),
+        # Expired approvals are swept on a timer, even while no requests arrive
+        lifespan=agent_executor.lifespan,
+        # Status streams repeat most of their text, so they compress very well
+        middleware=[Middleware(CompressionMiddleware)],
+    )
     print("Starting Interactive Diet Planner Agent Server on http://localhost:10004")
-    uvicorn.run(server_app_builder.build(), host='0.0.0.0', port=10004)
+    uvicorn.run(app, host='0.0.0.0', port=10004)
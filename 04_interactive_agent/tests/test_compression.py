@@ -0,0 +1,87 @@
+import asyncio
+import gzip
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+import compression
+from compression import CompressionMiddleware, _choose_encoding
+
+
+@pytest.fixture
+def with_zstd(monkeypatch):
+    # Negotiation only checks that zstd is available
+    monkeypatch.setattr(compression, "zstandard", object())
+
+
+@pytest.fixture
+def without_zstd(monkeypatch):
+    monkeypatch.setattr(compression, "zstandard", None)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("zstd, gzip", ("zstd", True)),
+        ("gzip, zstd", ("zstd", True)),  # Equal q-values: zstd is preferred
+        ("zstd;q=0.5, gzip", ("gzip", True)),  # The higher q-value wins
+        ("gzip;q=0.8, zstd;q=0.9", ("zstd", True)),
+        ("zstd;q=0, gzip;q=0", (None, True)),
+        ("br", (None, True)),
+        ("", (None, True)),
+        ("*", ("zstd", True)),
+        ("gzip;q=0.4, *;q=0.6", ("zstd", True)),  # * applies to the codings not listed
+        ("gzip, *;q=0", ("gzip", False)),  # Refuses everything else, identity included
+        ("gzip, identity;q=0", ("gzip", False)),
+        ("*;q=0, identity", (None, True)),
+        ("gzip;q=0.5, identity", (None, True)),  # The client prefers no compression
+        ("GZIP; Q=0.5", ("gzip", True)),
+        ("zstd;q=high, gzip", ("gzip", True)),  # A malformed q-value refuses the coding
+        ("zstd;q=0, zstd;q=1", (None, True)),  # The first entry for a coding counts
+    ],
+)
+def test_negotiation_picks_the_highest_q_value(with_zstd, accept_encoding, expected):
+    assert _choose_encoding(accept_encoding) == expected
+
+
+def test_negotiation_ignores_zstd_when_it_is_not_installed(without_zstd):
+    assert _choose_encoding("zstd, gzip;q=0.1") == ("gzip", True)
+    assert _choose_encoding("zstd") == (None, True)
+    assert _choose_encoding("*") == ("gzip", True)
+
+
+async def fetch(accept_encoding: str, body: str) -> httpx.Response:
+    app = Starlette(
+        routes=[Route("/", lambda request: PlainTextResponse(body))],
+        middleware=[Middleware(CompressionMiddleware)],
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # Raw bytes, so the test sees exactly what was sent
+        async with client.stream("GET", "/", headers={"Accept-Encoding": accept_encoding}) as response:
+            response.raw_body = b"".join([chunk async for chunk in response.aiter_raw()])
+            return response
+
+
+def test_small_bodies_are_sent_as_is_unless_identity_is_refused(without_zstd):
+    small = asyncio.run(fetch("gzip", "short"))
+    assert "content-encoding" not in small.headers
+    assert small.raw_body == b"short"
+
+    forced = asyncio.run(fetch("gzip, identity;q=0", "short"))
+    assert forced.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(forced.raw_body) == b"short"
+
+
+def test_large_bodies_use_the_negotiated_coding(without_zstd):
+    body = "The plan repeats itself. " * 200
+    response = asyncio.run(fetch("br, gzip;q=0.5", body))
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(response.raw_body) == body.encode()
+
+    refused = asyncio.run(fetch("gzip;q=0", body))
+    assert "content-encoding" not in refused.headers
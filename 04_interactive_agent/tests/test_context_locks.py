@@ -0,0 +1,176 @@
+# Canonical copy: 06_a2a_communication/tests/test_context_locks.py; 04_interactive_agent/tests/
+# test_context_locks.py mirrors it, apart from the import path. Edit both together.
+import asyncio
+import random
+from collections import Counter, defaultdict
+
+import pytest
+
+from context_locks import ConcurrentTurns, ContextBusy, ContextLocks
+
+
+class StubAgent:
+    """Stands in for the model: each turn sleeps briefly and records what overlapped."""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.running: dict[str, int] = defaultdict(int)
+        self.order: dict[str, list[str]] = defaultdict(list)
+        self.max_per_context = 0
+        self.max_overall = 0
+        self._overall = 0
+
+    async def turn(self, context_id: str, message_id: str, delay: float = 0.001) -> str:
+        self.calls[message_id] += 1
+        self.running[context_id] += 1
+        self._overall += 1
+        self.max_per_context = max(self.max_per_context, self.running[context_id])
+        self.max_overall = max(self.max_overall, self._overall)
+        try:
+            await asyncio.sleep(delay)
+            self.order[context_id].append(message_id)
+            return f"answer to {message_id}"
+        finally:
+            self.running[context_id] -= 1
+            self._overall -= 1
+
+
+def test_queue_serializes_turns_per_context_under_load():
+    async def main():
+        locks = ContextLocks(ConcurrentTurns.queue, max_waiting=1_000)
+        agent = StubAgent()
+        turns = [(f"ctx-{i % 20}", f"msg-{i}") for i in range(1_000)]
+        random.Random(0).shuffle(turns)
+
+        results = await asyncio.gather(*(
+            locks.run(ctx, msg, lambda ctx=ctx, msg=msg: agent.turn(ctx, msg)) for ctx, msg in turns
+        ))
+
+        assert results == [f"answer to {msg}" for _, msg in turns]
+        assert agent.max_per_context == 1
+        assert agent.max_overall > 1  # Different contexts still ran concurrently
+        # Turns on a context run in the order they arrived
+        for ctx, order in agent.order.items():
+            assert order == [msg for c, msg in turns if c == ctx]
+        assert locks.stats() == {"active_contexts": 0, "coalesced": 0, "rejected": 0}
+
+    asyncio.run(main())
+
+
+def test_coalesce_shares_retries_but_runs_distinct_turns_with_the_same_text():
+    async def main():
+        locks = ContextLocks(ConcurrentTurns.coalesce, max_waiting=1_000)
+        agent = StubAgent()
+        # Five sends of each of 50 messages over 5 contexts, interleaved
+        turns = [(f"ctx-{i % 5}", f"msg-{i}") for i in range(50)] * 5
+        random.Random(1).shuffle(turns)
+
+        results = await asyncio.gather(*(
+            locks.run(ctx, msg, lambda ctx=ctx, msg=msg: agent.turn(ctx, msg, delay=0.01)) for ctx, msg in turns
+        ))
+
+        assert results == [f"answer to {msg}" for _, msg in turns]
+        assert agent.max_per_context == 1
+        assert sum(agent.calls.values()) + locks.coalesced == len(turns)
+        assert locks.coalesced > 0
+        assert locks.stats()["active_contexts"] == 0
+
+        # The same text sent as two messages is two turns
+        same_text = await asyncio.gather(
+            locks.run("ctx", "a", lambda: agent.turn("ctx", "a")),
+            locks.run("ctx", "b", lambda: agent.turn("ctx", "b")),
+        )
+        assert same_text == ["answer to a", "answer to b"]
+        assert agent.order["ctx"] == ["a", "b"]
+
+    asyncio.run(main())
+
+
+def test_coalesced_failure_reaches_every_caller():
+    async def main():
+        locks = ContextLocks(ConcurrentTurns.coalesce)
+        calls = 0
+
+        async def failing_turn():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("model unavailable")
+
+        results = await asyncio.gather(
+            *(locks.run("ctx", "msg", failing_turn) for _ in range(3)), return_exceptions=True
+        )
+
+        assert calls == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert locks.stats()["active_contexts"] == 0
+
+    asyncio.run(main())
+
+
+def test_reject_refuses_concurrent_turns_only():
+    async def main():
+        locks = ContextLocks(ConcurrentTurns.reject)
+        agent = StubAgent()
+
+        results = await asyncio.gather(
+            *(locks.run("ctx", f"msg-{i}", lambda i=i: agent.turn("ctx", f"msg-{i}", delay=0.01)) for i in range(10)),
+            locks.run("other", "msg-x", lambda: agent.turn("other", "msg-x")),
+            return_exceptions=True,
+        )
+
+        assert results[0] == "answer to msg-0"
+        assert all(isinstance(result, ContextBusy) for result in results[1:10])
+        assert results[10] == "answer to msg-x"
+        assert locks.stats() == {"active_contexts": 0, "coalesced": 0, "rejected": 9}
+
+        # Once the context is idle again, the next turn runs
+        assert await locks.run("ctx", "msg-next", lambda: agent.turn("ctx", "msg-next")) == "answer to msg-next"
+
+    asyncio.run(main())
+
+
+def test_queue_rejects_beyond_max_waiting():
+    async def main():
+        locks = ContextLocks(ConcurrentTurns.queue, max_waiting=2)
+        agent = StubAgent()
+
+        results = await asyncio.gather(
+            *(locks.run("ctx", f"msg-{i}", lambda i=i: agent.turn("ctx", f"msg-{i}", delay=0.01)) for i in range(6)),
+            return_exceptions=True,
+        )
+
+        # One running turn, and two waiting behind it
+        assert results[:3] == ["answer to msg-0", "answer to msg-1", "answer to msg-2"]
+        assert all(isinstance(result, ContextBusy) for result in results[3:])
+        assert locks.stats()["rejected"] == 3
+        assert locks.stats()["active_contexts"] == 0
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("policy", list(ConcurrentTurns))
+def test_entries_are_dropped_after_failures_and_cancellations(policy):
+    async def main():
+        locks = ContextLocks(policy, max_waiting=1_000)
+
+        async def failing_turn():
+            await asyncio.sleep(0)
+            raise ValueError("bad turn")
+
+        async def slow_turn():
+            await asyncio.sleep(10)
+
+        for i in range(100):
+            with pytest.raises(ValueError):
+                await locks.run(f"ctx-{i}", "msg", failing_turn)
+
+        tasks = [asyncio.create_task(locks.run(f"ctx-{i % 10}", f"msg-{i}", slow_turn)) for i in range(100)]
+        await asyncio.sleep(0.01)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert locks.stats()["active_contexts"] == 0
+
+    asyncio.run(main())
@@ -0,0 +1,27 @@
+from interrupts import InterruptKind, PendingInterrupt, PendingInterruptRegistry
+
+
+def test_entry_keeps_its_payload_until_the_turn_removes_it():
+    registry = PendingInterruptRegistry(ttl=60)
+    pending = PendingInterrupt("ctx-1", "task-1", InterruptKind.approval, payload={"plan": "oats"})
+    registry.add(pending)
+
+    # Looking it up at the start of a turn leaves it in place, so a failed turn can be retried
+    assert registry.get("ctx-1").payload == {"plan": "oats"}
+    assert registry.get("ctx-1") is pending
+
+    registry.remove(pending)
+    assert registry.get("ctx-1") is None
+
+
+def test_remove_keeps_a_newer_interrupt_for_the_same_context():
+    registry = PendingInterruptRegistry(ttl=60)
+    answered = PendingInterrupt("ctx-1", "task-1", InterruptKind.question, payload={"question": "Allergies?"})
+    registry.add(answered)
+    # The resumed turn paused again before it finished
+    newer = PendingInterrupt("ctx-1", "task-1", InterruptKind.approval, payload={"plan": "oats"})
+    registry.add(newer)
+
+    registry.remove(answered)
+    assert registry.get("ctx-1") is newer
+    assert registry.list(InterruptKind.approval)[0].to_dict()["payload"] == {"plan": "oats"}
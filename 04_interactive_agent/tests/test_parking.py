@@ -0,0 +1,89 @@
+import asyncio
+import os
+import time
+import tracemalloc
+
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import DataPart, Message, Part, Role, Task, TaskState, TaskStatus
+from langchain_core.messages import AIMessage, HumanMessage
+
+from parking import ApprovalParking, ParkingTaskStore
+
+APPROVALS = 100_000
+
+PLAN = "Breakfast: oats with berries. Lunch: lentil salad. Dinner: grilled fish with greens. " * 6
+
+
+def approval_task(i: int) -> Task:
+    """A task paused on an approval, with a plan about the size the model writes."""
+    question = Message(
+        role=Role.agent,
+        message_id=f"msg-{i}",
+        parts=[Part(root=DataPart(data={"question": f"Send this plan to user{i}@example.com?", "plan": PLAN}))],
+    )
+    return Task(
+        id=f"task-{i}",
+        context_id=f"ctx-{i}",
+        status=TaskStatus(state=TaskState.input_required, message=question),
+        metadata={"interrupt_type": "approval"},
+    )
+
+
+def test_parked_thread_state_round_trips(tmp_path):
+    parking = ApprovalParking(directory=str(tmp_path))
+    state = {
+        "parent_config": None,
+        "checkpoint": {"channel_values": {"messages": [HumanMessage(content="hi"), AIMessage(content="hello")]}},
+        "pending_writes": [("task-1", "__interrupt__", {"question": "Approve?"})],
+    }
+
+    parking.park("threads", "ctx-1", state)
+    loaded = parking.unpark("threads", "ctx-1")
+
+    assert loaded["checkpoint"]["channel_values"]["messages"] == state["checkpoint"]["channel_values"]["messages"]
+    assert [tuple(w) for w in loaded["pending_writes"]] == state["pending_writes"]
+    assert not parking.is_parked("threads", "ctx-1")
+
+
+def test_sweep_deletes_only_expired_approvals(tmp_path):
+    parking = ApprovalParking(directory=str(tmp_path), ttl=60)
+    parking.park("tasks", "old", {"n": 1})
+    parking.park("tasks", "new", {"n": 2})
+    stale = time.time() - 120
+    os.utime(parking._path("tasks", "old"), (stale, stale))
+
+    assert parking.sweep() == 1
+    assert not parking.is_parked("tasks", "old")
+    assert parking.peek("tasks", "new") == {"n": 2}
+
+
+def test_parking_100k_approvals_keeps_them_out_of_memory(tmp_path):
+    """Memory held by 100k pending approvals in memory, vs. what parking leaves behind."""
+
+    async def save_all(store) -> None:
+        # A batch at a time, so parked writes overlap in the thread pool
+        for start in range(0, APPROVALS, 500):
+            await asyncio.gather(*(store.save(approval_task(i)) for i in range(start, start + 500)))
+
+    in_memory_store = InMemoryTaskStore()
+    tracemalloc.start()
+    asyncio.run(save_all(in_memory_store))
+    in_memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    parking = ApprovalParking(directory=str(tmp_path))
+    store = ParkingTaskStore(parking)
+    asyncio.run(save_all(store))
+    parked_dir = os.path.join(parking.directory, "tasks")
+    with os.scandir(parked_dir) as entries:
+        on_disk = [entry.stat().st_size for entry in entries]
+
+    print(
+        f"\n{APPROVALS:,} approvals: {in_memory / 2**20:.1f} MiB in memory; "
+        f"parked, {len(store.active.tasks)} tasks in memory and {sum(on_disk) / 2**20:.1f} MiB on disk"
+    )
+    assert len(in_memory_store.tasks) == APPROVALS
+    assert not store.active.tasks
+    assert len(on_disk) == APPROVALS
+    # Still answerable: a poll reads the task back from disk
+    assert asyncio.run(store.get("task-123")).status.state == TaskState.input_required
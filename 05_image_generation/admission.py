@@ -0,0 +1,197 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
+from a2a.server.tasks import TaskUpdater
+from a2a.types import Part, TaskState, TextPart
+from a2a.utils import new_task
+
+
+class Priority(IntEnum):
+    """Priority classes, most urgent first. Clients choose one with the `priority` metadata key."""
+    interactive = 0  # A user is waiting on the result
+    batch = 1        # Background work, e.g. results delivered by push notification
+
+
+class DeadlineUnreachable(Exception):
+    """The request cannot finish before the deadline its client gave."""
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    deadline: float | None = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class _SkillQueue:
+    def __init__(self, limit: int, service_time: float):
+        self.limit = limit
+        self.running = 0
+        self.waiters: list[_Waiter] = []
+        self.service_time = service_time  # Moving average of how long a request runs
+        self.admitted = 0
+        self.rejected = 0
+
+
+class AdmissionScheduler:
+    """
+    Decides when each request may start running.
+
+    - Per-skill caps: at most `skill_limits[skill_id]` requests of a skill run
+      at once; the rest wait in a queue for that skill.
+    - Priorities: a free slot goes to the most urgent waiting request.
+    - Deadlines: a request whose estimated finish time is past its deadline is
+      rejected right away instead of occupying the queue, and a waiter whose
+      deadline passes before it gets a slot is dropped.
+    """
+
+    def __init__(self, skill_limits: dict[str, int], default_service_time: float = 30.0):
+        self.queues = {skill_id: _SkillQueue(limit, default_service_time) for skill_id, limit in skill_limits.items()}
+        self._seq = itertools.count()
+
+    def estimate_finish(self, skill_id: str, priority: Priority) -> float:
+        """Estimates when a request submitted now would finish, assuming average service times."""
+        queue = self.queues[skill_id]
+        ahead = sum(1 for w in queue.waiters if w.priority <= priority)
+        busy = max(0, queue.running + ahead - queue.limit + 1)
+        rounds = -(-busy // queue.limit)  # Ceiling division
+        return time.time() + (rounds + 1) * queue.service_time
+
+    @asynccontextmanager
+    async def slot(self, skill_id: str, priority: Priority = Priority.interactive, deadline: float | None = None):
+        """Waits for a free slot of the skill and holds it for the duration of the block."""
+        queue = self.queues[skill_id]
+        if deadline is not None and self.estimate_finish(skill_id, priority) > deadline:
+            queue.rejected += 1
+            raise DeadlineUnreachable(f"The '{skill_id}' queue cannot finish this request before its deadline.")
+
+        if queue.running < queue.limit and not queue.waiters:
+            queue.running += 1
+        else:
+            waiter = _Waiter(priority, next(self._seq), deadline, asyncio.get_running_loop().create_future())
+            heapq.heappush(queue.waiters, waiter)
+            try:
+                await waiter.future  # The slot is handed over by `_release`
+            except asyncio.CancelledError:
+                if waiter in queue.waiters:
+                    queue.waiters.remove(waiter)
+                    heapq.heapify(queue.waiters)
+                elif not waiter.future.cancelled() and waiter.future.exception() is None:
+                    self._release(queue)  # The slot was handed over just as we gave up
+                raise
+
+        queue.admitted += 1
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            queue.service_time = 0.8 * queue.service_time + 0.2 * (time.monotonic() - started_at)
+            self._release(queue)
+
+    def _release(self, queue: _SkillQueue) -> None:
+        # Hand the slot to the most urgent waiter that can still meet its deadline
+        while queue.waiters:
+            waiter = heapq.heappop(queue.waiters)
+            if waiter.future.done():
+                continue
+            if waiter.deadline is not None and time.time() + queue.service_time > waiter.deadline:
+                queue.rejected += 1
+                waiter.future.set_exception(DeadlineUnreachable("The deadline passed while the request was queued."))
+                continue
+            waiter.future.set_result(None)
+            return
+        queue.running -= 1
+
+    def metrics(self) -> dict:
+        return {
+            skill_id: {
+                "limit": queue.limit,
+                "running": queue.running,
+                "queued": len(queue.waiters),
+                "admitted": queue.admitted,
+                "rejected": queue.rejected,
+                "avg_service_s": round(queue.service_time, 2),
+            }
+            for skill_id, queue in self.queues.items()
+        }
+
+
+def parse_admission_metadata(metadata: dict) -> tuple[Priority, float | None]:
+    """
+    Reads `priority` and `deadline` from message metadata.
+
+    Raises:
+        ValueError: If either is present but invalid. The message is meant for the client.
+    """
+    priority = metadata.get("priority", Priority.interactive.name)
+    if not isinstance(priority, str) or priority not in Priority.__members__:
+        raise ValueError(f"Unknown priority {priority!r}; expected one of {list(Priority.__members__)}.")
+
+    deadline = metadata.get("deadline")
+    if deadline is None:
+        return Priority[priority], None
+    invalid = ValueError(f"Invalid deadline {deadline!r}; expected a Unix timestamp.")
+    if isinstance(deadline, bool) or not isinstance(deadline, (int, float, str)):
+        raise invalid
+    try:
+        deadline = float(deadline)
+    except ValueError:
+        raise invalid from None
+    if not math.isfinite(deadline):
+        raise invalid
+    return Priority[priority], deadline
+
+
+class ScheduledAgentExecutor(AgentExecutor):
+    """
+    Runs an executor behind an `AdmissionScheduler`.
+
+    `classify` maps a request to the skill it uses. Clients may add `priority`
+    ("interactive" or "batch") and `deadline` (a Unix timestamp) to the
+    message metadata; a request that cannot meet its deadline, or whose
+    metadata is invalid, is rejected.
+    """
+
+    def __init__(self, executor: AgentExecutor, scheduler: AdmissionScheduler, classify: Callable[[RequestContext], str]):
+        self.executor = executor
+        self.scheduler = scheduler
+        self.classify = classify
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        try:
+            priority, deadline = parse_admission_metadata(context.message.metadata or {})
+        except ValueError as e:
+            await self._reject(context, event_queue, str(e))
+            return
+        skill_id = self.classify(context)
+
+        try:
+            async with self.scheduler.slot(skill_id, priority, deadline):
+                await self.executor.execute(context, event_queue)
+        except DeadlineUnreachable as e:
+            await self._reject(context, event_queue, str(e))
+
+    async def _reject(self, context: RequestContext, event_queue: EventQueue, reason: str) -> None:
+        task = context.current_task or new_task(context.message)
+        updater = TaskUpdater(event_queue, task.id, task.context_id)
+        if not context.current_task:
+            await event_queue.enqueue_event(task)
+        await updater.update_status(
+            TaskState.rejected,
+            message=updater.new_agent_message(parts=[Part(root=TextPart(text=reason))]),
+            final=True,
+        )
+        print(f"--- A2A Task {task.id} Rejected: {reason} ---")
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        await self.executor.cancel(context, event_queue)
@@ -1,40 +1,43 @@
 import os
+from collections.abc import AsyncIterator
 from dotenv import load_dotenv
-import asyncio
 
 from google import genai
 from google.genai import types
 
+from outbound import outbound_pool
+
 load_dotenv()
 
 class MultimodalAgent:
     """The agent's logic using the Gemini 2.0 Flash model."""
     def __init__(self):
-        self.client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+        # Requests go through the process-wide connection pool
+        self.client = genai.Client(
+            api_key=os.getenv("GOOGLE_API_KEY"),
+            http_options=types.HttpOptions(async_client_args={"transport": outbound_pool.transport()}),
+        )
         self.model = "gemini-2.0-flash-preview-image-generation"
 
-    async def generate_image(self, prompt: str) -> list[types.Part]:
-        """Generates an image from a text prompt."""
-        response = await asyncio.to_thread(
-            self.client.models.generate_content,
+    async def _stream_parts(self, contents: list) -> AsyncIterator[types.Part]:
+        """Streams the response parts of a generation as the model produces them."""
+        stream = await self.client.aio.models.generate_content_stream(
             model=self.model,
-            contents=[prompt],
+            contents=contents,
             config=types.GenerateContentConfig(
                 response_modalities=["IMAGE", "TEXT"],
             )
         )
-        return response.candidates[0].content.parts
+        async for chunk in stream:
+            if chunk.candidates and chunk.candidates[0].content:
+                for part in chunk.candidates[0].content.parts or []:
+                    yield part
 
-    async def remix_image(self, prompt: str, image_bytes: bytes) -> list[types.Part]:
-        """Generates a new image based on an existing image and a text prompt."""
+    def generate_image(self, prompt: str) -> AsyncIterator[types.Part]:
+        """Generates an image from a text prompt, streaming text and image parts as they arrive."""
+        return self._stream_parts([prompt])
+
+    def remix_image(self, prompt: str, image_bytes: bytes) -> AsyncIterator[types.Part]:
+        """Generates a new image based on an existing image and a text prompt, streaming its parts."""
         image_part = types.Part.from_bytes(data=image_bytes, mime_type='image/png')
-        
-        response = await asyncio.to_thread(
-            self.client.models.generate_content,
-            model=self.model,
-            contents=[image_part, prompt],
-            config=types.GenerateContentConfig(
-                response_modalities=["IMAGE", "TEXT"]
-            )
-        )
-        return response.candidates[0].content.parts
\ No newline at end of file
+        return self._stream_parts([image_part, prompt])
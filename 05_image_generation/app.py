@@ -1,6 +1,10 @@
+import asyncio
 import chainlit as cl
 import httpx
-import base64
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
 from uuid import uuid4
 
 from a2a.client import Client, ClientConfig, ClientFactory, A2ACardResolver
@@ -11,48 +15,81 @@ from a2a.types import (
     TextPart,
     FilePart,
     FileWithBytes,
-    TransportProtocol,
     Task,
     TaskStatusUpdateEvent
 )
 
+from artifacts import encode_file, find_description, find_image
+from client import SUPPORTED_TRANSPORTS, create_grpc_channel
+from compression import ACCEPT_ENCODING
+
 AGENT_URL = "http://localhost:10005"
+REQUEST_TIMEOUT = 120.0
+
+# One connection pool and one A2A client for the whole process, shared by every chat session
+_http_client: httpx.AsyncClient | None = None
+_a2a_client: Client | None = None
+_a2a_client_lock = asyncio.Lock()
+
+@dataclass
+class AgentSession:
+    """The per-session handle: a reference to the shared client and this chat's context ID."""
+    client: Client
+    context_id: str = field(default_factory=lambda: str(uuid4()))
+
+async def get_shared_client() -> Client:
+    """
+    Resolves the agent card and creates the A2A client on first use.
+    Every later session reuses them, so starting a chat costs no network round trip.
+    """
+    global _http_client, _a2a_client
+    if _a2a_client is None:
+        async with _a2a_client_lock:
+            if _a2a_client is None:
+                if _http_client is None:
+                    _http_client = httpx.AsyncClient(
+                        timeout=REQUEST_TIMEOUT,
+                        headers={"Accept-Encoding": ACCEPT_ENCODING},
+                        limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+                    )
+                config = ClientConfig(
+                    httpx_client=_http_client,
+                    streaming=True,
+                    supported_transports=SUPPORTED_TRANSPORTS,
+                    use_client_preference=True,
+                    grpc_channel_factory=create_grpc_channel,
+                )
+                agent_card = await A2ACardResolver(_http_client, AGENT_URL).get_agent_card()
+                _a2a_client = ClientFactory(config).create(agent_card)
+                print(f"--- A2A Client Initialized for: {agent_card.name} ---")
+    return _a2a_client
 
 @cl.on_chat_start
 async def on_chat_start():
     """
-    Initializes the A2A client when a new chat session starts.
-    The client is stored in the user session for reuse.
+    Gives the new chat session a lightweight handle to the shared A2A client.
+    The handle is stored in the user session for reuse.
     """
-
-    async_client = httpx.AsyncClient(timeout=120.0)
-    config = ClientConfig(streaming=True, supported_transports=[TransportProtocol.jsonrpc])
-    factory = ClientFactory(config)
-    card_resolver = A2ACardResolver(async_client, AGENT_URL)
-
     try:
-        agent_card = await card_resolver.get_agent_card()
-        client: Client = factory.create(agent_card)
-        cl.user_session.set("a2a_client", client)
-        cl.user_session.set("httpx_client", async_client)
-        print(f"--- A2A Client Initialized for: {agent_card.name} ---")
+        client = await get_shared_client()
+        cl.user_session.set("agent_session", AgentSession(client=client))
     except Exception as e:
         await cl.Message(
             content=f"Error: Could not connect to the A2A server at `{AGENT_URL}`. Please ensure the server is running."
         ).send()
         print(f"Failed to initialize A2A client: {e}")
 
-@cl.on_chat_end
-async def on_chat_end():
-    httpx_client = cl.user_session.get("httpx_client")
-    if httpx_client:
-        await httpx_client.aclose()
+@cl.on_app_shutdown
+async def on_app_shutdown():
+    # Sessions only hold handles, so the shared pool is closed once, with the process
+    if _http_client:
+        await _http_client.aclose()
         print("--- HTTPX Client closed ---")
 
 @cl.on_message
 async def on_message(msg: cl.Message):
-    a2a_client = cl.user_session.get("a2a_client")
-    if not a2a_client:
+    agent_session: AgentSession | None = cl.user_session.get("agent_session")
+    if not agent_session:
         await cl.Message(content="A2A Client not initialized. Cannot process request.").send()
         return
 
@@ -65,10 +102,7 @@ async def on_message(msg: cl.Message):
     if image_elements:
         step_name = "Remixing Image"
         image_element = image_elements[0]
-        image_bytes_raw = None
-        with open(image_element.path, "rb") as f:
-            image_bytes_raw = f.read()
-        image_bytes_b64 = base64.b64encode(image_bytes_raw).decode('utf-8')
+        image_bytes_b64 = await encode_file(image_element.path)
 
         a2a_message = Message(
             role=Role.user,
@@ -85,6 +119,8 @@ async def on_message(msg: cl.Message):
                 Part(root=TextPart(text=user_prompt)),
             ],
             message_id=str(uuid4()),
+            context_id=agent_session.context_id,
+            metadata={"deadline": time.time() + REQUEST_TIMEOUT},
         )
     elif user_prompt:
         step_name = "Generating Image"
@@ -92,6 +128,8 @@ async def on_message(msg: cl.Message):
             role=Role.user,
             parts=[Part(root=TextPart(text=user_prompt))],
             message_id=str(uuid4()),
+            context_id=agent_session.context_id,
+            metadata={"deadline": time.time() + REQUEST_TIMEOUT},
         )
     else:
         await cl.Message(content="Please provide a prompt.").send()
@@ -102,11 +140,12 @@ async def on_message(msg: cl.Message):
     async with cl.Step(name=step_name, type="tool", show_input=False) as step:
         step.input = user_prompt
         try:
-            async for event in a2a_client.send_message(request=a2a_message):
+            async for event in agent_session.client.send_message(request=a2a_message):
                 current_task_state, update_event = event
                 if isinstance(update_event, TaskStatusUpdateEvent) and update_event.status.message:
                     progress_message = update_event.status.message.parts[0].root.text
-                    step.output = progress_message # Update the step's output with the progress
+                    # Stream each progress update into the step as soon as the server emits it
+                    await step.stream_token(f"{progress_message}\n")
                 final_task_object = current_task_state
         except Exception as e:
             step.output = f"An error occurred: {e}"
@@ -115,26 +154,21 @@ async def on_message(msg: cl.Message):
 
     # --- 3. Process and Display the Final Result ---
     if isinstance(final_task_object, Task):
-        image_artifact = next((art for art in final_task_object.artifacts if art.name.startswith("image")), None)
-        text_artifact = next((art for art in final_task_object.artifacts if art.name.startswith("description")), None)
-
-        result_elements = []
-        result_text = "Here is your generated image."
-
-        if text_artifact and isinstance(text_artifact.parts[0].root, TextPart):
-            result_text = text_artifact.parts[0].root.text
-
-        if image_artifact:
-            file_part = image_artifact.parts[0].root
-            if isinstance(file_part, FilePart) and isinstance(file_part.file, FileWithBytes):
-                image_bytes_decoded = base64.b64decode(file_part.file.bytes)
-                result_elements.append(
-                    cl.Image(content=image_bytes_decoded, name="generated_image.png", display="inline")
-                )
+        image = find_image(final_task_object)
+        result_text = find_description(final_task_object) or "Here is your generated image."
 
-        if not result_elements:
+        if not image:
             await cl.Message(content="Sorry, the agent did not return an image.").send()
         else:
-            await cl.Message(content=result_text, elements=result_elements, author="Image Agent").send()
+            # Decode straight to disk in the worker pool; Chainlit serves the image from the file
+            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
+                image_path = f.name
+            try:
+                await image.save(image_path)
+                result_elements = [cl.Image(path=image_path, name="generated_image.png", display="inline")]
+                await cl.Message(content=result_text, elements=result_elements, author="Image Agent").send()
+            finally:
+                # Sending the message stores Chainlit's own copy of the file
+                os.remove(image_path)
     else:
         await cl.Message(content="Failed to get a valid response from the agent.").send()
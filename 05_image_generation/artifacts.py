@@ -0,0 +1,102 @@
+import asyncio
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from a2a.types import FilePart, FileWithBytes, Task, TextPart
+
+# Base64 is decoded in chunks of this many characters (a multiple of 4), so
+# a multi-megabyte image never needs a second full-size copy in memory.
+DECODE_CHUNK_CHARS = 1024 * 1024
+
+# Decoding and file I/O run here instead of on the event loop
+_decode_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="image-decode")
+
+
+async def _run_in_pool(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_decode_pool, partial(func, *args))
+
+
+def _decode(data_b64: str) -> bytes:
+    # Line breaks are allowed in base64 (e.g. MIME's 76-character lines), anything else is an error
+    return base64.b64decode("".join(data_b64.split()), validate=True)
+
+
+def _decode_to_file(data_b64: str, path: str) -> None:
+    # Whitespace is dropped chunk by chunk, and the characters that do not fill
+    # a 4-character group carry over, so every slice decodes on a group boundary
+    carry = ""
+    with open(path, "wb") as f:
+        for start in range(0, len(data_b64), DECODE_CHUNK_CHARS):
+            chunk = carry + "".join(data_b64[start:start + DECODE_CHUNK_CHARS].split())
+            whole = len(chunk) - len(chunk) % 4
+            f.write(base64.b64decode(chunk[:whole], validate=True))
+            carry = chunk[whole:]
+        f.write(base64.b64decode(carry, validate=True))
+
+
+def _write_bytes(path: str, content: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+def _encode_file(path: str) -> str:
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode("utf-8")
+
+
+class LazyImage:
+    """
+    An image artifact that is only decoded when it is accessed.
+
+    Holding one costs nothing beyond the base64 string already in the task;
+    `read()` and `save()` do their work in the decode pool.
+    """
+
+    def __init__(self, file: FileWithBytes):
+        self.file = file
+        self._content: bytes | None = None
+
+    @property
+    def name(self) -> str | None:
+        return self.file.name
+
+    @property
+    def mime_type(self) -> str | None:
+        return self.file.mime_type
+
+    async def read(self) -> bytes:
+        """Decodes the image into memory, once."""
+        if self._content is None:
+            self._content = await _run_in_pool(_decode, self.file.bytes)
+        return self._content
+
+    async def save(self, path: str) -> None:
+        """Decodes the image straight to a file, chunk by chunk."""
+        if self._content is not None:
+            await _run_in_pool(_write_bytes, path, self._content)
+        else:
+            await _run_in_pool(_decode_to_file, self.file.bytes, path)
+
+
+def find_image(task: Task) -> LazyImage | None:
+    """Returns the first image artifact of a task, without decoding it."""
+    image_artifact = next((art for art in task.artifacts or [] if art.name.startswith("image")), None)
+    if image_artifact:
+        file_part = image_artifact.parts[0].root
+        if isinstance(file_part, FilePart) and isinstance(file_part.file, FileWithBytes):
+            return LazyImage(file_part.file)
+    return None
+
+
+def find_description(task: Task) -> str | None:
+    """Returns the text of the first description artifact of a task."""
+    text_artifact = next((art for art in task.artifacts or [] if art.name.startswith("description")), None)
+    if text_artifact and isinstance(text_artifact.parts[0].root, TextPart):
+        return text_artifact.parts[0].root.text
+    return None
+
+
+async def encode_file(path: str) -> str:
+    """Reads and base64-encodes a local image in the decode pool."""
+    return await _run_in_pool(_encode_file, path)
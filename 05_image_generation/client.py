@@ -1,8 +1,10 @@
+import argparse
 import asyncio
+import grpc
 import httpx
 import os
+import time
 from uuid import uuid4
-import base64
 
 from a2a.client import Client, ClientConfig, ClientFactory, A2ACardResolver
 from a2a.types import (
@@ -15,43 +17,58 @@ from a2a.types import (
     TransportProtocol,
     Task,
     TaskStatusUpdateEvent,
-    Artifact
+    PushNotificationConfig,
 )
 
+from artifacts import encode_file, find_description, find_image
+from compression import ACCEPT_ENCODING
+
 AGENT_URL = "http://localhost:10005"
 GENERATED_IMAGE_PATH = "generated_image.png"
 REMIXED_IMAGE_PATH = "remixed_image.png"
 
-def save_image_from_task(task: Task, output_filename: str):
+# How long the client waits for a result. It is sent to the server as the
+# request deadline, so a request the server cannot finish in time is rejected early.
+REQUEST_TIMEOUT = 60.0
+
+# Transports in order of preference: gRPC when the agent card offers it, else JSON-RPC
+SUPPORTED_TRANSPORTS = [TransportProtocol.grpc, TransportProtocol.jsonrpc]
+
+# The local webhook sink (`webhook_sink.py`) that receives push notifications
+WEBHOOK_URL = "http://localhost:10015/webhook"
+WEBHOOK_TOKEN = "local-test-token"
+
+def create_grpc_channel(url: str) -> grpc.aio.Channel:
+    """Opens a gRPC channel that accepts messages as large as a generated image."""
+    return grpc.aio.insecure_channel(url, options=[("grpc.max_receive_message_length", 64 * 1024 * 1024)])
+
+async def save_image_from_task(task: Task, output_filename: str):
     """Finds the first image artifact in a task and saves it to a file."""
-    image_artifact = next((art for art in task.artifacts if art.name.startswith("image")), None)
-    text_artifact = next((art for art in task.artifacts if art.name.startswith("description")), None)
-    
-    if image_artifact:
-        file_part = image_artifact.parts[0].root
-        if isinstance(file_part, FilePart) and isinstance(file_part.file, FileWithBytes):
-            image_bytes = base64.b64decode(file_part.file.bytes)
-
-            with open(output_filename, "wb") as f:
-                f.write(image_bytes)
-        else:
-            print("ERROR: Image artifact did not contain expected FileWithBytes part.")
+    image = find_image(task)
+    if image:
+        # Decoded in a worker pool so the event loop keeps serving other streams
+        await image.save(output_filename)
     else:
         print("ERROR: No image artifact found in the task response.")
-        
-    if text_artifact:
-        text_part = text_artifact.parts[0].root
-        if isinstance(text_part, TextPart):
-            print("\n--- Image Description ---")
-            print(text_part.text)
-            print("-------------------------\n")
+
+    description = find_description(task)
+    if description:
+        print("\n--- Image Description ---")
+        print(description)
+        print("-------------------------\n")
 
 
 async def main():
     # Set a long timeout for the client, as the whole operation can be slow.
-    async with httpx.AsyncClient(timeout=60.0) as async_client:
+    async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT, headers={"Accept-Encoding": ACCEPT_ENCODING}) as async_client:
         # Client must support streaming to handle long-running tasks
-        config = ClientConfig(streaming=True, supported_transports=[TransportProtocol.jsonrpc])
+        config = ClientConfig(
+            httpx_client=async_client,
+            streaming=True,
+            supported_transports=SUPPORTED_TRANSPORTS,
+            use_client_preference=True,
+            grpc_channel_factory=create_grpc_channel,
+        )
         factory = ClientFactory(config)
 
         card_resolver = A2ACardResolver(async_client, AGENT_URL)
@@ -68,6 +85,7 @@ async def main():
             role=Role.user,
             parts=[Part(root=TextPart(text=generate_prompt))],
             message_id=str(uuid4()),
+            metadata={"deadline": time.time() + REQUEST_TIMEOUT},
         )
 
         final_task_object = None
@@ -85,7 +103,7 @@ async def main():
             print("Failed to get a valid task object for image generation.")
             return
 
-        save_image_from_task(final_task_object, GENERATED_IMAGE_PATH)
+        await save_image_from_task(final_task_object, GENERATED_IMAGE_PATH)
 
         if not os.path.exists(GENERATED_IMAGE_PATH):
             print("Image generation failed, cannot proceed to remixing.")
@@ -94,11 +112,8 @@ async def main():
         # --- Part 2: Remix the Generated Image ---
         print(f"--> 2. Requesting to remix the generated image '{GENERATED_IMAGE_PATH}'...")
 
-        with open(GENERATED_IMAGE_PATH, "rb") as f:
-            image_bytes_raw = f.read()
-
         # We must base64 encode the raw bytes to send them in the string field.
-        image_bytes_b64 = base64.b64encode(image_bytes_raw).decode('utf-8')
+        image_bytes_b64 = await encode_file(GENERATED_IMAGE_PATH)
 
         remix_prompt = "Make the art style more like Van Gogh's Starry Night"
         remix_message = Message(
@@ -116,6 +131,7 @@ async def main():
                 Part(root=TextPart(text=remix_prompt)),
             ],
             message_id=str(uuid4()),
+            metadata={"deadline": time.time() + REQUEST_TIMEOUT},
         )
 
         final_remix_task = None
@@ -132,7 +148,51 @@ async def main():
             print("Failed to get a valid task object for image remixing.")
             return
 
-        save_image_from_task(final_remix_task, REMIXED_IMAGE_PATH)
+        await save_image_from_task(final_remix_task, REMIXED_IMAGE_PATH)
+
+async def main_push():
+    """
+    Submits a generation task and disconnects right away. The server delivers
+    every task update, including the final image, to the webhook sink.
+    """
+    async with httpx.AsyncClient(timeout=60.0, headers={"Accept-Encoding": ACCEPT_ENCODING}) as async_client:
+        # `polling=True` sends a non-blocking `message/send`: the server replies
+        # with the submitted task immediately and keeps working in the background.
+        config = ClientConfig(
+            httpx_client=async_client,
+            streaming=False,
+            polling=True,
+            supported_transports=SUPPORTED_TRANSPORTS,
+            use_client_preference=True,
+            grpc_channel_factory=create_grpc_channel,
+            push_notification_configs=[PushNotificationConfig(url=WEBHOOK_URL, token=WEBHOOK_TOKEN)],
+        )
+        factory = ClientFactory(config)
+
+        card_resolver = A2ACardResolver(async_client, AGENT_URL)
+        agent_card = await card_resolver.get_agent_card()
+        if not agent_card.capabilities.push_notifications:
+            print(f"{agent_card.name} does not support push notifications.")
+            return
+        client: Client = factory.create(agent_card)
+
+        generate_message = Message(
+            role=Role.user,
+            parts=[Part(root=TextPart(text="A lighthouse on a cliff during a thunderstorm, oil painting"))],
+            message_id=str(uuid4()),
+            # Nobody is waiting on this request, so it yields to interactive ones
+            metadata={"priority": "batch"},
+        )
+
+        async for event in client.send_message(request=generate_message):
+            task = event[0] if isinstance(event, tuple) else event
+            if isinstance(task, Task):
+                print(f"--> Task {task.id} is {task.status.state}.")
+        print(f"Disconnected. Updates will be delivered to {WEBHOOK_URL}.")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="A2A client for the image generation agent.")
+    parser.add_argument("--push", action="store_true", help="Receive results through push notifications.")
+    args = parser.parse_args()
+
+    asyncio.run(main_push() if args.push else main())
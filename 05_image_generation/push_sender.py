@@ -0,0 +1,150 @@
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+
+import httpx
+
+from a2a.server.tasks import PushNotificationConfigStore, PushNotificationSender
+from a2a.types import PushNotificationConfig, Task
+
+
+@dataclass
+class _Retry:
+    """A delivery waiting in the delay queue."""
+    task: Task
+    config: PushNotificationConfig
+    attempt: int
+
+
+class QueuedPushNotificationSender(PushNotificationSender):
+    """
+    Delivers task updates to client webhooks from background workers.
+
+    - Bounded: each worker has a bounded queue, so a slow webhook applies
+      backpressure instead of growing memory without limit.
+    - Batched: updates for the same task that arrive before it is delivered
+      are coalesced, and only the latest state is sent.
+    - Retrying: failed deliveries go to a delay queue and are retried with
+      exponential backoff, so a failing webhook does not hold up a worker.
+      A retry is dropped once a newer state of the task is sent to that webhook.
+
+    Each task always goes to the same worker, so its updates arrive in order.
+    An update that fails for any other reason than HTTP is logged and dropped.
+    """
+
+    def __init__(
+        self,
+        httpx_client: httpx.AsyncClient,
+        config_store: PushNotificationConfigStore,
+        workers: int = 4,
+        max_queue_size: int = 1000,
+        batch_delay: float = 0.2,
+        max_retries: int = 5,
+        retry_backoff: float = 0.5,
+    ):
+        self.httpx_client = httpx_client
+        self.config_store = config_store
+        self.batch_delay = batch_delay
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queues = [asyncio.Queue(maxsize=max_queue_size) for _ in range(workers)]
+        self._latest: dict[str, Task] = {}  # Undelivered state per task ID
+        self._workers: list[asyncio.Task] = []
+        # The delay queue: a heap of (due time, sequence, retry), and the
+        # scheduled retry per (task ID, webhook URL), so a newer state can supersede it
+        self._retry_heap: list[tuple[float, int, _Retry]] = []
+        self._retries: dict[tuple[str, str], _Retry] = {}
+        self._retry_sequence = itertools.count()
+        self._retry_added = asyncio.Event()
+        self._retrying: set[asyncio.Task] = set()
+
+    async def send_notification(self, task: Task) -> None:
+        """Queues the task's current state for delivery and returns immediately."""
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work(queue)) for queue in self._queues]
+            self._workers.append(asyncio.create_task(self._retry_when_due()))
+
+        already_queued = task.id in self._latest
+        self._latest[task.id] = task  # A newer state replaces an undelivered older one
+        if not already_queued:
+            queue = self._queues[hash(task.id) % len(self._queues)]
+            await queue.put((time.monotonic() + self.batch_delay, task.id))
+
+    async def _work(self, queue: asyncio.Queue) -> None:
+        while True:
+            due_at, task_id = await queue.get()
+            # Give further updates for this task a moment to coalesce
+            delay = due_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            task = self._latest.pop(task_id, None)
+            if task is None:
+                continue
+            try:
+                configs = await self.config_store.get_info(task.id)
+                await asyncio.gather(*(self._deliver(task, config) for config in configs))
+            except Exception as e:
+                # One broken update must not stop the worker
+                print(f"Dropping push notification for task {task_id}: {e!r}")
+
+    async def _deliver(self, task: Task, config: PushNotificationConfig, attempt: int = 0) -> None:
+        """Posts the task to one webhook once, scheduling a retry if that fails."""
+        # This state is newer than any retry still waiting for the same webhook
+        self._retries.pop((task.id, config.url), None)
+        headers = {"X-A2A-Notification-Token": config.token} if config.token else None
+        try:
+            payload = task.model_dump(mode="json", exclude_none=True)
+            response = await self.httpx_client.post(config.url, json=payload, headers=headers)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            if attempt == self.max_retries:
+                print(f"Giving up on push notification for task {task.id} to {config.url}: {e}")
+                return
+            self._schedule_retry(_Retry(task, config, attempt + 1), self.retry_backoff * 2 ** attempt)
+        except Exception as e:
+            print(f"Dropping push notification for task {task.id} to {config.url}: {e!r}")
+
+    def _schedule_retry(self, retry: _Retry, delay: float) -> None:
+        self._retries[(retry.task.id, retry.config.url)] = retry
+        heapq.heappush(self._retry_heap, (time.monotonic() + delay, next(self._retry_sequence), retry))
+        self._retry_added.set()
+
+    async def _retry_when_due(self) -> None:
+        """Takes retries off the delay queue when they are due and delivers them."""
+        while True:
+            if not self._retry_heap:
+                await self._retry_added.wait()
+                self._retry_added.clear()
+                continue
+            due_at, _, retry = self._retry_heap[0]
+            delay = due_at - time.monotonic()
+            if delay > 0:
+                # Wakes up early if a retry that is due sooner is added
+                try:
+                    await asyncio.wait_for(self._retry_added.wait(), delay)
+                except TimeoutError:
+                    pass
+                self._retry_added.clear()
+                continue
+
+            heapq.heappop(self._retry_heap)
+            key = (retry.task.id, retry.config.url)
+            if self._retries.get(key) is not retry:
+                continue  # Superseded by a newer state
+            del self._retries[key]
+            delivery = asyncio.create_task(self._deliver(retry.task, retry.config, retry.attempt))
+            self._retrying.add(delivery)
+            delivery.add_done_callback(self._retrying.discard)
+
+    async def close(self) -> None:
+        """Stops the workers; updates still queued or waiting for a retry are dropped."""
+        tasks = [*self._workers, *self._retrying]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._retry_heap.clear()
+        self._retries.clear()
@@ -1,15 +1,27 @@
+import asyncio
+import grpc
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 import uvicorn
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.middleware import Middleware
+from starlette.routing import Route
 
+from a2a.grpc import a2a_pb2_grpc
 from a2a.server.apps import A2AStarletteApplication
-from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore, TaskUpdater
+from a2a.server.request_handlers import DefaultRequestHandler, GrpcHandler
+from a2a.server.tasks import InMemoryPushNotificationConfigStore, InMemoryTaskStore, TaskUpdater
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
 from a2a.types import (
     AgentCard,
     AgentSkill,
     AgentCapabilities,
+    AgentInterface,
+    TransportProtocol,
     Part,
+    TaskState,
     TextPart,
     FilePart,
     FileWithBytes,
@@ -18,7 +30,19 @@ from a2a.utils import new_task, get_file_parts
 
 from google.genai import types as genai_types
 import base64
+from compression import CompressionMiddleware
+from admission import AdmissionScheduler, ScheduledAgentExecutor
 from agent import MultimodalAgent
+from outbound import GEMINI_API, outbound_pool
+from push_sender import QueuedPushNotificationSender
+
+PORT = 10005
+GRPC_PORT = 50005
+# Images easily exceed gRPC's default 4 MB message limit
+GRPC_OPTIONS = [
+    ("grpc.max_send_message_length", 64 * 1024 * 1024),
+    ("grpc.max_receive_message_length", 64 * 1024 * 1024),
+]
 
 # --- The A2A Executor ---
 class ImageAgentExecutor(AgentExecutor):
@@ -35,8 +59,6 @@ class ImageAgentExecutor(AgentExecutor):
         print(f"\n--- A2A Task {task.id} Started ---")
         await updater.submit()
 
-        gemini_parts: list[genai_types.Part] = []
-
         if user_input_files:
             await updater.start_work(
                 message=updater.new_agent_message(
@@ -52,7 +74,7 @@ class ImageAgentExecutor(AgentExecutor):
             if isinstance(user_input_files[0], FileWithBytes):
                 image_bytes_b64 = user_input_files[0].bytes
                 image_bytes = base64.b64decode(image_bytes_b64)
-                gemini_parts = await self.agent.remix_image(
+                gemini_parts = self.agent.remix_image(
                     user_input_text, image_bytes
                 )
             else:
@@ -69,13 +91,45 @@ class ImageAgentExecutor(AgentExecutor):
                     ]
                 )
             )
-            gemini_parts = await self.agent.generate_image(user_input_text)
+            gemini_parts = self.agent.generate_image(user_input_text)
+
+        await self._publish_parts(gemini_parts, updater)
+
+        await updater.complete(
+            message=updater.new_agent_message(
+                parts=[Part(root=TextPart(text="Image processing complete!"))]
+            )
+        )
+        print(f"--- A2A Task {task.id} Completed ---")
+
+    async def _publish_parts(self, gemini_parts: AsyncIterator[genai_types.Part], updater: TaskUpdater) -> None:
+        """
+        Forwards the parts of a streamed generation as they arrive.
 
-        for i, part in enumerate(gemini_parts):
-            if part.text is not None:
-                await updater.add_artifact(parts=[Part(root=TextPart(text=part.text))], name=f"description_{i}")
+        Text is sent as a status update per chunk, and each run of text becomes
+        one description artifact once the next image, or the end, arrives.
+        Images become artifacts as soon as they are received.
+        """
+        description: list[str] = []
+        i = 0
+
+        async def flush_description() -> None:
+            nonlocal i
+            if description:
+                await updater.add_artifact(parts=[Part(root=TextPart(text="".join(description)))], name=f"description_{i}")
+                description.clear()
+                i += 1
+
+        async for part in gemini_parts:
+            if part.text:
+                description.append(part.text)
+                await updater.update_status(
+                    TaskState.working,
+                    message=updater.new_agent_message(parts=[Part(root=TextPart(text=part.text))]),
+                )
 
             elif part.inline_data is not None:
+                await flush_description()
                 image_bytes_b64 = base64.b64encode(part.inline_data.data).decode("utf-8")
                 a2a_file_part = FilePart(
                     file=FileWithBytes(
@@ -85,17 +139,28 @@ class ImageAgentExecutor(AgentExecutor):
                     )
                 )
                 await updater.add_artifact(parts=[Part(root=a2a_file_part)], name=f"image_{i}")
+                i += 1
 
-        await updater.complete(
-            message=updater.new_agent_message(
-                parts=[Part(root=TextPart(text="Image processing complete!"))]
-            )
-        )
-        print(f"--- A2A Task {task.id} Completed ---")
+        await flush_description()
 
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
         raise NotImplementedError()
 
+def classify_skill(context: RequestContext) -> str:
+    """Requests that carry an image are remixes; everything else is a generation."""
+    return "remix_image" if get_file_parts(context.message.parts) else "generate_image"
+
+async def serve(app, agent_card: AgentCard, request_handler: DefaultRequestHandler) -> None:
+    """Serves the agent over JSON-RPC (HTTP) and gRPC at the same time."""
+    grpc_server = grpc.aio.server(options=GRPC_OPTIONS)
+    a2a_pb2_grpc.add_A2AServiceServicer_to_server(GrpcHandler(agent_card, request_handler), grpc_server)
+    grpc_server.add_insecure_port(f"[::]:{GRPC_PORT}")
+    await grpc_server.start()
+    try:
+        await uvicorn.Server(uvicorn.Config(app, host="0.0.0.0", port=PORT)).serve()
+    finally:
+        await grpc_server.stop(grace=5)
+
 # --- A2A Server Setup ---
 if __name__ == "__main__":
     generate_skill = AgentSkill(
@@ -114,20 +179,59 @@ if __name__ == "__main__":
     agent_card = AgentCard(
         name="Image Generation & Remix Agent",
         description="A multimodal agent that can create and edit images using Gemini.",
-        url="http://localhost:10005/",
+        url=f"http://localhost:{PORT}/",
+        preferred_transport=TransportProtocol.jsonrpc,
+        # gRPC carries image bytes as binary instead of base64 text in JSON
+        additional_interfaces=[
+            AgentInterface(url=f"http://localhost:{PORT}/", transport=TransportProtocol.jsonrpc),
+            AgentInterface(url=f"localhost:{GRPC_PORT}", transport=TransportProtocol.grpc),
+        ],
         version="1.0.0",
         default_input_modes=["text/plain", "image/png", "image/jpeg"],
         default_output_modes=["text/plain", "image/png", "image/jpeg"],
-        capabilities=AgentCapabilities(streaming=True),
+        # Clients can register a webhook and disconnect instead of holding a stream open
+        capabilities=AgentCapabilities(streaming=True, push_notifications=True),
         skills=[generate_skill, remix_skill],
     )
 
+    # Caps how many generations and remixes run at once. Requests beyond the
+    # cap wait by priority, and those that would miss their deadline are rejected.
+    scheduler = AdmissionScheduler({"generate_image": 4, "remix_image": 2})
+
+    async def admission_metrics(request: Request) -> JSONResponse:
+        return JSONResponse(scheduler.metrics())
+
+    async def outbound_metrics(request: Request) -> JSONResponse:
+        return JSONResponse(outbound_pool.metrics())
+
+    push_config_store = InMemoryPushNotificationConfigStore()
+    # Webhook deliveries share the outbound connection pool with the Gemini client
+    push_sender = QueuedPushNotificationSender(outbound_pool.client(timeout=30.0), push_config_store)
     request_handler = DefaultRequestHandler(
-        agent_executor=ImageAgentExecutor(),
+        agent_executor=ScheduledAgentExecutor(ImageAgentExecutor(), scheduler, classify_skill),
         task_store=InMemoryTaskStore(),
+        push_config_store=push_config_store,
+        push_sender=push_sender,
     )
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # Connects to the Gemini API before the first request needs it
+        async with outbound_pool.lifespan([GEMINI_API]):
+            yield
+            # Stops the webhook workers before the pool they post through closes
+            await push_sender.close()
+
     server_app_builder = A2AStarletteApplication(
         agent_card=agent_card, http_handler=request_handler
     )
-    print("Starting Image Generation Agent Server on http://localhost:10005")
-    uvicorn.run(server_app_builder.build(), host="0.0.0.0", port=10005)
+    app = server_app_builder.build(
+        routes=[
+            Route("/admission/metrics", admission_metrics, methods=["GET"]),
+            Route("/outbound/metrics", outbound_metrics, methods=["GET"]),
+        ],
+        middleware=[Middleware(CompressionMiddleware)],
+        lifespan=lifespan,
+    )
+    print(f"Starting Image Generation Agent Server on http://localhost:{PORT} (gRPC on localhost:{GRPC_PORT})")
+    asyncio.run(serve(app, agent_card, request_handler))
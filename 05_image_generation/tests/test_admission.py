@@ -0,0 +1,143 @@
+import asyncio
+import time
+
+import pytest
+
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
+from a2a.types import Message, MessageSendParams, Part, Role, Task, TaskState, TaskStatusUpdateEvent, TextPart
+
+from admission import AdmissionScheduler, DeadlineUnreachable, Priority, ScheduledAgentExecutor
+
+
+async def hold(scheduler: AdmissionScheduler, name: str, order: list[str], release: asyncio.Event, **kwargs) -> None:
+    async with scheduler.slot("generate_image", **kwargs):
+        order.append(name)
+        await release.wait()
+
+
+def test_a_free_slot_goes_to_the_most_urgent_waiter():
+    async def main():
+        scheduler = AdmissionScheduler({"generate_image": 1})
+        order: list[str] = []
+        release = asyncio.Event()
+        first = asyncio.create_task(hold(scheduler, "first", order, release))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.create_task(hold(scheduler, name, order, release, priority=priority))
+            for name, priority in [
+                ("batch-1", Priority.batch),
+                ("interactive-1", Priority.interactive),
+                ("batch-2", Priority.batch),
+                ("interactive-2", Priority.interactive),
+            ]
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.metrics()["generate_image"]["queued"] == 4
+        release.set()
+        await asyncio.gather(first, *waiters)
+        return order, scheduler.metrics()["generate_image"]
+
+    order, metrics = asyncio.run(main())
+    # Most urgent first, and first come first served within a priority
+    assert order == ["first", "interactive-1", "interactive-2", "batch-1", "batch-2"]
+    assert metrics["running"] == 0 and metrics["admitted"] == 5
+
+
+def test_a_waiter_cancelled_during_handoff_passes_its_slot_on():
+    async def main():
+        scheduler = AdmissionScheduler({"generate_image": 1})
+        order: list[str] = []
+        release = asyncio.Event()
+        first = scheduler.slot("generate_image")
+        await first.__aenter__()
+        handed_over = asyncio.create_task(hold(scheduler, "handed-over", order, release))
+        last = asyncio.create_task(hold(scheduler, "last", order, release))
+        await asyncio.sleep(0)
+
+        await first.__aexit__(None, None, None)
+        # The slot has been handed to the waiter, which has not resumed yet
+        handed_over.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await handed_over
+        await asyncio.sleep(0)
+        running = scheduler.metrics()["generate_image"]["running"]
+        release.set()
+        await asyncio.wait_for(last, timeout=1)  # Would wait forever if the slot were lost
+        return order, running, scheduler.metrics()["generate_image"]
+
+    order, running, metrics = asyncio.run(main())
+    assert order == ["last"]
+    assert running == 1
+    assert metrics["running"] == 0 and metrics["queued"] == 0
+
+
+def test_a_request_that_cannot_meet_its_deadline_is_rejected():
+    async def main():
+        scheduler = AdmissionScheduler({"generate_image": 1}, default_service_time=10.0)
+        with pytest.raises(DeadlineUnreachable):
+            async with scheduler.slot("generate_image", deadline=time.time() + 5):
+                pass
+
+        # A waiter whose deadline passes while it is queued is dropped when the slot frees up
+        order: list[str] = []
+        release = asyncio.Event()
+        scheduler.queues["generate_image"].service_time = 0.05
+        first = asyncio.create_task(hold(scheduler, "first", order, release))
+        await asyncio.sleep(0)
+        late = asyncio.create_task(hold(scheduler, "late", order, release, deadline=time.time() + 0.12))
+        await asyncio.sleep(0.1)
+        release.set()
+        await first
+        with pytest.raises(DeadlineUnreachable):
+            await late
+        return order, scheduler.metrics()["generate_image"]
+
+    order, metrics = asyncio.run(main())
+    assert order == ["first"]
+    assert metrics["rejected"] == 2 and metrics["running"] == 0
+
+
+class RecordingExecutor(AgentExecutor):
+    def __init__(self):
+        self.ran = 0
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        self.ran += 1
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        pass
+
+
+@pytest.mark.parametrize(
+    "metadata, reason",
+    [
+        ({"deadline": "soon"}, "Invalid deadline 'soon'"),
+        ({"deadline": float("nan")}, "Invalid deadline nan"),
+        ({"deadline": True}, "Invalid deadline True"),
+        ({"priority": ["batch"]}, "Unknown priority ['batch']"),
+        ({"priority": "urgent"}, "Unknown priority 'urgent'"),
+        ({"deadline": time.time() - 60}, "cannot finish this request before its deadline"),
+    ],
+)
+def test_executor_rejects_bad_metadata_with_a_message(metadata, reason):
+    async def main():
+        executor = RecordingExecutor()
+        scheduled = ScheduledAgentExecutor(executor, AdmissionScheduler({"generate_image": 1}), lambda _: "generate_image")
+        message = Message(
+            role=Role.user, message_id="msg-1", parts=[Part(root=TextPart(text="a cat"))], metadata=metadata
+        )
+        event_queue = EventQueue()
+        await scheduled.execute(RequestContext(request=MessageSendParams(message=message)), event_queue)
+        events = []
+        while not event_queue.queue.empty():
+            events.append(await event_queue.dequeue_event())
+        return executor.ran, events
+
+    ran, events = asyncio.run(main())
+    assert ran == 0
+    assert isinstance(events[0], Task)
+    status = events[-1]
+    assert isinstance(status, TaskStatusUpdateEvent) and status.final
+    assert status.status.state == TaskState.rejected
+    assert reason in status.status.message.parts[0].root.text
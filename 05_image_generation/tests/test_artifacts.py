@@ -0,0 +1,77 @@
+import asyncio
+import base64
+import binascii
+import os
+import time
+
+import pytest
+
+from a2a.types import FileWithBytes
+
+import artifacts
+from artifacts import LazyImage
+
+IMAGE_BYTES = 24 * 1024 * 1024
+
+
+def lazy_image(data_b64: str) -> LazyImage:
+    return LazyImage(FileWithBytes(bytes=data_b64, mime_type="image/png", name="image.png"))
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # Small chunks so line breaks fall on and across chunk boundaries
+    monkeypatch.setattr(artifacts, "DECODE_CHUNK_CHARS", 10)
+
+
+def test_save_decodes_base64_with_line_breaks(tmp_path, small_chunks):
+    content = os.urandom(1000)
+    encoded = base64.encodebytes(content).decode("ascii")  # 76-character lines
+    assert "\n" in encoded
+
+    path = tmp_path / "image.png"
+    asyncio.run(lazy_image(encoded).save(str(path)))
+
+    assert path.read_bytes() == content
+    assert asyncio.run(lazy_image(encoded).read()) == content
+
+
+def test_save_rejects_invalid_base64(tmp_path, small_chunks):
+    encoded = base64.b64encode(os.urandom(100)).decode("ascii")
+    with pytest.raises(binascii.Error):
+        asyncio.run(lazy_image(encoded[:40] + "!" + encoded[40:]).save(str(tmp_path / "image.png")))
+    with pytest.raises(binascii.Error):
+        asyncio.run(lazy_image(encoded[:-1]).save(str(tmp_path / "image.png")))
+
+
+def test_decoding_in_the_pool_keeps_the_event_loop_responsive(tmp_path):
+    """Worst event-loop lag while a large image is decoded, on the loop vs. in the decode pool."""
+    encoded = base64.b64encode(os.urandom(IMAGE_BYTES)).decode("ascii")
+
+    async def worst_lag(decode) -> float:
+        lags = []
+
+        async def tick():
+            while True:
+                started = time.perf_counter()
+                await asyncio.sleep(0.001)
+                lags.append(time.perf_counter() - started - 0.001)
+
+        ticker = asyncio.create_task(tick())
+        await asyncio.sleep(0.01)
+        await decode()
+        await asyncio.sleep(0.01)  # Lets a tick held up by the decode report its lag
+        ticker.cancel()
+        return max(lags)
+
+    async def on_loop():
+        with open(tmp_path / "on_loop.png", "wb") as f:
+            f.write(base64.b64decode(encoded))
+
+    async def in_pool():
+        await lazy_image(encoded).save(str(tmp_path / "in_pool.png"))
+
+    blocked = asyncio.run(worst_lag(on_loop))
+    pooled = asyncio.run(worst_lag(in_pool))
+    print(f"\nworst loop lag decoding {IMAGE_BYTES >> 20} MiB: on the loop {blocked * 1000:.1f} ms, in the pool {pooled * 1000:.1f} ms")
+    assert pooled < blocked / 2
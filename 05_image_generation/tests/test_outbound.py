@@ -0,0 +1,112 @@
+# Canonical copy: 06_a2a_communication/tests/test_outbound.py; 05_image_generation/tests/
+# test_outbound.py mirrors it, apart from the import path. Edit both together.
+import asyncio
+import socket
+import statistics
+import time
+
+import httpx
+import pytest
+
+from outbound import OutboundPool
+
+CALLS = 200
+CONCURRENCY = 8
+
+
+async def serve_http(body: bytes = b"ok"):
+    """A minimal HTTP/1.1 server on localhost that keeps connections alive."""
+    connections = 0
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        nonlocal connections
+        connections += 1
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}/", lambda: connections
+
+
+async def latencies(call, url: str) -> list[float]:
+    """Runs `CALLS` calls, `CONCURRENCY` at a time, and returns each one's latency in milliseconds."""
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def timed() -> float:
+        async with semaphore:
+            started_at = time.perf_counter()
+            await call(url)
+            return (time.perf_counter() - started_at) * 1000
+
+    return await asyncio.gather(*(timed() for _ in range(CALLS)))
+
+
+def p99(samples: list[float]) -> float:
+    return statistics.quantiles(samples, n=100)[98]
+
+
+def test_shared_pool_p99_beats_a_client_per_call():
+    """Tail latency of calls through the shared pool, vs. an SDK-style new client for every call."""
+
+    async def main():
+        server, url, connections = await serve_http()
+        pool = OutboundPool(http2=False)
+        async with pool.client() as client:
+
+            async def shared(url: str) -> None:
+                (await client.get(url)).raise_for_status()
+
+            async def fresh(url: str) -> None:
+                async with httpx.AsyncClient() as own_client:
+                    (await own_client.get(url)).raise_for_status()
+
+            await shared(url)  # Leave the first connect out of both measurements
+            pooled = await latencies(shared, url)
+            pooled_connections = connections()
+            per_call = await latencies(fresh, url)
+        await pool.aclose()
+        server.close()
+        return pooled, pooled_connections, per_call, pool.metrics()
+
+    pooled, pooled_connections, per_call, metrics = asyncio.run(main())
+
+    print(
+        f"\n{CALLS} calls, {CONCURRENCY} at a time: shared pool p50 {statistics.median(pooled):.2f} ms, "
+        f"p99 {p99(pooled):.2f} ms over {pooled_connections} connections; "
+        f"client per call p50 {statistics.median(per_call):.2f} ms, p99 {p99(per_call):.2f} ms"
+    )
+    assert p99(pooled) < p99(per_call)
+    assert pooled_connections <= CONCURRENCY
+    assert metrics["requests"] == CALLS + 1
+    assert metrics["errors"] == 0
+    # Every connection after the first reuses the cached lookup
+    assert metrics["dns_cache"] == {"hits": pooled_connections - 1, "misses": 1}
+
+
+def test_pool_streams_responses_and_raises_httpx_errors():
+    async def main():
+        server, url, _ = await serve_http(body=b"x" * 100_000)
+        with socket.socket() as unused:
+            unused.bind(("127.0.0.1", 0))
+            closed_url = f"http://127.0.0.1:{unused.getsockname()[1]}/"
+        pool = OutboundPool(http2=False)
+        async with pool.client() as client:
+            async with client.stream("GET", url) as response:
+                body = b"".join([chunk async for chunk in response.aiter_bytes()])
+            with pytest.raises(httpx.ConnectError):
+                await client.get(closed_url)
+        await pool.aclose()
+        server.close()
+        return body, pool.metrics()
+
+    body, metrics = asyncio.run(main())
+
+    assert body == b"x" * 100_000
+    assert metrics["errors"] == 1
@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+import httpx
+
+from a2a.server.tasks import InMemoryPushNotificationConfigStore
+from a2a.types import PushNotificationConfig, Task, TaskState, TaskStatus
+
+from push_sender import QueuedPushNotificationSender
+
+
+def make_task(task_id: str, state: TaskState = TaskState.working) -> Task:
+    return Task(id=task_id, context_id=f"ctx-{task_id}", status=TaskStatus(state=state))
+
+
+class Webhooks:
+    """Answers webhook posts in-process and records what arrived, and when."""
+
+    def __init__(self, failures: dict[str, int] | None = None):
+        self.failures = failures or {}  # Task ID -> how many posts to fail first
+        self.received: list[tuple[str, str, float]] = []
+        self.started = time.monotonic()
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        task = Task.model_validate_json(request.content)
+        if self.failures.get(task.id, 0) > 0:
+            self.failures[task.id] -= 1
+            return httpx.Response(503)
+        self.received.append((task.id, task.status.state.value, time.monotonic() - self.started))
+        return httpx.Response(200)
+
+
+async def make_sender(webhooks: Webhooks, task_ids: list[str], **kwargs):
+    config_store = InMemoryPushNotificationConfigStore()
+    for task_id in task_ids:
+        await config_store.set_info(task_id, PushNotificationConfig(url="http://webhook.test/push"))
+    client = httpx.AsyncClient(transport=httpx.MockTransport(webhooks.handle))
+    return QueuedPushNotificationSender(client, config_store, **kwargs), client
+
+
+def test_retries_do_not_hold_up_the_worker():
+    async def main():
+        webhooks = Webhooks(failures={"slow": 2})
+        # One worker, so both tasks share it
+        sender, client = await make_sender(
+            webhooks, ["slow", "fast"], workers=1, batch_delay=0.0, retry_backoff=0.2
+        )
+        await sender.send_notification(make_task("slow"))
+        await sender.send_notification(make_task("fast"))
+        await asyncio.sleep(1.0)
+        await sender.close()
+        await client.aclose()
+        return {task_id: at for task_id, _, at in webhooks.received}
+
+    arrived = asyncio.run(main())
+    # "fast" is not delayed by the 0.2 s + 0.4 s of backoff that "slow" waits
+    assert arrived["fast"] < 0.1
+    assert arrived["slow"] >= 0.6
+
+
+def test_a_newer_state_supersedes_a_pending_retry():
+    async def main():
+        webhooks = Webhooks(failures={"task": 1})
+        sender, client = await make_sender(webhooks, ["task"], batch_delay=0.0, retry_backoff=0.3)
+        await sender.send_notification(make_task("task", TaskState.working))
+        await asyncio.sleep(0.1)
+        await sender.send_notification(make_task("task", TaskState.completed))
+        await asyncio.sleep(0.6)
+        await sender.close()
+        await client.aclose()
+        return [state for _, state, _ in webhooks.received]
+
+    # The retry of "working" would have arrived after "completed"
+    assert asyncio.run(main()) == ["completed"]
+
+
+def test_an_unexpected_error_drops_the_update_and_keeps_the_worker():
+    async def main():
+        webhooks = Webhooks()
+        sender, client = await make_sender(webhooks, ["broken", "ok"], workers=1, batch_delay=0.0)
+        real_get_info = sender.config_store.get_info
+
+        async def get_info(task_id: str):
+            if task_id == "broken":
+                raise RuntimeError("config store unavailable")
+            return await real_get_info(task_id)
+
+        sender.config_store.get_info = get_info
+        await sender.send_notification(make_task("broken"))
+        await sender.send_notification(make_task("ok"))
+        await asyncio.sleep(0.2)
+        await sender.close()
+        await client.aclose()
+        return [task_id for task_id, _, _ in webhooks.received]
+
+    assert asyncio.run(main()) == ["ok"]
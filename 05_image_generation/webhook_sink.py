@@ -0,0 +1,35 @@
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from a2a.types import Task, TaskState
+
+from client import WEBHOOK_TOKEN, WEBHOOK_URL, save_image_from_task
+
+WEBHOOK_PORT = 10015
+
+async def receive_notification(request: Request) -> JSONResponse:
+    """Receives a task update pushed by the agent server."""
+    if request.headers.get("X-A2A-Notification-Token") != WEBHOOK_TOKEN:
+        return JSONResponse({"error": "Invalid notification token."}, status_code=401)
+
+    task = Task.model_validate(await request.json())
+    status_text = ""
+    if task.status.message and task.status.message.parts:
+        status_text = getattr(task.status.message.parts[0].root, "text", "")
+    print(f"  [PUSH] Task {task.id}: {task.status.state.upper()} {status_text}")
+
+    if task.status.state == TaskState.completed and task.artifacts:
+        output_filename = f"pushed_image_{task.id}.png"
+        await save_image_from_task(task, output_filename)
+        print(f"  [PUSH] Saved image to '{output_filename}'")
+
+    return JSONResponse({"received": True})
+
+app = Starlette(routes=[Route("/webhook", receive_notification, methods=["POST"])])
+
+if __name__ == "__main__":
+    print(f"Starting local webhook sink on {WEBHOOK_URL}")
+    uvicorn.run(app, host="0.0.0.0", port=WEBHOOK_PORT)
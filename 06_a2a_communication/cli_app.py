@@ -1,24 +1,86 @@
+import argparse
 import asyncio
+import grpc
 import httpx
 from uuid import uuid4
 
 from a2a.client import Client, ClientConfig, ClientFactory, A2ACardResolver
-from a2a.types import Message, Part, Role, TextPart, TransportProtocol, Task
+from a2a.types import AgentCard, Message, Part, Role, TextPart, TransportProtocol, Task
+
+from debaters.agents_config import AGENTS_CONFIG
+from discovery.registry_client import REGISTRY_URL, AgentDirectory, watched_directory
+from servers.loopback import LOOPBACK_TRANSPORT, register_loopback, serve_in_process
 
 LANGGRAPH_AGENT_URL = "http://localhost:10006"
 OPENAI_AGENT_URL = "http://localhost:10007"
 
+# The personas taking the opening and the responding side, as registered by the debater servers
+OPENING_DEBATER = AGENTS_CONFIG["einstein"]["name"]
+RESPONDING_DEBATER = AGENTS_CONFIG["newton"]["name"]
+
 DEBATE_TOPIC = "What drives the rise and fall of civilizations: economic class struggle or social cohesion (asabiyyah)"
 DEBATE_TURNS = 5 # The number of times each agent will speak
 
+def create_a2a_client(agent_card: AgentCard) -> Client:
+    """Returns an A2A client instance for an already discovered agent."""
+    # Prefer an in-process agent, then gRPC, and fall back to JSON-RPC
+    config = ClientConfig(
+        streaming=False,
+        supported_transports=[LOOPBACK_TRANSPORT, TransportProtocol.grpc, TransportProtocol.jsonrpc],
+        use_client_preference=True,
+        grpc_channel_factory=grpc.aio.insecure_channel,
+    )
+    factory = register_loopback(ClientFactory(config))
+    print(f"Successfully discovered agent: {agent_card.name}")
+    return factory.create(agent_card)
+
 async def get_a2a_client(http_client: httpx.AsyncClient, agent_url: str) -> Client:
     """Discovers an agent and returns an A2A client instance for it."""
-    config = ClientConfig(streaming=False, supported_transports=[TransportProtocol.jsonrpc])
-    factory = ClientFactory(config)
     card_resolver = A2ACardResolver(http_client, agent_url)
     agent_card = await card_resolver.get_agent_card()
-    print(f"Successfully discovered agent: {agent_card.name}")
-    return factory.create(agent_card)
+    return create_a2a_client(agent_card)
+
+async def discover_debaters(
+    http_client: httpx.AsyncClient, directory: AgentDirectory | None = None
+) -> tuple[Client, Client]:
+    """
+    Finds the opening and the responding debater through the agent registry
+    when a directory is given, otherwise falls back to the fixed agent URLs.
+    """
+    if directory is not None:
+        try:
+            debaters = {card.name: card for card in await directory.find("debate")}
+        except httpx.HTTPError as e:
+            print(f"The agent registry is unavailable ({e!r}); using the fixed agent URLs.")
+        else:
+            # Each side is chosen by persona; the registry's order says nothing about roles
+            if OPENING_DEBATER in debaters and RESPONDING_DEBATER in debaters:
+                return create_a2a_client(debaters[OPENING_DEBATER]), create_a2a_client(debaters[RESPONDING_DEBATER])
+            print(f"{OPENING_DEBATER} and {RESPONDING_DEBATER} are not both registered; using the fixed agent URLs.")
+
+    return await asyncio.gather(
+        get_a2a_client(http_client, LANGGRAPH_AGENT_URL),
+        get_a2a_client(http_client, OPENAI_AGENT_URL),
+    )
+
+def create_in_process_debaters() -> tuple[Client, Client]:
+    """
+    Runs both debater executors in this process and connects to them through
+    the loopback transport, so no turn goes through HTTP or JSON serialization.
+    """
+    # Imported here so the default, networked mode does not load both agent stacks
+    from a2a.server.request_handlers import DefaultRequestHandler
+    from a2a.server.tasks import InMemoryTaskStore
+    from servers import langgraph_agent_server, openai_agent_server
+
+    clients = []
+    for server, executor_class in [
+        (langgraph_agent_server, langgraph_agent_server.LangGraphExecutor),
+        (openai_agent_server, openai_agent_server.OpenAIExecutor),
+    ]:
+        request_handler = DefaultRequestHandler(agent_executor=executor_class(), task_store=InMemoryTaskStore())
+        clients.append(create_a2a_client(serve_in_process(server.agent_card, request_handler)))
+    return clients[0], clients[1]
 
 async def send_message_and_get_response(
     client: Client, message_text: str, context_id: str
@@ -43,16 +105,20 @@ async def send_message_and_get_response(
     
     return "Error: Agent did not provide a valid response."
 
-async def main():
+async def main(in_process: bool = False):
     # Use a single httpx client for all communications
-    async with httpx.AsyncClient(timeout=120.0) as async_client:
+    async with (
+        httpx.AsyncClient(timeout=120.0) as async_client,
+        # One directory for the whole run, kept current by the registry's change events
+        watched_directory(async_client, None if in_process else REGISTRY_URL) as directory,
+    ):
 
         # 1. Discover and create clients for both agents
         print("\n--> Discovering agents...")
-        langgraph_client, openai_client = await asyncio.gather(
-            get_a2a_client(async_client, LANGGRAPH_AGENT_URL),
-            get_a2a_client(async_client, OPENAI_AGENT_URL),
-        )
+        if in_process:
+            langgraph_client, openai_client = create_in_process_debaters()
+        else:
+            langgraph_client, openai_client = await discover_debaters(async_client, directory)
 
         # 2. Start the debate
         debate_id = f"debate-{uuid4()}"
@@ -94,4 +160,12 @@ async def main():
         print("\n--- Debate Concluded ---")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Runs a debate between two A2A agents.")
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Run both debaters inside this process instead of connecting to their servers.",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(in_process=args.in_process))
\ No newline at end of file
@@ -0,0 +1,113 @@
+import asyncio
+import queue
+import threading
+from uuid import uuid4
+
+import grpc
+import httpx
+
+from a2a.client import Client, ClientConfig, ClientFactory, A2ACardResolver
+from a2a.types import AgentCard, Message, Part, Role, TextPart, TransportProtocol, Task
+
+
+class DebateRunner:
+    """
+    Runs all A2A traffic for the Streamlit app on one background event loop.
+
+    Streamlit reruns the script on every interaction, so creating an event loop
+    and an HTTP client per click would reconnect to the agents every time. The
+    runner owns a single loop thread, one pooled `httpx.AsyncClient` and one A2A
+    `Client` per agent, all shared by every browser session.
+    """
+
+    def __init__(self, timeout: float = 240.0):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="a2a-runner", daemon=True)
+        self.thread.start()
+        self.http_client: httpx.AsyncClient = self.run(self._create_http_client(timeout))
+        self.clients: dict[str, Client] = {}
+        self.cards: dict[str, AgentCard] = {}
+
+    async def _create_http_client(self, timeout: float) -> httpx.AsyncClient:
+        # Created on the runner loop, which is the only loop that ever uses it
+        return httpx.AsyncClient(timeout=timeout)
+
+    def run(self, coro):
+        """Runs a coroutine on the runner loop and waits for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def _get_client(self, agent_url: str) -> Client:
+        """Discovers an agent once and reuses its client afterwards."""
+        if agent_url not in self.clients:
+            card_resolver = A2ACardResolver(self.http_client, agent_url)
+            agent_card = await card_resolver.get_agent_card()
+            config = ClientConfig(
+                httpx_client=self.http_client,
+                streaming=False,
+                supported_transports=[TransportProtocol.grpc, TransportProtocol.jsonrpc],
+                use_client_preference=True,
+                grpc_channel_factory=grpc.aio.insecure_channel,
+            )
+            self.clients[agent_url] = ClientFactory(config).create(agent_card)
+            self.cards[agent_url] = agent_card
+        return self.clients[agent_url]
+
+    def fetch_cards(self, *agent_urls: str) -> list[AgentCard]:
+        """Returns the agent cards, discovering any agent not seen before."""
+        async def fetch():
+            await asyncio.gather(*(self._get_client(url) for url in agent_urls))
+            return [self.cards[url] for url in agent_urls]
+
+        return self.run(fetch())
+
+    def start_debate(self, topic: str, turns: int, first_url: str, second_url: str) -> queue.Queue:
+        """
+        Starts a debate in the background and returns a queue of its events.
+
+        The queue receives `("turn", speaker_name, response)` for every turn as
+        soon as it completes, then `("done", None, None)`, or
+        `("error", None, message)` if the debate fails.
+        """
+        events: queue.Queue = queue.Queue()
+
+        async def debate():
+            try:
+                speakers = []
+                for url in (first_url, second_url):
+                    client = await self._get_client(url)
+                    speakers.append((self.cards[url].name, client))
+                debate_id = f"debate-{uuid4()}"
+                current_message = f"Let's debate the topic: {topic}."
+                for i in range(turns * 2):
+                    speaker_name, client = speakers[i % 2]
+                    response = await send_message_and_get_response(client, current_message, debate_id)
+                    events.put(("turn", speaker_name, response))
+                    current_message = response
+                events.put(("done", None, None))
+            except Exception as e:
+                events.put(("error", None, str(e)))
+
+        asyncio.run_coroutine_threadsafe(debate(), self.loop)
+        return events
+
+
+async def send_message_and_get_response(client: Client, message_text: str, context_id: str) -> str:
+    """Sends a message to an agent and extracts the text response from the artifact."""
+    user_message = Message(
+        role=Role.user,
+        parts=[Part(root=TextPart(text=message_text))],
+        message_id=str(uuid4()),
+        context_id=context_id,
+    )
+
+    final_task_object = None
+    async for event in client.send_message(request=user_message):
+        if isinstance(event, tuple):
+            final_task_object = event[0]
+        else:
+            final_task_object = event
+
+    if isinstance(final_task_object, Task) and final_task_object.artifacts:
+        return final_task_object.artifacts[0].parts[0].root.text
+
+    return "Error: Agent did not provide a valid response."
@@ -0,0 +1,102 @@
+# Canonical copy: 06_a2a_communication/debaters/context_locks.py; 04_interactive_agent/context_locks.py
+# mirrors it. Each example project is standalone, so edit both and keep them identical.
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class ConcurrentTurns(str, Enum):
+    """What to do with a turn that arrives while its context is already busy."""
+    queue = "queue"        # Run it after the turns ahead of it
+    coalesce = "coalesce"  # Share the result of an identical turn already pending, otherwise queue
+    reject = "reject"      # Refuse it
+
+
+class ContextBusy(Exception):
+    """Raised when a turn is refused because its context is busy."""
+
+
+@dataclass
+class _ContextEntry:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    users: int = 0  # Turns running or waiting on this context
+    pending: dict[str, asyncio.Future] = field(default_factory=dict)  # Result of each pending turn, by turn key
+
+
+class ContextLocks:
+    """
+    Runs the turns of each conversation one at a time.
+
+    Turns on different contexts run concurrently. An entry exists only while a
+    context has turns running or waiting, so memory is bounded by the number
+    of active conversations rather than by every context ever seen.
+
+    Args:
+        policy (ConcurrentTurns): How to handle a turn that arrives while its context is busy.
+        max_waiting (int): Most turns that may queue behind a running one on the same context.
+    """
+
+    def __init__(self, policy: ConcurrentTurns = ConcurrentTurns.queue, max_waiting: int = 4):
+        self.policy = policy
+        self.max_waiting = max_waiting
+        self._entries: dict[str, _ContextEntry] = {}
+        self.coalesced = 0
+        self.rejected = 0
+
+    async def run(self, context_id: str, turn_key: str, turn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs `turn()` once every earlier turn on the context has finished.
+
+        Args:
+            context_id (str): The conversation the turn belongs to.
+            turn_key (str): Identifies duplicates of one turn, such as the message ID,
+                which a client retry reuses. Distinct turns must get distinct keys,
+                even when their text is the same.
+            turn (Callable[[], Awaitable[T]]): Starts the turn; only called if the turn runs.
+
+        Raises:
+            ContextBusy: If the turn is refused.
+        """
+        entry = self._entries.setdefault(context_id, _ContextEntry())
+
+        if self.policy == ConcurrentTurns.coalesce and turn_key in entry.pending:
+            self.coalesced += 1
+            return await asyncio.shield(entry.pending[turn_key])
+
+        if entry.users and (self.policy == ConcurrentTurns.reject or entry.users > self.max_waiting):
+            self.rejected += 1
+            raise ContextBusy(f"Another turn is already in progress for context '{context_id}'.")
+
+        result = asyncio.get_running_loop().create_future()
+        # Mark a failure as retrieved even when no duplicate turn awaits it
+        result.add_done_callback(lambda f: f.cancelled() or f.exception())
+        entry.pending[turn_key] = result
+        entry.users += 1
+        try:
+            async with entry.lock:
+                value = await turn()
+            result.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            result.cancel()
+            raise
+        except Exception as e:
+            result.set_exception(e)
+            raise
+        finally:
+            entry.users -= 1
+            if entry.pending.get(turn_key) is result:
+                del entry.pending[turn_key]
+            if entry.users == 0:
+                del self._entries[context_id]
+
+    def stats(self) -> dict:
+        return {
+            "active_contexts": len(self._entries),
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+        }
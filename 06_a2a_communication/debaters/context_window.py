@@ -0,0 +1,169 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimates the token count of a text (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def _first_sentence(text: str, max_chars: int = 200) -> str:
+    """Returns the first sentence of a text, clipped to `max_chars`."""
+    sentence = text.strip().split(". ", 1)[0].rstrip(".")
+    if len(sentence) > max_chars:
+        return sentence[:max_chars].rstrip() + "..."
+    return sentence + "."
+
+
+@dataclass
+class ToolCall:
+    """A tool call made while answering a turn, with its result."""
+    call_id: str
+    name: str
+    arguments: str  # JSON-encoded arguments, as the model sent them
+    output: str
+
+
+@dataclass
+class Turn:
+    """A single message in a debate thread with its token count cached."""
+    role: str  # "user" (the opponent), "assistant" (this debater) or "tool"
+    text: str
+    tokens: int
+    tool_call: ToolCall | None = None  # Set on "tool" turns
+
+
+@dataclass
+class ThreadContext:
+    """The recent turns and the running summary of one debate thread."""
+    turns: list[Turn] = field(default_factory=list)
+    turn_tokens: int = 0
+    summary_lines: list[Turn] = field(default_factory=list)
+    summary_tokens: int = 0
+    last_used: float = 0.0
+
+
+class ContextWindow:
+    """
+    Keeps the history sent to a debater within a fixed token budget.
+
+    Recent turns are kept verbatim, including the tool calls made while
+    answering them. When they outgrow the budget, the oldest exchange is folded
+    into a short extractive summary, so each turn costs roughly the same number
+    of prompt tokens no matter how long the debate runs.
+
+    Threads are kept in least-recently-used order. A thread idle for longer than
+    `idle_ttl`, or beyond the `max_threads` most recently used, is forgotten.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 2000,
+        summary_budget: int = 400,
+        min_recent_turns: int = 4,
+        count_tokens=estimate_tokens,
+        max_threads: int = 1024,
+        idle_ttl: float = 3600.0,
+    ):
+        """
+        Args:
+            token_budget (int): Maximum tokens of history (summary plus recent turns).
+            summary_budget (int): Maximum tokens kept in the running summary.
+            min_recent_turns (int): User and assistant turns that are always kept verbatim.
+            count_tokens: Callable returning the token count of a text.
+            max_threads (int): Most threads kept at once.
+            idle_ttl (float): Seconds after its last turn that a thread is forgotten.
+        """
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.min_recent_turns = min_recent_turns
+        self.count_tokens = count_tokens
+        self.max_threads = max_threads
+        self.idle_ttl = idle_ttl
+        self.threads: OrderedDict[str, ThreadContext] = OrderedDict()
+
+    def _evict(self, now: float) -> None:
+        """Forgets the threads that have been idle too long or are beyond `max_threads`."""
+        while self.threads:
+            ctx = next(iter(self.threads.values()))
+            if len(self.threads) <= self.max_threads and now - ctx.last_used <= self.idle_ttl:
+                break
+            self.threads.popitem(last=False)
+
+    def _get_thread(self, thread_id: str) -> ThreadContext:
+        """Gets or creates the context for a given thread ID and marks it as used."""
+        now = time.monotonic()
+        ctx = self.threads.get(thread_id)
+        if ctx is None or now - ctx.last_used > self.idle_ttl:
+            ctx = self.threads[thread_id] = ThreadContext()
+        ctx.last_used = now
+        self.threads.move_to_end(thread_id)
+        self._evict(now)
+        return ctx
+
+    def messages(self, thread_id: str, query: str) -> list[Turn]:
+        """
+        Builds the turns to send to the model for a new query, ending with the query.
+
+        The running summary, if any, is prepended to the first user message.
+        """
+        ctx = self._get_thread(thread_id)
+        messages = [*ctx.turns, Turn(role="user", text=query, tokens=self.count_tokens(query))]
+
+        if ctx.summary_lines:
+            summary = "\n".join(line.text for line in ctx.summary_lines)
+            first = messages[0]
+            text = f"Summary of the debate so far:\n{summary}\n\n{first.text}"
+            messages[0] = Turn(role=first.role, text=text, tokens=first.tokens + ctx.summary_tokens)
+        return messages
+
+    def prompt_tokens(self, thread_id: str) -> int:
+        """Returns the cached token count of the history for a thread."""
+        ctx = self.threads.get(thread_id)
+        return ctx.turn_tokens + ctx.summary_tokens if ctx else 0
+
+    def add_exchange(
+        self, thread_id: str, query: str, response: str, tool_calls: list[ToolCall] | None = None
+    ) -> None:
+        """
+        Records a completed exchange and compacts the thread if needed.
+
+        Args:
+            thread_id (str): The debate thread.
+            query (str): The opponent's message.
+            response (str): This debater's answer.
+            tool_calls (list[ToolCall] | None): Tool calls made while answering, in order.
+        """
+        ctx = self._get_thread(thread_id)
+        turns = [Turn(role="user", text=query, tokens=self.count_tokens(query))]
+        for call in tool_calls or []:
+            turns.append(Turn(role="tool", text=call.output, tokens=self.count_tokens(call.output), tool_call=call))
+        turns.append(Turn(role="assistant", text=response, tokens=self.count_tokens(response)))
+        ctx.turns.extend(turns)
+        ctx.turn_tokens += sum(turn.tokens for turn in turns)
+        self._compact(ctx)
+
+    def _compact(self, ctx: ThreadContext) -> None:
+        """Folds the oldest exchanges into the summary until the thread fits the budget."""
+        while ctx.turn_tokens + ctx.summary_tokens > self.token_budget:
+            # Fold a whole exchange, from its user turn to its answer, so the
+            # window always starts with a user turn
+            end = next(i for i, turn in enumerate(ctx.turns) if turn.role == "assistant") + 1
+            dialogue_turns = sum(turn.role != "tool" for turn in ctx.turns)
+            if dialogue_turns - 2 < self.min_recent_turns:
+                break
+            for turn in ctx.turns[:end]:
+                if turn.role == "tool":
+                    line = f"You looked up {turn.tool_call.name} {turn.tool_call.arguments}: {_first_sentence(turn.text)}"
+                else:
+                    speaker = "Opponent" if turn.role == "user" else "You"
+                    line = f"{speaker}: {_first_sentence(turn.text)}"
+                ctx.summary_lines.append(Turn(role=turn.role, text=line, tokens=self.count_tokens(line)))
+                ctx.summary_tokens += ctx.summary_lines[-1].tokens
+                ctx.turn_tokens -= turn.tokens
+            del ctx.turns[:end]
+
+            # The oldest summary lines are dropped first once the summary is full
+            while ctx.summary_tokens > self.summary_budget and len(ctx.summary_lines) > 1:
+                ctx.summary_tokens -= ctx.summary_lines.pop(0).tokens
@@ -1,22 +1,35 @@
+import json
 import os
 
+from langchain_core.language_models import BaseChatModel
 from langchain_core.tools import tool
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
 
-from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.prebuilt import ToolNode, create_react_agent
 
 from tavily import AsyncTavilyClient
 from dotenv import load_dotenv
 
+from debaters.context_window import ContextWindow, ToolCall, Turn
+from debaters.outbound import outbound_pool
+from debaters.prompt_cache import prompt_cache_registry
+from debaters.search_compaction import compacted_search
+from debaters.tool_limits import ToolTimeout, limit_tool
+
 _ = load_dotenv()
 
 os.environ["GOOGLE_API_KEY"] = os.getenv("GOOGLE_API_KEY")
 
-tavily_client = AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+# Searches reuse pooled connections instead of opening a new one per call
+tavily_client = AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"), client=outbound_pool.client())
+
+# Limits for concurrent web searches issued in a single model step
+SEARCH_MAX_CONCURRENCY = 3
+SEARCH_TIMEOUT = 15.0
 
 # Tool for web search
 @tool
+@limit_tool(max_concurrency=SEARCH_MAX_CONCURRENCY, timeout=SEARCH_TIMEOUT)
 async def search(query: str) -> str:
     """
     Searches the web for the given query.
@@ -24,20 +37,77 @@ async def search(query: str) -> str:
         query (str): The query to search for.
     """
     print(f"\nSearching for: {query}\n")
-    return await tavily_client.search(query, search_depth="basic", max_results=3)
+    # Only the relevant snippets reach the model, not the raw results with URLs and scores
+    return await compacted_search(tavily_client, query)
+
+def _to_messages(turns: list[Turn]) -> list[BaseMessage]:
+    """Converts history turns to LangChain messages, replaying each group of tool calls."""
+    messages: list[BaseMessage] = []
+    calls: list[Turn] = []
+
+    def replay_calls():
+        # One model step that requested the calls, then their results
+        if calls:
+            messages.append(AIMessage(content="", tool_calls=[
+                {"name": t.tool_call.name, "args": json.loads(t.tool_call.arguments), "id": t.tool_call.call_id}
+                for t in calls
+            ]))
+            messages.extend(
+                ToolMessage(content=t.text, tool_call_id=t.tool_call.call_id, name=t.tool_call.name) for t in calls
+            )
+            calls.clear()
+
+    for turn in turns:
+        if turn.role == "tool":
+            calls.append(turn)
+            continue
+        replay_calls()
+        messages.append(HumanMessage(content=turn.text) if turn.role == "user" else AIMessage(content=turn.text))
+    replay_calls()
+    return messages
+
+def _tool_calls(messages: list[BaseMessage]) -> list[ToolCall]:
+    """The successful tool calls among the messages of a run, in the order their results arrived."""
+    requested = {}
+    tool_calls = []
+    for message in messages:
+        if isinstance(message, AIMessage):
+            requested.update({call["id"]: call for call in message.tool_calls})
+        elif isinstance(message, ToolMessage) and message.status != "error" and message.tool_call_id in requested:
+            call = requested[message.tool_call_id]
+            tool_calls.append(ToolCall(
+                call_id=call["id"], name=call["name"], arguments=json.dumps(call["args"]), output=str(message.content)
+            ))
+    return tool_calls
 
 # Agent Wrapper
 class LangGraphAgent:
     """A class that encapsulates the LangGraph agent."""
 
-    def __init__(self, name: str, prompt: str):
-        """Initializes the agent."""
-        self.checkpointer = InMemorySaver()
+    def __init__(
+        self,
+        name: str,
+        prompt: str,
+        context_window: ContextWindow | None = None,
+        model: BaseChatModel | str = "google_genai:gemini-2.0-flash",
+    ):
+        """
+        Initializes the agent.
+
+        Pass a chat model instance as `model` to share one model client among
+        several agents in the same process.
+        """
+        # The context window keeps the debate history per thread within a token budget,
+        # so the graph itself runs without a checkpointer.
+        self.context_window = context_window or ContextWindow()
+        # The static prompt is always sent first, so Gemini can serve it from its
+        # prefix cache; the registry tracks it once for all threads.
+        self.prompt_cache = prompt_cache_registry.register(prompt)
         self.agent = create_react_agent(
-            model="google_genai:gemini-2.0-flash",
+            model=model,
             name=name,
-            tools=[search],
-            checkpointer=self.checkpointer,
+            # A timed-out search reaches the model as an error message, not as a search result
+            tools=ToolNode([search], handle_tool_errors=(ToolTimeout,)),
             prompt=prompt,
         )
 
@@ -45,10 +115,19 @@ class LangGraphAgent:
         """
         Runs the agent's response for a given query and thread_id.
         """
-        inputs = {"messages": [HumanMessage(content=query)]}
+        messages = _to_messages(self.context_window.messages(thread_id, query))
+
+        response = await self.agent.ainvoke({"messages": messages})
+        response_text = response["messages"][-1].content
 
-        # The config dictionary specifies the thread_id for persistence.
-        config = {"configurable": {"thread_id": thread_id}}
+        # Each new AIMessage is one model call, with the input tokens the provider served from its cache
+        new_messages = response["messages"][len(messages):]
+        for message in new_messages:
+            if isinstance(message, AIMessage):
+                usage = message.usage_metadata or {}
+                self.prompt_cache.record_call(usage.get("input_token_details", {}).get("cache_read", 0))
 
-        response = await self.agent.ainvoke(inputs, config=config)
-        return response["messages"][-1].content
\ No newline at end of file
+        # Search results stay in the history, so later turns can build on them
+        tool_calls = _tool_calls(new_messages)
+        self.context_window.add_exchange(thread_id, query, response_text, tool_calls)
+        return response_text
\ No newline at end of file
@@ -2,20 +2,32 @@ import os
 from dotenv import load_dotenv
 
 # OpenAI Agents SDK imports
-from agents import Agent, Runner, SQLiteSession, function_tool, set_tracing_disabled
+from agents import Agent, Model, RunItem, Runner, ToolCallItem, ToolCallOutputItem, function_tool, set_tracing_disabled
 from agents.extensions.models.litellm_model import LitellmModel
 
 from tavily import AsyncTavilyClient
 
+from debaters.context_window import ContextWindow, ToolCall, Turn
+from debaters.outbound import outbound_pool
+from debaters.prompt_cache import prompt_cache_registry
+from debaters.search_compaction import compacted_search
+from debaters.tool_limits import limit_tool
+
 _ = load_dotenv()
 
 # Disable OpenAI tracing
 set_tracing_disabled(True)
 
-tavily_client = AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+# Searches reuse pooled connections instead of opening a new one per call
+tavily_client = AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"), client=outbound_pool.client())
+
+# Limits for concurrent web searches issued in a single model step
+SEARCH_MAX_CONCURRENCY = 3
+SEARCH_TIMEOUT = 15.0
 
-# Tool for web search
+# Tool for web search. The SDK reports a raised `ToolTimeout` to the model as a failed call.
 @function_tool
+@limit_tool(max_concurrency=SEARCH_MAX_CONCURRENCY, timeout=SEARCH_TIMEOUT)
 async def search(query: str) -> str:
     """
     Searches the web for the given query.
@@ -23,29 +35,65 @@ async def search(query: str) -> str:
         query (str): The query to search for.
     """
     print(f"\nSearching for: {query}\n")
-    return await tavily_client.search(query, search_depth="basic", max_results=3)
+    # Only the relevant snippets reach the model, not the raw results with URLs and scores
+    return await compacted_search(tavily_client, query)
+
+def _to_input_items(turns: list[Turn]) -> list[dict]:
+    """Converts history turns to Runner input items, replaying each tool call with its output."""
+    items = []
+    for turn in turns:
+        if turn.role == "tool":
+            call = turn.tool_call
+            items.append({"type": "function_call", "call_id": call.call_id, "name": call.name, "arguments": call.arguments})
+            items.append({"type": "function_call_output", "call_id": call.call_id, "output": turn.text})
+        else:
+            items.append({"role": turn.role, "content": turn.text})
+    return items
+
+def _tool_calls(items: list[RunItem]) -> list[ToolCall]:
+    """The function calls made during a run, in the order their outputs arrived."""
+    requested = {}
+    tool_calls = []
+    for item in items:
+        if isinstance(item, ToolCallItem) and hasattr(item.raw_item, "call_id"):
+            requested[item.raw_item.call_id] = item.raw_item
+        elif isinstance(item, ToolCallOutputItem) and item.raw_item.get("call_id") in requested:
+            call = requested[item.raw_item["call_id"]]
+            tool_calls.append(ToolCall(
+                call_id=call.call_id, name=call.name, arguments=call.arguments, output=str(item.raw_item["output"])
+            ))
+    return tool_calls
+
+def create_model() -> Model:
+    """Creates the Gemini model client used by the debaters."""
+    return LitellmModel(model="gemini/gemini-2.0-flash", api_key=os.getenv("GOOGLE_API_KEY"))
 
 # Agent Wrapper
 class OpenAIAgent:
     """A wrapper for the OpenAI Agent."""
-    def __init__(self, name: str, prompt: str):
-        self.session_store = {}
+    def __init__(self, name: str, prompt: str, context_window: ContextWindow | None = None, model: Model | None = None):
+        # A `model` instance can be shared among several agents in the same process
+        # The context window keeps the debate history per session within a token budget
+        self.context_window = context_window or ContextWindow()
+        # The static instructions are always sent first, so Gemini can serve them from
+        # its prefix cache; the registry tracks them once for all sessions.
+        self.prompt_cache = prompt_cache_registry.register(prompt)
         self.agent = Agent(
             name=name,
             instructions=prompt,
-            model=LitellmModel(model="gemini/gemini-2.0-flash", api_key=os.getenv("GOOGLE_API_KEY")),
+            model=model or create_model(),
             tools=[search],
         )
 
-    def _get_session(self, session_id: str) -> SQLiteSession:
-        """Gets or creates a session for a given ID."""
-        if session_id not in self.session_store:
-            # Using a unique in-memory database for each session
-            self.session_store[session_id] = SQLiteSession(session_id=session_id)
-        return self.session_store[session_id]
-
     async def run(self, query: str, session_id: str):
         """Runs the agent and returns the final output."""
-        session = self._get_session(session_id)
-        result = await Runner.run(self.agent, query, session=session)
+        input_items = _to_input_items(self.context_window.messages(session_id, query))
+        result = await Runner.run(self.agent, input_items)
+
+        # One raw response per model call, with the input tokens the provider served from its cache
+        for response in result.raw_responses:
+            self.prompt_cache.record_call(response.usage.input_tokens_details.cached_tokens or 0)
+
+        # Search results stay in the history, so later turns can build on them
+        self.context_window.add_exchange(session_id, query, result.final_output, _tool_calls(result.new_items))
         return result.final_output
@@ -0,0 +1,257 @@
+# Canonical copy: 06_a2a_communication/debaters/outbound.py; 05_image_generation/outbound.py
+# mirrors it. Each example project is standalone, so edit both and keep them identical.
+import asyncio
+import importlib.util
+import socket
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+import httpcore
+import httpx
+
+# HTTP/2 needs the optional `h2` package (`httpx[http2]`); without it the pool speaks HTTP/1.1
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Origins of the APIs the agents call, for pre-warming
+GEMINI_API = "https://generativelanguage.googleapis.com"
+TAVILY_API = "https://api.tavily.com"
+
+
+class CachingResolver(httpcore.AsyncNetworkBackend):
+    """
+    A network backend that resolves each host once per `ttl` seconds.
+
+    Without it every new connection does its own DNS lookup. The connection
+    still uses the host name for TLS, so only the lookup is cached.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._backend = httpcore.AnyIOBackend()
+        self._addresses: dict[tuple[str, int], tuple[float, list[str]]] = {}
+
+    async def _resolve(self, host: str, port: int) -> list[str]:
+        entry = self._addresses.get((host, port))
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except OSError as e:
+            raise httpcore.ConnectError(str(e)) from e
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._addresses[(host, port)] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        error = None
+        for address in await self._resolve(host, port):
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        # None of the cached addresses answered, so look the host up again next time
+        self._addresses.pop((host, port), None)
+        raise error or httpcore.ConnectError(f"No addresses found for {host}")
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+@contextmanager
+def _as_httpx_errors():
+    """Raises httpcore's transport errors as the `httpx` errors of the same name, as `httpx` itself does."""
+    try:
+        yield
+    except Exception as e:
+        for cls in type(e).__mro__:
+            error = getattr(httpx, cls.__name__, None) if cls.__module__.startswith("httpcore") else None
+            if isinstance(error, type) and issubclass(error, httpx.TransportError):
+                raise error(str(e)) from e
+        raise
+
+
+class _PoolResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream):
+        self._stream = stream
+
+    async def __aiter__(self):
+        with _as_httpx_errors():
+            async for chunk in self._stream:
+                yield chunk
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+
+class _PoolTransport(httpx.AsyncBaseTransport):
+    """
+    An `httpx` transport over one `httpcore` connection pool.
+
+    `httpx.AsyncHTTPTransport` builds its own pool and takes no network
+    backend, so this transport builds the pool itself, with the caching
+    resolver, and does the same request and error translation.
+    """
+
+    def __init__(self, limits: httpx.Limits, http2: bool, resolver: CachingResolver):
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http2=http2,
+            retries=1,
+            network_backend=resolver,
+        )
+
+    @property
+    def connections(self) -> list:
+        return self._pool.connections
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _as_httpx_errors():
+            response = await self._pool.handle_async_request(core_request)
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_PoolResponseStream(response.stream),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """The pool as handed to a client. Closing the client leaves the pool open."""
+
+    def __init__(self, pool: "OutboundPool"):
+        self.pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.pool.requests += 1
+        self.pool.waiting += 1
+        try:
+            return await self.pool._transport.handle_async_request(request)
+        except httpx.TransportError:
+            self.pool.errors += 1
+            raise
+        finally:
+            self.pool.waiting -= 1
+
+    async def aclose(self) -> None:
+        pass
+
+
+class OutboundPool:
+    """
+    One connection pool for the outbound HTTP calls of the process.
+
+    SDK clients normally build their own `httpx` client each, some of them per
+    call, so connections are not reused between them and every new connection
+    pays for DNS, TCP and TLS again. Clients created with `client()`, or given
+    `transport()`, all share this pool instead:
+
+    - Explicit limits on connections and keep-alive.
+    - HTTP/2 when `h2` is installed, so concurrent calls to one API share a connection.
+    - DNS results cached for `dns_ttl` seconds.
+    - `prewarm()` opens the connections to known APIs at startup.
+
+    Args:
+        max_connections (int): Connections open at once, over all hosts.
+        max_keepalive_connections (int): Idle connections kept open for reuse.
+        keepalive_expiry (float): Seconds an idle connection is kept.
+        dns_ttl (float): Seconds a DNS lookup is reused.
+        http2 (bool): Whether to negotiate HTTP/2 with servers that support it.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 60.0,
+        dns_ttl: float = 300.0,
+        http2: bool = HTTP2_AVAILABLE,
+    ):
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.resolver = CachingResolver(ttl=dns_ttl)
+        self._transport = _PoolTransport(self.limits, http2, self.resolver)
+        self.requests = 0
+        self.errors = 0
+        self.waiting = 0  # Requests waiting for a connection or for response headers
+
+    def transport(self) -> httpx.AsyncBaseTransport:
+        """A transport over the pool for SDKs that build their own `httpx.AsyncClient`."""
+        return _SharedTransport(self)
+
+    def client(self, **kwargs) -> httpx.AsyncClient:
+        """Creates an `httpx.AsyncClient` on the pool; `kwargs` go to its constructor."""
+        return httpx.AsyncClient(transport=self.transport(), **kwargs)
+
+    async def prewarm(self, origins: list[str], timeout: float = 5.0) -> None:
+        """Connects to each origin ahead of the first real request. Failures are only logged."""
+        # One connection carries every request to an origin over HTTP/2
+        per_origin = 1 if self.http2 else 2
+        targets = [origin for origin in origins for _ in range(per_origin)]
+        async with self.client(timeout=timeout) as client:
+            results = await asyncio.gather(*(client.head(origin) for origin in targets), return_exceptions=True)
+        for origin, result in zip(targets, results):
+            if isinstance(result, Exception):
+                print(f"Could not pre-warm connection to {origin}: {result!r}")
+
+    def metrics(self) -> dict:
+        connections = self._transport.connections
+        active = sum(not connection.is_idle() for connection in connections)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "waiting": self.waiting,
+            "connections": len(connections),
+            "active_connections": active,
+            "idle_connections": len(connections) - active,
+            "http2_connections": sum("HTTP/2" in connection.info() for connection in connections),
+            "max_connections": self.limits.max_connections,
+            "utilization": active / self.limits.max_connections,
+            "dns_cache": {"hits": self.resolver.hits, "misses": self.resolver.misses},
+        }
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    @asynccontextmanager
+    async def lifespan(self, origins: list[str]):
+        """Pre-warms the pool on startup and closes it on shutdown."""
+        await self.prewarm(origins)
+        try:
+            yield
+        finally:
+            await self.aclose()
+
+
+# The pool shared by every outbound client in this process
+outbound_pool = OutboundPool()
@@ -0,0 +1,85 @@
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from debaters.context_window import estimate_tokens
+
+# Prompt cache usage of the model calls made during the current agent run.
+_prompt_usage: ContextVar[dict | None] = ContextVar("prompt_usage", default=None)
+
+
+@contextmanager
+def track_prompt_cache():
+    """
+    Collects the prompt cache usage of the model calls made inside the block.
+
+    Yields:
+        dict: Filled in as the model calls finish: the prompt's key and prefix
+            tokens, and the number of calls, cacheable prefix tokens and
+            provider-cached input tokens of this block only.
+    """
+    usage = {"model_calls": 0, "cacheable_tokens": 0, "provider_cached_tokens": 0}
+    token = _prompt_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _prompt_usage.reset(token)
+
+
+@dataclass
+class CachedPrompt:
+    """A static system prompt registered once per process and shared by every thread."""
+    key: str
+    prefix_tokens: int
+    model_calls: int = 0
+    provider_cached_tokens: int = 0
+
+    def record_call(self, provider_cached_tokens: int = 0) -> None:
+        """
+        Counts one model call that sent this prompt as its prefix.
+
+        Args:
+            provider_cached_tokens (int): Input tokens the provider reported as
+                served from its cache for this call, if it reports them.
+        """
+        # Every call after the first in this process can reuse the prefix of the earlier ones
+        cacheable_tokens = self.prefix_tokens if self.model_calls else 0
+        self.model_calls += 1
+        self.provider_cached_tokens += provider_cached_tokens
+
+        usage = _prompt_usage.get()
+        if usage is not None:
+            usage["key"] = self.key
+            usage["prefix_tokens"] = self.prefix_tokens
+            usage["model_calls"] += 1
+            usage["cacheable_tokens"] += cacheable_tokens
+            usage["provider_cached_tokens"] += provider_cached_tokens
+
+    def stats(self) -> dict:
+        """Returns the totals of every call in this process, across all threads."""
+        return {
+            "key": self.key,
+            "prefix_tokens": self.prefix_tokens,
+            "model_calls": self.model_calls,
+            "cacheable_tokens": self.prefix_tokens * max(0, self.model_calls - 1),
+            "provider_cached_tokens": self.provider_cached_tokens,
+        }
+
+
+class PromptCacheRegistry:
+    """Hashes system prompts so each one is tracked once and reused across all contexts."""
+
+    def __init__(self):
+        self.prompts: dict[str, CachedPrompt] = {}
+
+    def register(self, prompt: str) -> CachedPrompt:
+        """Gets or creates the cache entry for a static system prompt."""
+        key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+        if key not in self.prompts:
+            self.prompts[key] = CachedPrompt(key=key, prefix_tokens=estimate_tokens(prompt))
+        return self.prompts[key]
+
+
+# One registry per process, shared by every debater agent
+prompt_cache_registry = PromptCacheRegistry()
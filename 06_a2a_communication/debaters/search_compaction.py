@@ -0,0 +1,153 @@
+import re
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from debaters.context_window import estimate_tokens
+
+# Token savings of the searches made during the current agent run.
+_search_savings: ContextVar[dict | None] = ContextVar("search_savings", default=None)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"\w+")
+
+
+@contextmanager
+def track_search_savings():
+    """
+    Collects how many tokens search compaction saved inside the block.
+
+    Yields:
+        dict: Running totals of searches, cache hits, and the estimated tokens of
+            the raw results and of the compacted text sent to the model instead.
+            A cache hit fetched no raw results, so it adds its compacted text to
+            both token counts and saves nothing.
+    """
+    savings = {"searches": 0, "cache_hits": 0, "raw_tokens": 0, "compact_tokens": 0}
+    token = _search_savings.set(savings)
+    try:
+        yield savings
+    finally:
+        _search_savings.reset(token)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def compact_results(query: str, response: dict, token_budget: int = 250, max_snippet_chars: int = 240) -> str:
+    """
+    Reduces a Tavily search response to the snippets relevant to the query.
+
+    Every result's content is split into sentences. Sentences are scored by
+    how many query terms they contain, duplicates across results are
+    dropped, and the best ones are kept, in their original order, until the
+    token budget is spent. URLs, scores and other metadata are left out.
+
+    Args:
+        query (str): The search query the results are for.
+        response (dict): The response returned by `AsyncTavilyClient.search`.
+        token_budget (int): Maximum estimated tokens of the compacted text.
+        max_snippet_chars (int): Longer sentences are clipped to this many characters.
+    """
+    terms = {word for word in _normalize(query).split() if len(word) > 2}
+    seen: set[str] = set()
+    candidates: list[tuple[int, int, str, str]] = []  # (score, position, title, snippet)
+
+    for result in response.get("results", []):
+        title = result.get("title", "")
+        for sentence in _SENTENCE_END.split(result.get("content", "")):
+            key = _normalize(sentence)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            if len(sentence) > max_snippet_chars:
+                sentence = sentence[:max_snippet_chars].rstrip() + "..."
+            score = len(terms & set(key.split()))
+            candidates.append((score, len(candidates), title, sentence.strip()))
+
+    # Off-topic sentences are dropped, unless no sentence mentions the query at all
+    if any(score for score, *_ in candidates):
+        candidates = [c for c in candidates if c[0]]
+    # Best-scoring first; ties go to earlier sentences
+    ranked = sorted(candidates, key=lambda c: (-c[0], c[1]))
+    chosen, used = [], 0
+    for candidate in ranked:
+        tokens = estimate_tokens(candidate[3])
+        if used + tokens > token_budget:
+            continue
+        chosen.append(candidate)
+        used += tokens
+
+    if not chosen:
+        return f"No relevant results found for '{query}'."
+    return "\n".join(f"- {snippet} ({title})" for _, _, title, snippet in sorted(chosen, key=lambda c: c[1]))
+
+
+class SearchResultCache:
+    """
+    Caches compacted search results by normalized query, with a TTL.
+
+    Debaters on the same topic tend to search for the same things, so a hit
+    skips both the web search and the compaction.
+
+    Args:
+        ttl (float): Seconds a compacted result stays valid.
+        max_entries (int): The least recently used entries are evicted beyond this.
+    """
+
+    def __init__(self, ttl: float = 600.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def get(self, query: str) -> str | None:
+        """Returns the compacted text cached for the query, if it is still valid."""
+        key = _normalize(query)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, query: str, text: str) -> None:
+        key = _normalize(query)
+        self._entries[key] = (time.monotonic() + self.ttl, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+search_result_cache = SearchResultCache()
+
+
+async def compacted_search(tavily_client, query: str, cache: SearchResultCache = search_result_cache) -> str:
+    """
+    Searches the web and returns compacted results, recording the tokens saved.
+
+    Args:
+        tavily_client (AsyncTavilyClient): The client used on a cache miss.
+        query (str): The query to search for.
+        cache (SearchResultCache): Where compacted results are cached.
+    """
+    text = cache.get(query)
+    cache_hit = text is not None
+    if cache_hit:
+        # Nothing was fetched, so nothing was compacted: the hit saves no tokens
+        raw_tokens = estimate_tokens(text)
+    else:
+        response = await tavily_client.search(query, search_depth="basic", max_results=3)
+        text = compact_results(query, response)
+        # The raw response used to be sent to the model as its string form
+        raw_tokens = estimate_tokens(str(response))
+        cache.put(query, text)
+
+    savings = _search_savings.get()
+    if savings is not None:
+        savings["searches"] += 1
+        savings["cache_hits"] += cache_hit
+        savings["raw_tokens"] += raw_tokens
+        savings["compact_tokens"] += estimate_tokens(text)
+    return text
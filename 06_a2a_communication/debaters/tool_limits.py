@@ -0,0 +1,81 @@
+# Shared by 03_streaming_agent/tool_limits.py and 06_a2a_communication/debaters/tool_limits.py.
+# Each example project is standalone, so the two copies are kept identical.
+import asyncio
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Records of every tool call made during the current agent run.
+_tool_calls: ContextVar[list[dict] | None] = ContextVar("tool_calls", default=None)
+
+
+class ToolTimeout(TimeoutError):
+    """Raised when a limited tool call runs past its timeout."""
+
+
+@contextmanager
+def track_tool_calls():
+    """
+    Collects a record for each limited tool call made inside the block.
+
+    Yields:
+        list[dict]: Filled with one entry per tool call as the calls finish.
+    """
+    records: list[dict] = []
+    token = _tool_calls.set(records)
+    try:
+        yield records
+    finally:
+        _tool_calls.reset(token)
+
+
+def limit_tool(max_concurrency: int, timeout: float):
+    """
+    Caps how many calls of an async tool run at once and how long each may take.
+
+    The agent frameworks already run the tool calls of a single model step
+    concurrently; this keeps a burst of calls from overwhelming the backend
+    and stops a slow call from stalling the whole turn.
+
+    A call that runs too long raises `ToolTimeout`, so the agent framework
+    reports it to the model as a failed tool call rather than as a result.
+
+    Args:
+        max_concurrency (int): Maximum number of in-flight calls of this tool.
+        timeout (float): Seconds a single call may run before it is abandoned.
+
+    Raises:
+        ToolTimeout: From the wrapped tool, when a call takes longer than `timeout`.
+    """
+    def decorator(func):
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            queued_at = time.perf_counter()
+            status = "ok"
+            async with semaphore:
+                started_at = time.perf_counter()
+                try:
+                    return await asyncio.wait_for(func(*args, **kwargs), timeout)
+                except asyncio.TimeoutError as e:
+                    status = "timeout"
+                    raise ToolTimeout(f"The `{func.__name__}` tool timed out after {timeout} seconds.") from e
+                except Exception:
+                    status = "error"
+                    raise
+                finally:
+                    finished_at = time.perf_counter()
+                    records = _tool_calls.get()
+                    if records is not None:
+                        records.append({
+                            "tool": func.__name__,
+                            "status": status,
+                            "wait_ms": round((started_at - queued_at) * 1000, 1),
+                            "latency_ms": round((finished_at - started_at) * 1000, 1),
+                        })
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+
+from a2a.types import AgentCard
+
+# Agents register with, and clients resolve from, the registry at this URL.
+# Leave it unset to run without discovery.
+REGISTRY_URL = os.getenv("A2A_REGISTRY_URL")
+
+HEARTBEAT_INTERVAL = 10.0
+
+
+# --- 1. Server Side: Registration with Heartbeat ---
+
+@asynccontextmanager
+async def registration_lifespan(agent_card: AgentCard, registry_url: str | None = REGISTRY_URL):
+    """
+    Starlette lifespan that keeps an agent card registered while the server runs.
+
+    Pass it as `A2AStarletteApplication(...).build(lifespan=...)`.
+    """
+    if not registry_url:
+        yield
+        return
+
+    card_json = agent_card.model_dump(mode="json", by_alias=True, exclude_none=True)
+
+    async with httpx.AsyncClient(base_url=registry_url, timeout=5.0) as http_client:
+        async def heartbeat():
+            while True:
+                try:
+                    response = await http_client.post("/agents", json=card_json)
+                    response.raise_for_status()
+                except httpx.HTTPError as e:
+                    print(f"Could not reach the agent registry at {registry_url}: {e}")
+                await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+        heartbeat_task = asyncio.create_task(heartbeat())
+        try:
+            yield
+        finally:
+            heartbeat_task.cancel()
+            try:
+                await http_client.request("DELETE", "/agents", json={"url": agent_card.url})
+            except httpx.HTTPError:
+                pass
+
+
+# --- 2. Client Side: Cached Lookup by Skill Tag ---
+
+class AgentDirectory:
+    """
+    Resolves agents by skill tag from an in-process copy of the registry.
+
+    The copy is refreshed at most once per `ttl`, and immediately when the
+    registry pushes a change, so most lookups cost no network round-trip.
+    """
+
+    def __init__(self, http_client: httpx.AsyncClient, registry_url: str, ttl: float = 60.0):
+        self.http_client = http_client
+        self.registry_url = registry_url.rstrip("/")
+        self.ttl = ttl
+        self.cards: list[AgentCard] = []
+        self.fetched_at: float | None = None
+        self._refresh_lock = asyncio.Lock()
+        self._watch_task: asyncio.Task | None = None
+
+    def _is_fresh(self) -> bool:
+        return self.fetched_at is not None and time.monotonic() - self.fetched_at < self.ttl
+
+    async def refresh(self) -> None:
+        """Fetches all registered cards, sharing one request among concurrent callers."""
+        async with self._refresh_lock:
+            if self._is_fresh():
+                return
+            response = await self.http_client.get(f"{self.registry_url}/agents")
+            response.raise_for_status()
+            self.cards = [AgentCard.model_validate(card) for card in response.json()["agents"]]
+            self.fetched_at = time.monotonic()
+
+    async def find(self, tag: str) -> list[AgentCard]:
+        """Returns the cards of agents with a skill tagged `tag`."""
+        if not self._is_fresh():
+            await self.refresh()
+        return [card for card in self.cards if any(tag in skill.tags for skill in card.skills)]
+
+    def invalidate(self) -> None:
+        self.fetched_at = None
+
+    def start_watching(self) -> None:
+        """Subscribes to registry changes in the background."""
+        if self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch())
+
+    async def _watch(self) -> None:
+        while True:
+            try:
+                async with self.http_client.stream(
+                    "GET", f"{self.registry_url}/agents/events", timeout=None
+                ) as response:
+                    async for line in response.aiter_lines():
+                        if line.startswith("data:"):
+                            event = json.loads(line[5:])
+                            print(f"Registry changed ({event['type']}: {event['url']})")
+                            self.invalidate()
+            except httpx.HTTPError:
+                pass
+            # Changes made while the push channel was down were missed, and
+            # without it entries can be stale for up to `ttl`
+            self.invalidate()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    async def close(self) -> None:
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            self._watch_task = None
+
+
+@asynccontextmanager
+async def watched_directory(http_client: httpx.AsyncClient, registry_url: str | None = REGISTRY_URL):
+    """
+    Yields one `AgentDirectory` that watches the registry for as long as the block runs.
+
+    Create it once per application, not per session, so lookups after the
+    first are served from memory. Yields None when no registry is configured.
+    """
+    if not registry_url:
+        yield None
+        return
+    directory = AgentDirectory(http_client, registry_url)
+    directory.start_watching()
+    try:
+        yield directory
+    finally:
+        await directory.close()
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+
+import uvicorn
+from pydantic import ValidationError
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from a2a.types import AgentCard
+
+PORT = 10000
+
+# Seconds without a heartbeat before an agent is dropped from the registry
+HEARTBEAT_TTL = 30.0
+
+# Undelivered events kept per subscriber
+MAX_PENDING_EVENTS = 16
+
+
+class AgentRegistry:
+    """Keeps the cards of live agents and pushes changes to subscribed clients."""
+
+    def __init__(self, heartbeat_ttl: float = HEARTBEAT_TTL):
+        self.heartbeat_ttl = heartbeat_ttl
+        self.agents: dict[str, dict] = {}  # card url -> {"card": dict, "last_seen": float}
+        self.subscribers: set[asyncio.Queue] = set()
+
+    def _publish(self, event: dict) -> None:
+        """Pushes an invalidation event to every subscribed client."""
+        for queue in self.subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A slow client already has events waiting, and any one of them
+                # invalidates its whole copy, so this one can be dropped
+                pass
+
+    async def register(self, request: Request) -> JSONResponse:
+        """Registers an agent card, or refreshes its heartbeat if it is already known."""
+        try:
+            card = AgentCard.model_validate(await request.json())
+        except (ValidationError, json.JSONDecodeError) as e:
+            return JSONResponse({"error": f"Invalid agent card: {e}"}, status_code=400)
+
+        card_json = card.model_dump(mode="json", by_alias=True, exclude_none=True)
+        known = self.agents.get(card.url)
+        self.agents[card.url] = {"card": card_json, "last_seen": time.monotonic()}
+
+        if known is None or known["card"] != card_json:
+            print(f"Registered agent: {card.name} at {card.url}")
+            self._publish({"type": "registered", "url": card.url})
+        return JSONResponse({"url": card.url, "heartbeat_ttl": self.heartbeat_ttl})
+
+    async def deregister(self, request: Request) -> JSONResponse:
+        """Removes an agent, e.g. when its server shuts down."""
+        url = (await request.json()).get("url")
+        if self.agents.pop(url, None) is not None:
+            print(f"Deregistered agent at {url}")
+            self._publish({"type": "deregistered", "url": url})
+        return JSONResponse({"url": url})
+
+    async def list_agents(self, request: Request) -> JSONResponse:
+        """Lists the registered cards, optionally only those with a skill tagged `?tag=`."""
+        tag = request.query_params.get("tag")
+        cards = [
+            entry["card"]
+            for entry in self.agents.values()
+            if tag is None or any(tag in skill.get("tags", []) for skill in entry["card"]["skills"])
+        ]
+        return JSONResponse({"agents": cards})
+
+    async def events(self, request: Request) -> StreamingResponse:
+        """Streams registry changes to a client as server-sent events."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_PENDING_EVENTS)
+        self.subscribers.add(queue)
+
+        async def stream():
+            try:
+                while True:
+                    event = await queue.get()
+                    yield f"data: {json.dumps(event)}\n\n"
+            finally:
+                self.subscribers.discard(queue)
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    async def expire_stale_agents(self) -> None:
+        """Drops agents whose heartbeat stopped."""
+        while True:
+            await asyncio.sleep(self.heartbeat_ttl / 3)
+            now = time.monotonic()
+            for url, entry in list(self.agents.items()):
+                if now - entry["last_seen"] > self.heartbeat_ttl:
+                    del self.agents[url]
+                    print(f"Agent at {url} missed its heartbeat; removed.")
+                    self._publish({"type": "expired", "url": url})
+
+    @asynccontextmanager
+    async def lifespan(self, app: Starlette):
+        expiry_task = asyncio.create_task(self.expire_stale_agents())
+        yield
+        expiry_task.cancel()
+
+    def build(self) -> Starlette:
+        return Starlette(
+            routes=[
+                Route("/agents", self.register, methods=["POST"]),
+                Route("/agents", self.deregister, methods=["DELETE"]),
+                Route("/agents", self.list_agents, methods=["GET"]),
+                Route("/agents/events", self.events, methods=["GET"]),
+            ],
+            lifespan=self.lifespan,
+        )
+
+
+if __name__ == "__main__":
+    print(f"Starting Agent Registry on http://localhost:{PORT}")
+    uvicorn.run(AgentRegistry().build(), host="0.0.0.0", port=PORT)
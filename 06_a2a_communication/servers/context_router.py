@@ -0,0 +1,303 @@
+import argparse
+import bisect
+import hashlib
+import json
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+# Number of points each backend owns on the hash ring. More points spread the
+# contexts more evenly across backends.
+VIRTUAL_NODES = 128
+
+# How many task_id -> backend routes are remembered for tasks/get, tasks/cancel, etc.
+MAX_TASK_ROUTES = 100_000
+
+# Methods that address an existing task by `params.id` instead of a message
+TASK_METHODS = {
+    "tasks/get",
+    "tasks/cancel",
+    "tasks/resubscribe",
+    "tasks/pushNotificationConfig/set",
+    "tasks/pushNotificationConfig/get",
+    "tasks/pushNotificationConfig/list",
+    "tasks/pushNotificationConfig/delete",
+}
+
+
+def _hash(key: str) -> int:
+    """Maps a key to a position on the hash ring."""
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+# --- 1. Consistent Hash Ring ---
+
+class HashRing:
+    """
+    Assigns each context_id to one backend.
+
+    When a backend joins or leaves, only the contexts on the part of the ring it
+    owns move; every other context keeps its backend (and its in-memory state).
+    """
+
+    def __init__(self, virtual_nodes: int = VIRTUAL_NODES):
+        self.virtual_nodes = virtual_nodes
+        self.points: list[int] = []
+        self.owners: dict[int, str] = {}
+
+    @property
+    def backends(self) -> list[str]:
+        return sorted(set(self.owners.values()))
+
+    def add(self, backend: str) -> None:
+        for i in range(self.virtual_nodes):
+            point = _hash(f"{backend}#{i}")
+            if point not in self.owners:
+                bisect.insort(self.points, point)
+                self.owners[point] = backend
+
+    def remove(self, backend: str) -> None:
+        self.points = [p for p in self.points if self.owners[p] != backend]
+        self.owners = {p: self.owners[p] for p in self.points}
+
+    def lookup(self, key: str) -> str:
+        if not self.points:
+            raise LookupError("No backends are registered.")
+        index = bisect.bisect(self.points, _hash(key)) % len(self.points)
+        return self.owners[self.points[index]]
+
+    def shares(self) -> dict[str, float]:
+        """Returns the fraction of the hash space owned by each backend."""
+        shares = dict.fromkeys(self.backends, 0.0)
+        space = 2 ** 64
+        for i, point in enumerate(self.points):
+            previous = self.points[i - 1] if i else self.points[-1] - space
+            shares[self.owners[point]] += (point - previous) / space
+        return shares
+
+
+# --- 2. The A2A-aware Router ---
+
+class ContextRouter:
+    """Forwards A2A JSON-RPC requests to the backend that owns their context."""
+
+    def __init__(self, backends: list[str], public_url: str):
+        self.public_url = public_url
+        self.ring = HashRing()
+        self.metrics: dict[str, dict] = {}
+        self.task_routes: OrderedDict[str, str] = OrderedDict()
+        self.http_client = httpx.AsyncClient(timeout=None)
+        for backend in backends:
+            self.add_backend(backend)
+
+    def add_backend(self, backend: str) -> None:
+        backend = backend.rstrip("/")
+        self.ring.add(backend)
+        self.metrics.setdefault(
+            backend, {"requests": 0, "in_flight": 0, "errors": 0, "new_contexts": 0}
+        )
+
+    def remove_backend(self, backend: str) -> None:
+        backend = backend.rstrip("/")
+        self.ring.remove(backend)
+        self.metrics.pop(backend, None)
+        # Tasks of a removed backend are routed by the ring like unknown tasks
+        for task_id in [t for t, owner in self.task_routes.items() if owner == backend]:
+            del self.task_routes[task_id]
+
+    def _remember_task(self, task_id: str | None, backend: str) -> None:
+        # A stream can still report tasks from a backend removed while it ran
+        if not task_id or backend not in self.metrics:
+            return
+        self.task_routes[task_id] = backend
+        self.task_routes.move_to_end(task_id)
+        if len(self.task_routes) > MAX_TASK_ROUTES:
+            self.task_routes.popitem(last=False)
+
+    def _learn_from_result(self, result: dict, backend: str) -> None:
+        """Remembers which backend owns the task found in a JSON-RPC result."""
+        if result.get("kind") == "task":
+            self._remember_task(result.get("id"), backend)
+        else:
+            self._remember_task(result.get("taskId"), backend)
+
+    def _task_backend(self, task_id: str | None) -> str | None:
+        """The backend remembered for a task, if it is still registered."""
+        backend = self.task_routes.get(task_id)
+        return backend if backend in self.metrics else None
+
+    def route(self, payload: dict) -> str:
+        """Picks the backend for a JSON-RPC request, assigning a contextId if it has none."""
+        params = payload.get("params") or {}
+        method = payload.get("method")
+
+        if method in TASK_METHODS:
+            task_id = params.get("id") or params.get("taskId")
+            return self._task_backend(task_id) or self.ring.lookup(str(task_id))
+
+        message = params.get("message") or {}
+        context_id = message.get("contextId")
+        task_id = message.get("taskId")
+        if not context_id and task_id:
+            # A follow-up on an existing task; the backend knows its context, so
+            # none is invented here. An unknown task is hashed like tasks/* calls.
+            return self._task_backend(task_id) or self.ring.lookup(str(task_id))
+        if not context_id:
+            # Pin new conversations to a shard up front; the backend accepts a
+            # client-supplied contextId and keeps it for the whole thread.
+            context_id = str(uuid4())
+            message["contextId"] = context_id
+            backend = self.ring.lookup(context_id)
+            self.metrics[backend]["new_contexts"] += 1
+            return backend
+        return self.ring.lookup(context_id)
+
+    async def handle_rpc(self, request: Request) -> Response:
+        try:
+            payload = await request.json()
+            backend = self.route(payload)
+        except (json.JSONDecodeError, AttributeError):
+            return JSONResponse(
+                {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}}
+            )
+        except LookupError as e:
+            return JSONResponse(
+                {"jsonrpc": "2.0", "id": payload.get("id"), "error": {"code": -32603, "message": str(e)}},
+                status_code=503,
+            )
+
+        stats = self.metrics[backend]
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+
+        upstream_request = self.http_client.build_request(
+            "POST",
+            f"{backend}/",
+            json=payload,
+            headers={"accept": request.headers.get("accept", "application/json")},
+        )
+        try:
+            upstream = await self.http_client.send(upstream_request, stream=True)
+        except httpx.HTTPError as e:
+            stats["in_flight"] -= 1
+            stats["errors"] += 1
+            return JSONResponse(
+                {"jsonrpc": "2.0", "id": payload.get("id"), "error": {"code": -32603, "message": f"Backend unavailable: {e}"}},
+                status_code=502,
+            )
+
+        if upstream.headers.get("content-type", "").startswith("text/event-stream"):
+            return StreamingResponse(
+                self._relay_stream(upstream, backend),
+                status_code=upstream.status_code,
+                media_type="text/event-stream",
+                background=BackgroundTask(self._finish, upstream, backend),
+            )
+
+        body = await upstream.aread()
+        await self._finish(upstream, backend)
+        try:
+            self._learn_from_result(json.loads(body).get("result") or {}, backend)
+        except (json.JSONDecodeError, AttributeError):
+            stats["errors"] += 1
+        return Response(body, status_code=upstream.status_code, media_type="application/json")
+
+    async def _relay_stream(self, upstream: httpx.Response, backend: str):
+        """Relays SSE lines unchanged, learning the task ID from the first event."""
+        learned = False
+        async for line in upstream.aiter_lines():
+            if not learned and line.startswith("data:"):
+                try:
+                    self._learn_from_result(json.loads(line[5:]).get("result") or {}, backend)
+                    learned = True
+                except (json.JSONDecodeError, AttributeError):
+                    pass
+            yield line + "\n"
+
+    async def _finish(self, upstream: httpx.Response, backend: str) -> None:
+        await upstream.aclose()
+        if backend in self.metrics:
+            self.metrics[backend]["in_flight"] -= 1
+            if upstream.status_code >= 500:
+                self.metrics[backend]["errors"] += 1
+
+    async def handle_agent_card(self, request: Request) -> Response:
+        """Serves the agent card of the backends, pointing its URL and transport at the router."""
+        for backend in self.ring.backends:
+            try:
+                response = await self.http_client.get(f"{backend}{request.url.path}")
+                response.raise_for_status()
+            except httpx.HTTPError:
+                continue
+            card = response.json()
+            card["url"] = self.public_url
+            # Only HTTP goes through the router; a gRPC interface would bypass it to one backend
+            card["preferredTransport"] = "JSONRPC"
+            card.pop("additionalInterfaces", None)
+            return JSONResponse(card)
+        return JSONResponse({"error": "No backend is reachable."}, status_code=503)
+
+    async def handle_metrics(self, request: Request) -> Response:
+        shares = self.ring.shares()
+        return JSONResponse({
+            "backends": {
+                backend: {**stats, "ring_share": round(shares.get(backend, 0.0), 4)}
+                for backend, stats in self.metrics.items()
+            },
+            "task_routes": len(self.task_routes),
+        })
+
+    async def handle_backends(self, request: Request) -> Response:
+        """Adds (POST) or removes (DELETE) a backend: {"url": "http://localhost:10016"}."""
+        try:
+            backend = (await request.json())["url"]
+        except (json.JSONDecodeError, TypeError, KeyError):
+            return JSONResponse({"error": 'Expected a JSON body like {"url": "http://localhost:10016"}.'}, status_code=400)
+        if not isinstance(backend, str) or not backend.startswith(("http://", "https://")):
+            return JSONResponse({"error": "'url' must be an http(s) URL."}, status_code=400)
+        if request.method == "POST":
+            self.add_backend(backend)
+        else:
+            self.remove_backend(backend)
+        return JSONResponse({"backends": self.ring.backends})
+
+    @asynccontextmanager
+    async def lifespan(self, app: Starlette):
+        yield
+        await self.http_client.aclose()
+
+    def build(self) -> Starlette:
+        return Starlette(
+            routes=[
+                Route("/", self.handle_rpc, methods=["POST"]),
+                Route("/.well-known/agent-card.json", self.handle_agent_card, methods=["GET"]),
+                Route("/router/metrics", self.handle_metrics, methods=["GET"]),
+                Route("/router/backends", self.handle_backends, methods=["POST", "DELETE"]),
+            ],
+            lifespan=self.lifespan,
+        )
+
+
+# --- 3. Main Router Setup ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Context-affinity router for stateful A2A agents.")
+    parser.add_argument("--port", type=int, default=10010)
+    parser.add_argument(
+        "--backend",
+        action="append",
+        required=True,
+        help="URL of a backend instance of the same agent. Repeat for each instance.",
+    )
+    args = parser.parse_args()
+
+    router = ContextRouter(args.backend, public_url=f"http://localhost:{args.port}/")
+    print(f"Starting Context Router on http://localhost:{args.port} -> {', '.join(router.ring.backends)}")
+    uvicorn.run(router.build(), host="0.0.0.0", port=args.port)
@@ -0,0 +1,33 @@
+import grpc
+import uvicorn
+from starlette.applications import Starlette
+
+from a2a.grpc import a2a_pb2_grpc
+from a2a.server.request_handlers import GrpcHandler, RequestHandler
+from a2a.types import AgentCard, AgentInterface, TransportProtocol
+
+
+def agent_interfaces(port: int, grpc_port: int) -> list[AgentInterface]:
+    """The transports a debater is served on, for the `additional_interfaces` of its card."""
+    return [
+        AgentInterface(url=f"http://localhost:{port}/", transport=TransportProtocol.jsonrpc),
+        AgentInterface(url=f"localhost:{grpc_port}", transport=TransportProtocol.grpc),
+    ]
+
+
+async def serve(
+    app: Starlette,
+    agent_card: AgentCard,
+    request_handler: RequestHandler,
+    port: int,
+    grpc_port: int,
+) -> None:
+    """Serves an agent over JSON-RPC (HTTP) and gRPC from the same request handler."""
+    grpc_server = grpc.aio.server()
+    a2a_pb2_grpc.add_A2AServiceServicer_to_server(GrpcHandler(agent_card, request_handler), grpc_server)
+    grpc_server.add_insecure_port(f"[::]:{grpc_port}")
+    await grpc_server.start()
+    try:
+        await uvicorn.Server(uvicorn.Config(app, host="0.0.0.0", port=port)).serve()
+    finally:
+        await grpc_server.stop(grace=5)
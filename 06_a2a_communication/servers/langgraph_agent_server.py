@@ -1,16 +1,31 @@
-import uvicorn
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.tasks import InMemoryTaskStore, TaskUpdater
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
-from a2a.types import AgentCard, AgentSkill, AgentCapabilities, Part, TextPart
+from a2a.types import AgentCard, AgentSkill, AgentCapabilities, Part, TaskState, TextPart, TransportProtocol
 from a2a.utils import new_task
 
 from debaters.langgraph_agent import LangGraphAgent
 from debaters.agents_config import AGENTS_CONFIG
+from debaters.context_locks import ContextBusy, ContextLocks, ConcurrentTurns
+from debaters.outbound import TAVILY_API, outbound_pool
+from debaters.search_compaction import track_search_savings
+from debaters.prompt_cache import track_prompt_cache
+from debaters.tool_limits import track_tool_calls
+from discovery.registry_client import registration_lifespan
+from servers.grpc_transport import agent_interfaces, serve
 
-PORT = 10006
+# Override with the PORT environment variable to run several instances
+PORT = int(os.getenv("PORT", 10006))
+GRPC_PORT = int(os.getenv("GRPC_PORT", PORT + 40000))
 AGENT_CONFIG = AGENTS_CONFIG["einstein"]
 
 # --- Agent Card ---
@@ -19,6 +34,9 @@ agent_card = AgentCard(
     name=AGENT_CONFIG["name"],
     description=AGENT_CONFIG["description"],
     url=f"http://localhost:{PORT}/",
+    preferred_transport=TransportProtocol.jsonrpc,
+    # Also served over gRPC, which clients prefer when they support it
+    additional_interfaces=agent_interfaces(PORT, GRPC_PORT),
     version="1.0.0",
     default_input_modes=["text/plain"],
     default_output_modes=["text/plain"],
@@ -28,8 +46,10 @@ agent_card = AgentCard(
 
 # --- A2A Executor ---
 class LangGraphExecutor(AgentExecutor):
-    def __init__(self):
-        self.agent = LangGraphAgent(name=AGENT_CONFIG["name"], prompt=AGENT_CONFIG["prompt"])
+    def __init__(self, agent: LangGraphAgent | None = None):
+        self.agent = agent or LangGraphAgent(name=AGENT_CONFIG["name"], prompt=AGENT_CONFIG["prompt"])
+        # Turns on the same debate run one at a time; a retried duplicate shares the pending answer
+        self.context_locks = ContextLocks(ConcurrentTurns.coalesce)
 
     async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
         user_input = context.get_user_input()
@@ -41,8 +61,22 @@ class LangGraphExecutor(AgentExecutor):
 
         await updater.start_work()
 
-        # Run the agent logic
-        response_text = await self.agent.run(query=user_input, thread_id=thread_id)
+        try:
+            # A coalesced retry gets the same answer and metadata as the turn it duplicates
+            response_text, metadata = await self.context_locks.run(
+                thread_id,
+                # A retry reuses the message ID; a new turn with the same text does not
+                context.message.message_id,
+                lambda: self._run_turn(user_input, thread_id),
+            )
+        except ContextBusy as e:
+            await updater.update_status(
+                TaskState.rejected,
+                message=updater.new_agent_message(parts=[Part(root=TextPart(text=str(e)))]),
+                final=True,
+            )
+            return
+        await updater.update_status(TaskState.working, metadata=metadata)
 
         # Package the result into an Artifact
         await updater.add_artifact(
@@ -50,6 +84,26 @@ class LangGraphExecutor(AgentExecutor):
         )
         await updater.complete()
 
+    async def _run_turn(self, query: str, thread_id: str) -> tuple[str, dict]:
+        """Runs the agent, recording its tool call latency, search compaction savings and prompt cache usage."""
+        with (
+            track_tool_calls() as tool_calls,
+            track_search_savings() as search_savings,
+            track_prompt_cache() as prompt_cache,
+        ):
+            response_text = await self.agent.run(query=query, thread_id=thread_id)
+
+        # Usage of this turn only, not of the other tasks in the process
+        metadata = {"prompt_cache": prompt_cache}
+        if tool_calls:
+            metadata["tool_calls"] = tool_calls
+        if search_savings["searches"]:
+            metadata["search_compaction"] = {
+                **search_savings,
+                "tokens_saved": search_savings["raw_tokens"] - search_savings["compact_tokens"],
+            }
+        return response_text, metadata
+
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
         raise NotImplementedError()
 
@@ -62,5 +116,20 @@ if __name__ == "__main__":
     server_app_builder = A2AStarletteApplication(
         agent_card=agent_card, http_handler=request_handler
     )
-    print(f"Starting LangGraph Agent Server on http://localhost:{PORT}")
-    uvicorn.run(server_app_builder.build(), host="0.0.0.0", port=PORT)
\ No newline at end of file
+    print(f"Starting LangGraph Agent Server on http://localhost:{PORT} (gRPC on localhost:{GRPC_PORT})")
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        # Pre-warm the connections to the search API, and register the agent card
+        # with the discovery registry, if one is configured
+        async with outbound_pool.lifespan([TAVILY_API]), registration_lifespan(agent_card):
+            yield
+
+    async def outbound_metrics(request: Request) -> JSONResponse:
+        return JSONResponse(outbound_pool.metrics())
+
+    app = server_app_builder.build(
+        routes=[Route("/outbound/metrics", outbound_metrics, methods=["GET"])],
+        lifespan=lifespan,
+    )
+    asyncio.run(serve(app, agent_card, request_handler, PORT, GRPC_PORT))
\ No newline at end of file
@@ -0,0 +1,129 @@
+from collections.abc import AsyncGenerator
+
+from a2a.client import ClientCallContext, ClientCallInterceptor, ClientConfig, ClientFactory
+from a2a.client.transports.base import ClientTransport
+from a2a.server.context import ServerCallContext
+from a2a.server.request_handlers import RequestHandler
+from a2a.types import (
+    AgentCard,
+    AgentInterface,
+    GetTaskPushNotificationConfigParams,
+    Message,
+    MessageSendParams,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskIdParams,
+    TaskNotFoundError,
+    TaskPushNotificationConfig,
+    TaskQueryParams,
+    TaskStatusUpdateEvent,
+)
+from a2a.utils.errors import ServerError
+
+# Transport label for agents served from the same process as their client
+LOOPBACK_TRANSPORT = "LOOPBACK"
+
+# Request handlers of the agents served in this process, by loopback URL
+_handlers: dict[str, RequestHandler] = {}
+
+
+def loopback_url(agent_card: AgentCard) -> str:
+    """The address of an in-process agent. Cards can share a URL, such as when PORT is set, but not a name."""
+    return f"loopback://{agent_card.name}"
+
+
+def serve_in_process(agent_card: AgentCard, request_handler: RequestHandler) -> AgentCard:
+    """
+    Makes an agent reachable from clients in this process without a network.
+
+    Returns a copy of the card that offers the loopback transport; create the
+    client from that card with a factory set up by `register_loopback`.
+    """
+    url = loopback_url(agent_card)
+    if url in _handlers:
+        raise ValueError(f"An agent named '{agent_card.name}' is already served in this process.")
+    _handlers[url] = request_handler
+    return agent_card.model_copy(update={
+        "preferred_transport": LOOPBACK_TRANSPORT,
+        "additional_interfaces": [
+            AgentInterface(url=url, transport=LOOPBACK_TRANSPORT),
+            *(agent_card.additional_interfaces or []),
+        ],
+    })
+
+
+def _detach(event):
+    # Tasks returned by the handler are the objects held in its task store. The
+    # client-side task manager updates the task it receives, so it gets a copy.
+    return event.model_copy(deep=True) if isinstance(event, Task) else event
+
+
+class LoopbackTransport(ClientTransport):
+    """
+    A client transport that calls an in-process `RequestHandler` directly.
+
+    Requests and events are passed as model objects instead of being serialized
+    to JSON-RPC and sent over HTTP, while the client sees the same sequence of
+    events it would get from a remote agent.
+    """
+
+    def __init__(self, request_handler: RequestHandler, agent_card: AgentCard):
+        self.request_handler = request_handler
+        self.agent_card = agent_card
+
+    async def send_message(
+        self, request: MessageSendParams, *, context: ClientCallContext | None = None
+    ) -> Task | Message:
+        return _detach(await self.request_handler.on_message_send(request, ServerCallContext()))
+
+    async def send_message_streaming(
+        self, request: MessageSendParams, *, context: ClientCallContext | None = None
+    ) -> AsyncGenerator[Message | Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent]:
+        async for event in self.request_handler.on_message_send_stream(request, ServerCallContext()):
+            yield _detach(event)
+
+    async def get_task(self, request: TaskQueryParams, *, context: ClientCallContext | None = None) -> Task:
+        task = await self.request_handler.on_get_task(request, ServerCallContext())
+        if task is None:
+            # What the handler raises for the other task methods, and what a remote agent reports
+            raise ServerError(error=TaskNotFoundError())
+        return _detach(task)
+
+    async def cancel_task(self, request: TaskIdParams, *, context: ClientCallContext | None = None) -> Task:
+        return _detach(await self.request_handler.on_cancel_task(request, ServerCallContext()))
+
+    async def set_task_callback(
+        self, request: TaskPushNotificationConfig, *, context: ClientCallContext | None = None
+    ) -> TaskPushNotificationConfig:
+        return await self.request_handler.on_set_task_push_notification_config(request, ServerCallContext())
+
+    async def get_task_callback(
+        self, request: GetTaskPushNotificationConfigParams, *, context: ClientCallContext | None = None
+    ) -> TaskPushNotificationConfig:
+        return await self.request_handler.on_get_task_push_notification_config(request, ServerCallContext())
+
+    async def resubscribe(
+        self, request: TaskIdParams, *, context: ClientCallContext | None = None
+    ) -> AsyncGenerator[Task | Message | TaskStatusUpdateEvent | TaskArtifactUpdateEvent]:
+        async for event in self.request_handler.on_resubscribe_to_task(request, ServerCallContext()):
+            yield _detach(event)
+
+    async def get_card(self, *, context: ClientCallContext | None = None) -> AgentCard:
+        return self.agent_card
+
+    async def close(self) -> None:
+        pass
+
+
+def _create_loopback_transport(
+    agent_card: AgentCard, url: str, config: ClientConfig, interceptors: list[ClientCallInterceptor]
+) -> LoopbackTransport:
+    if url not in _handlers:
+        raise ValueError(f"No agent is served in this process at {url}.")
+    return LoopbackTransport(_handlers[url], agent_card)
+
+
+def register_loopback(factory: ClientFactory) -> ClientFactory:
+    """Lets a client factory connect to agents registered with `serve_in_process`."""
+    factory.register(LOOPBACK_TRANSPORT, _create_loopback_transport)
+    return factory
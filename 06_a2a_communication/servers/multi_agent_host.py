@@ -0,0 +1,136 @@
+import argparse
+from contextlib import AsyncExitStack, asynccontextmanager
+
+import uvicorn
+from langchain.chat_models import init_chat_model
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import AgentCard, AgentSkill, AgentCapabilities
+
+from debaters.agents_config import AGENTS_CONFIG
+from debaters.langgraph_agent import LangGraphAgent
+from debaters.openai_agent import OpenAIAgent, create_model
+from debaters.outbound import TAVILY_API, outbound_pool
+from discovery.registry_client import registration_lifespan
+from servers.langgraph_agent_server import LangGraphExecutor
+from servers.openai_agent_server import OpenAIExecutor
+
+FRAMEWORKS = ("langgraph", "openai")
+
+
+class MultiAgentHost:
+    """
+    Hosts any number of debater personas from `AGENTS_CONFIG` in one process.
+
+    Each persona is mounted under its own path (`/einstein/`, `/newton/`, ...)
+    with its own `AgentCard`, executor and task store. Everything that does not
+    depend on the persona is created once and shared: the model client of each
+    framework, the Tavily client and search limits, and the prompt cache
+    registry. An additional persona therefore only costs its agent graph and
+    its debate history.
+    """
+
+    def __init__(self, port: int):
+        self.port = port
+        self.cards: dict[str, AgentCard] = {}
+        self.mounts: list[Mount] = []
+        self._models = {}
+
+    def _model(self, framework: str):
+        if framework not in self._models:
+            if framework == "langgraph":
+                self._models[framework] = init_chat_model("google_genai:gemini-2.0-flash")
+            else:
+                self._models[framework] = create_model()
+        return self._models[framework]
+
+    def add_persona(self, key: str, framework: str = "langgraph") -> AgentCard:
+        """Mounts the persona `AGENTS_CONFIG[key]` at `/<key>/`, run by the given framework."""
+        config = AGENTS_CONFIG[key]
+        agent_card = AgentCard(
+            name=config["name"],
+            description=config["description"],
+            url=f"http://localhost:{self.port}/{key}/",
+            version="1.0.0",
+            default_input_modes=["text/plain"],
+            default_output_modes=["text/plain"],
+            capabilities=AgentCapabilities(streaming=False),
+            skills=[AgentSkill(**skill) for skill in config["skills"]],
+        )
+
+        if framework == "langgraph":
+            agent = LangGraphAgent(name=config["name"], prompt=config["prompt"], model=self._model(framework))
+            executor = LangGraphExecutor(agent)
+        else:
+            agent = OpenAIAgent(name=config["name"], prompt=config["prompt"], model=self._model(framework))
+            executor = OpenAIExecutor(agent)
+
+        request_handler = DefaultRequestHandler(agent_executor=executor, task_store=InMemoryTaskStore())
+        app = A2AStarletteApplication(agent_card=agent_card, http_handler=request_handler).build()
+        self.mounts.append(Mount(f"/{key}", app=app))
+        self.cards[key] = agent_card
+        return agent_card
+
+    async def handle_index(self, request: Request) -> JSONResponse:
+        """Lists the hosted personas and where their agent cards are."""
+        return JSONResponse({
+            "agents": [
+                {"key": key, "name": card.name, "url": card.url}
+                for key, card in self.cards.items()
+            ]
+        })
+
+    async def handle_outbound_metrics(self, request: Request) -> JSONResponse:
+        """Utilization of the connection pool shared by all personas."""
+        return JSONResponse(outbound_pool.metrics())
+
+    @asynccontextmanager
+    async def lifespan(self, app: Starlette):
+        # Mounted apps get no lifespan of their own, so every card is registered here
+        async with AsyncExitStack() as stack:
+            await stack.enter_async_context(outbound_pool.lifespan([TAVILY_API]))
+            for agent_card in self.cards.values():
+                await stack.enter_async_context(registration_lifespan(agent_card))
+            yield
+
+    def build(self) -> Starlette:
+        return Starlette(
+            routes=[
+                Route("/", self.handle_index, methods=["GET"]),
+                Route("/outbound/metrics", self.handle_outbound_metrics, methods=["GET"]),
+                *self.mounts,
+            ],
+            lifespan=self.lifespan,
+        )
+
+
+# --- Main Server Setup ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host several debater personas in one process.")
+    parser.add_argument("--port", type=int, default=10008)
+    parser.add_argument(
+        "--persona",
+        action="append",
+        help=(
+            "Persona to host, as KEY or KEY:FRAMEWORK (langgraph or openai, default langgraph). "
+            "Repeat for each persona. Hosts every persona in AGENTS_CONFIG if omitted."
+        ),
+    )
+    args = parser.parse_args()
+
+    host = MultiAgentHost(port=args.port)
+    for spec in args.persona or list(AGENTS_CONFIG):
+        key, _, framework = spec.partition(":")
+        if key not in AGENTS_CONFIG or (framework or "langgraph") not in FRAMEWORKS:
+            parser.error(f"Unknown persona or framework: {spec}")
+        host.add_persona(key, framework or "langgraph")
+
+    for card in host.cards.values():
+        print(f"Hosting {card.name} at {card.url}")
+    uvicorn.run(host.build(), host="0.0.0.0", port=args.port)
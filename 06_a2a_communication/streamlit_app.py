@@ -1,10 +1,6 @@
-import asyncio
-import httpx
-from uuid import uuid4
 import streamlit as st
 
-from a2a.client import Client, ClientConfig, ClientFactory, A2ACardResolver
-from a2a.types import Message, Part, Role, TextPart, TransportProtocol, Task
+from debate_runner import DebateRunner
 
 # Agent URLs
 LANGGRAPH_AGENT_URL = "http://localhost:10006"
@@ -42,33 +38,10 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- Helper Functions ---
-async def get_a2a_client(http_client: httpx.AsyncClient, agent_url: str) -> Client:
-    config = ClientConfig(streaming=False, supported_transports=[TransportProtocol.jsonrpc])
-    factory = ClientFactory(config)
-    card_resolver = A2ACardResolver(http_client, agent_url)
-    agent_card = await card_resolver.get_agent_card()
-    return factory.create(agent_card)
-
-
-async def send_message_and_get_response(client: Client, message_text: str, context_id: str) -> str:
-    user_message = Message(
-        role=Role.user,
-        parts=[Part(root=TextPart(text=message_text))],
-        message_id=str(uuid4()),
-        context_id=context_id,
-    )
-
-    final_task_object = None
-    async for event in client.send_message(request=user_message):
-        if isinstance(event, tuple):
-            final_task_object = event[0]
-        else:
-            final_task_object = event
-
-    if isinstance(final_task_object, Task) and final_task_object.artifacts:
-        return final_task_object.artifacts[0].parts[0].root.text
-    
-    return "Error: Agent did not provide a valid response."
+@st.cache_resource
+def get_runner() -> DebateRunner:
+    """One background event loop and connection pool shared by every browser session."""
+    return DebateRunner()
 
 
 def render_agent_card(card, gradient_colors: tuple[str, str]):
@@ -109,8 +82,10 @@ debate_turns = st.sidebar.number_input("Number of Turns", min_value=1, max_value
 
 tabs = st.tabs(["Agent Cards", "Debate Chat"])
 
-# Session state for storing agents
-for key in ["langgraph_client", "openai_client", "langgraph_card", "openai_card"]:
+runner = get_runner()
+
+# Session state for storing agent cards. The A2A clients themselves live in the shared runner.
+for key in ["langgraph_card", "openai_card"]:
     if key not in st.session_state:
         st.session_state[key] = None
 
@@ -128,18 +103,9 @@ with tabs[0]:
     fetch_button = st.button("Fetch Agent Cards", use_container_width=True)
 
     if fetch_button:
-        async def fetch_cards():
-            async with httpx.AsyncClient(timeout=240.0) as async_client:
-                lg_client, oa_client = await asyncio.gather(
-                    get_a2a_client(async_client, LANGGRAPH_AGENT_URL),
-                    get_a2a_client(async_client, OPENAI_AGENT_URL),
-                )
-                st.session_state.langgraph_client = lg_client
-                st.session_state.openai_client = oa_client
-                st.session_state.langgraph_card = await lg_client.get_card()
-                st.session_state.openai_card = await oa_client.get_card()
-
-        asyncio.run(fetch_cards())
+        st.session_state.langgraph_card, st.session_state.openai_card = runner.fetch_cards(
+            LANGGRAPH_AGENT_URL, OPENAI_AGENT_URL
+        )
 
     if st.session_state.langgraph_card and st.session_state.openai_card:
         cols = st.columns(2)
@@ -154,36 +120,25 @@ with tabs[1]:
     st.subheader("Debate")
     start_button = st.button("Start Debate", use_container_width=True)
 
-    async def run_debate():
-        langgraph_client = st.session_state.langgraph_client
-        openai_client = st.session_state.openai_client
-        langgraph_agent_card = st.session_state.langgraph_card
-        openai_agent_card = st.session_state.openai_card
-
-        if not (langgraph_client and openai_client):
+    def run_debate():
+        if not (st.session_state.langgraph_card and st.session_state.openai_card):
             st.warning("Please fetch agent cards first in the Agent Cards tab.")
             return
 
-        debate_id = f"debate-{uuid4()}"
-        current_speaker_name = langgraph_agent_card.name
-        current_speaker_client = langgraph_client
-        current_message = f"Let's debate the topic: {debate_topic}."
-
-        for i in range(debate_turns * 2):
-            response = await send_message_and_get_response(
-                current_speaker_client, current_message, debate_id
-            )
-
-            with st.chat_message(current_speaker_name):
-                st.markdown(f"**{current_speaker_name} (Turn {i+1}):** {response}")
-
-            current_message = response
-            if current_speaker_name == langgraph_agent_card.name:
-                current_speaker_name = openai_agent_card.name
-                current_speaker_client = openai_client
-            else:
-                current_speaker_name = langgraph_agent_card.name
-                current_speaker_client = langgraph_client
+        # Turns are rendered as soon as the runner puts them on the queue
+        events = runner.start_debate(debate_topic, debate_turns, LANGGRAPH_AGENT_URL, OPENAI_AGENT_URL)
+        turn = 0
+        while True:
+            kind, speaker_name, response = events.get()
+            if kind == "done":
+                break
+            if kind == "error":
+                st.error(f"The debate stopped: {response}")
+                break
+
+            turn += 1
+            with st.chat_message(speaker_name):
+                st.markdown(f"**{speaker_name} (Turn {turn}):** {response}")
 
     if start_button:
-        asyncio.run(run_debate())
\ No newline at end of file
+        run_debate()
@@ -0,0 +1,60 @@
+import asyncio
+import os
+
+from a2a.server.agent_execution import RequestContext
+from a2a.server.events import EventQueue
+from a2a.types import Message, MessageSendParams, Part, Role, TaskStatusUpdateEvent, TextPart
+
+# The agent modules configure their model from the environment when imported
+os.environ.setdefault("GOOGLE_API_KEY", "unused")
+
+from debaters.tool_limits import limit_tool  # noqa: E402
+from servers.langgraph_agent_server import LangGraphExecutor  # noqa: E402
+
+
+@limit_tool(max_concurrency=1, timeout=1.0)
+async def search(query: str) -> str:
+    await asyncio.sleep(0.05)
+    return f"results for {query}"
+
+
+class StubAgent:
+    """Stands in for the debater: makes one tool call per turn."""
+
+    def __init__(self):
+        self.runs = 0
+
+    async def run(self, query: str, thread_id: str) -> str:
+        self.runs += 1
+        await search(query)
+        return f"answer to {query}"
+
+
+async def execute(executor: LangGraphExecutor, message_id: str) -> dict:
+    message = Message(
+        role=Role.user,
+        message_id=message_id,
+        context_id="debate-1",
+        parts=[Part(root=TextPart(text="Is light a wave?"))],
+    )
+    event_queue = EventQueue()
+    await executor.execute(RequestContext(request=MessageSendParams(message=message)), event_queue)
+    while not event_queue.queue.empty():
+        event = await event_queue.dequeue_event()
+        if isinstance(event, TaskStatusUpdateEvent) and event.metadata:
+            return event.metadata
+    raise AssertionError("No status update carried the turn's metadata")
+
+
+def test_a_coalesced_retry_reports_the_metadata_of_the_turn_it_joined():
+    async def main():
+        agent = StubAgent()
+        executor = LangGraphExecutor(agent)
+        # The retry reuses the message ID while the first attempt is still running
+        original, retry = await asyncio.gather(execute(executor, "msg-1"), execute(executor, "msg-1"))
+        return agent.runs, executor.context_locks.coalesced, original, retry
+
+    runs, coalesced, original, retry = asyncio.run(main())
+    assert runs == 1 and coalesced == 1
+    assert [call["tool"] for call in original["tool_calls"]] == ["search"]
+    assert retry == original
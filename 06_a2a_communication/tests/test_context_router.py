@@ -0,0 +1,185 @@
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from servers.context_router import ContextRouter
+
+# A stand-in for one agent instance: answers every JSON-RPC call with its own
+# port, and remembers the tasks and contexts it has seen
+BACKEND = """
+import sys
+from uuid import uuid4
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+port = int(sys.argv[1])
+tasks = {}
+
+async def rpc(request):
+    payload = await request.json()
+    params = payload.get("params") or {}
+    if payload["method"] == "message/send":
+        message = params["message"]
+        task_id = message.get("taskId") or str(uuid4())
+        context_id = message.get("contextId") or tasks.get(task_id) or str(uuid4())
+        known = tasks.setdefault(task_id, context_id)
+        result = {"kind": "task", "id": task_id, "contextId": known, "mismatch": known != context_id}
+    else:
+        result = {"kind": "task", "id": params["id"], "contextId": tasks.get(params["id"])}
+    result["backend"] = port
+    return JSONResponse({"jsonrpc": "2.0", "id": payload.get("id"), "result": result})
+
+async def health(request):
+    return JSONResponse({"ok": True})
+
+app = Starlette(routes=[Route("/", rpc, methods=["POST"]), Route("/health", health)])
+uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def backends():
+    ports = [free_port() for _ in range(4)]
+    processes = [subprocess.Popen([sys.executable, "-c", BACKEND, str(port)]) for port in ports]
+    try:
+        for port in ports:
+            for _ in range(100):
+                try:
+                    httpx.get(f"http://127.0.0.1:{port}/health").raise_for_status()
+                    break
+                except httpx.HTTPError:
+                    time.sleep(0.1)
+            else:
+                pytest.fail(f"Backend on port {port} did not start.")
+        yield [f"http://127.0.0.1:{port}" for port in ports]
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+def run_with_router(backends: list[str], scenario):
+    async def main():
+        router = ContextRouter(backends, public_url="http://router/")
+        transport = httpx.ASGITransport(app=router.build())
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://router") as client:
+                return await scenario(router, client)
+        finally:
+            await router.http_client.aclose()
+
+    return asyncio.run(main())
+
+
+async def send(client: httpx.AsyncClient, context_id: str | None = None, task_id: str | None = None) -> dict:
+    message = {"role": "user", "parts": [{"kind": "text", "text": "Hi"}], "messageId": str(uuid4())}
+    if context_id:
+        message["contextId"] = context_id
+    if task_id:
+        message["taskId"] = task_id
+    response = await client.post("/", json={
+        "jsonrpc": "2.0", "id": 1, "method": "message/send", "params": {"message": message},
+    })
+    response.raise_for_status()
+    return response.json()["result"]
+
+
+def port_of(backend: str) -> int:
+    return int(backend.rsplit(":", 1)[1])
+
+
+def test_every_turn_of_a_context_reaches_one_backend(backends):
+    async def scenario(router, client):
+        contexts = [f"debate-{i}" for i in range(120)]
+        first = await asyncio.gather(*(send(client, context) for context in contexts))
+        again = await asyncio.gather(*(send(client, context) for context in contexts))
+        return first, again, router.metrics
+
+    first, again, metrics = run_with_router(backends[:3], scenario)
+
+    assert [r["backend"] for r in first] == [r["backend"] for r in again]
+    # All three processes take a share of the contexts
+    counts = {port_of(b): sum(r["backend"] == port_of(b) for r in first) for b in backends[:3]}
+    assert all(count > 120 / 3 / 3 for count in counts.values())
+    assert sum(stats["requests"] for stats in metrics.values()) == 240
+    assert all(stats["in_flight"] == 0 and stats["errors"] == 0 for stats in metrics.values())
+
+
+def test_joining_and_leaving_moves_only_the_owned_contexts(backends):
+    async def scenario(router, client):
+        contexts = [f"debate-{i}" for i in range(160)]
+        before = [r["backend"] for r in await asyncio.gather(*(send(client, c) for c in contexts))]
+        response = await client.post("/router/backends", json={"url": backends[3]})
+        assert response.json()["backends"] == sorted(backends)
+        joined = [r["backend"] for r in await asyncio.gather(*(send(client, c) for c in contexts))]
+        await client.request("DELETE", "/router/backends", json={"url": backends[3]})
+        left = [r["backend"] for r in await asyncio.gather(*(send(client, c) for c in contexts))]
+        return before, joined, left
+
+    before, joined, left = run_with_router(backends[:3], scenario)
+
+    moved = [(b, j) for b, j in zip(before, joined) if b != j]
+    # Only contexts taken over by the new backend move, about a quarter of them
+    assert all(j == port_of(backends[3]) for _, j in moved)
+    assert 0 < len(moved) < 160 / 2
+    assert left == before
+
+
+def test_tasks_follow_the_backend_that_created_them(backends):
+    async def scenario(router, client):
+        created = await asyncio.gather(*(send(client) for _ in range(50)))
+        polled = []
+        for task in created:
+            response = await client.post("/", json={
+                "jsonrpc": "2.0", "id": 2, "method": "tasks/get", "params": {"id": task["id"]},
+            })
+            polled.append(response.json()["result"])
+        followed = await asyncio.gather(*(send(client, task_id=task["id"]) for task in created))
+        return created, polled, followed, router.metrics
+
+    created, polled, followed, metrics = run_with_router(backends[:3], scenario)
+
+    assert [t["backend"] for t in polled] == [t["backend"] for t in created]
+    assert [t["contextId"] for t in polled] == [t["contextId"] for t in created]
+    # A follow-up naming only its task keeps the task's context
+    assert [t["backend"] for t in followed] == [t["backend"] for t in created]
+    assert not any(t["mismatch"] for t in followed)
+    assert sum(stats["new_contexts"] for stats in metrics.values()) == 50
+
+
+def test_follow_up_for_an_unknown_task_gets_no_new_context():
+    # A new router, as after a restart, has not seen the task before
+    router = ContextRouter(["http://a:1", "http://b:2", "http://c:3"], public_url="http://router/")
+    message = {"taskId": "task-1", "messageId": "m"}
+
+    backend = router.route({"method": "message/send", "params": {"message": message}})
+
+    assert backend == router.ring.lookup("task-1")
+    assert "contextId" not in message
+    assert all(stats["new_contexts"] == 0 for stats in router.metrics.values())
+    asyncio.run(router.http_client.aclose())
+
+
+def test_backend_changes_need_a_url(backends):
+    async def scenario(router, client):
+        return [
+            (await client.post("/router/backends", content=body, headers={"content-type": "application/json"})).status_code
+            for body in ["not json", "{}", '{"uri": "http://x"}', '["http://x"]', '{"url": 5}', '{"url": "ftp://x"}']
+        ] + [(await client.request("DELETE", "/router/backends", json={})).status_code]
+
+    assert run_with_router(backends[:3], scenario) == [400] * 7
@@ -0,0 +1,178 @@
+import asyncio
+import time
+
+from debaters import context_window
+from debaters.context_window import ContextWindow, ToolCall, estimate_tokens
+
+
+def statement(speaker: str, turn: int) -> str:
+    """About 100 tokens of debate text that starts with a distinct first sentence."""
+    return f"{speaker} makes point {turn}. " + "Gravity bends light around massive bodies. " * 9
+
+
+def search_call(turn: int) -> ToolCall:
+    return ToolCall(
+        call_id=f"call-{turn}",
+        name="search",
+        arguments=f'{{"query": "evidence {turn}"}}',
+        output=f"Evidence {turn} was found. " + "Measured deflection matched. " * 5,
+    )
+
+
+def test_first_turn_is_just_the_query():
+    window = ContextWindow()
+    [turn] = window.messages("debate", "Opening statement")
+    assert (turn.role, turn.text) == ("user", "Opening statement")
+    assert window.prompt_tokens("debate") == 0
+
+
+def test_history_stays_within_the_budget_and_starts_with_a_user_turn():
+    window = ContextWindow(token_budget=800, summary_budget=150, min_recent_turns=2)
+    for turn in range(50):
+        window.add_exchange("debate", statement("Opponent", turn), statement("Debater", turn))
+        assert window.prompt_tokens("debate") <= 800
+
+    ctx = window.threads["debate"]
+    assert ctx.summary_tokens <= 150
+    assert ctx.turns[0].role == "user"
+    # Whole exchanges are folded, oldest first, one line per turn
+    first_kept = int(ctx.turns[0].text.split()[3].rstrip("."))
+    assert ctx.summary_lines[-2].text == f"Opponent: Opponent makes point {first_kept - 1}."
+    assert ctx.summary_lines[-1].text == f"You: Debater makes point {first_kept - 1}."
+    assert ctx.turn_tokens == sum(turn.tokens for turn in ctx.turns)
+
+    messages = window.messages("debate", "Next point")
+    assert messages[0].text.startswith("Summary of the debate so far:\nOpponent: Opponent makes point")
+    assert messages[0].text.endswith(ctx.turns[0].text)
+    assert [m.text for m in messages[1:]] == [turn.text for turn in ctx.turns[1:]] + ["Next point"]
+
+
+def test_recent_turns_are_kept_even_over_budget():
+    window = ContextWindow(token_budget=10, min_recent_turns=4)
+    for turn in range(3):
+        window.add_exchange("debate", statement("Opponent", turn), statement("Debater", turn))
+    # Two exchanges are four turns, the minimum kept verbatim
+    assert [turn.role for turn in window.threads["debate"].turns] == ["user", "assistant"] * 2
+
+
+def test_long_first_sentences_are_clipped_in_the_summary():
+    window = ContextWindow(token_budget=100, summary_budget=1000, min_recent_turns=0)
+    window.add_exchange("debate", "x" * 1000, "Short answer.")
+    line = window.threads["debate"].summary_lines[0].text
+    assert line == "Opponent: " + "x" * 200 + "..."
+
+
+def test_token_counts_are_computed_once_per_text():
+    counted = []
+
+    def count_tokens(text: str) -> int:
+        counted.append(text)
+        return estimate_tokens(text)
+
+    window = ContextWindow(count_tokens=count_tokens, token_budget=10**6)
+    for turn in range(10):
+        window.add_exchange("debate", statement("Opponent", turn), statement("Debater", turn))
+        window.prompt_tokens("debate")
+    # Each stored turn is counted once; prompt_tokens uses the cached totals
+    assert len(counted) == 20
+
+
+def test_tool_calls_are_kept_with_their_exchange():
+    window = ContextWindow(token_budget=10**6)
+    window.add_exchange("debate", "Prove it.", "Here is the evidence.", [search_call(1), search_call(2)])
+
+    turns = window.messages("debate", "And then?")
+    assert [turn.role for turn in turns] == ["user", "tool", "tool", "assistant", "user"]
+    assert turns[1].tool_call == search_call(1)
+    assert turns[2].text == search_call(2).output
+    assert window.prompt_tokens("debate") == sum(turn.tokens for turn in turns[:-1])
+
+
+def test_tool_calls_are_folded_with_their_exchange():
+    window = ContextWindow(token_budget=400, summary_budget=400, min_recent_turns=2)
+    for turn in range(6):
+        window.add_exchange("debate", statement("Opponent", turn), statement("Debater", turn), [search_call(turn)])
+
+    ctx = window.threads["debate"]
+    assert ctx.turns[0].role == "user"
+    assert [turn.role for turn in ctx.turns[-3:]] == ["user", "tool", "assistant"]
+    assert [line.text for line in ctx.summary_lines[:3]] == [
+        "Opponent: Opponent makes point 0.",
+        'You looked up search {"query": "evidence 0"}: Evidence 0 was found.',
+        "You: Debater makes point 0.",
+    ]
+
+
+def test_least_recently_used_threads_are_evicted():
+    window = ContextWindow(max_threads=3)
+    for thread in ["a", "b", "c"]:
+        window.add_exchange(thread, "Hello", "Hi")
+    window.messages("a", "Still here?")
+    window.add_exchange("d", "Hello", "Hi")
+
+    assert list(window.threads) == ["c", "a", "d"]
+
+
+def test_idle_threads_expire(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(context_window.time, "monotonic", lambda: now)
+    window = ContextWindow(idle_ttl=60)
+    window.add_exchange("old", "Hello", "Hi")
+
+    now += 30
+    window.add_exchange("recent", "Hello", "Hi")
+    now += 45
+    window.add_exchange("new", "Hello", "Hi")
+    assert list(window.threads) == ["recent", "new"]
+
+    # A thread that expired starts again from scratch, even before it is evicted
+    now += 61
+    assert [turn.text for turn in window.messages("new", "Back again")] == ["Back again"]
+    assert list(window.threads) == ["new"]
+
+
+# --- Turn-50 benchmark with a stub model ---
+
+# Stub model latency per prompt token, on top of a fixed overhead
+SECONDS_PER_TOKEN = 5e-6
+OVERHEAD = 0.002
+
+
+async def stub_model(prompt_tokens: int, answer: str, latency: bool) -> str:
+    if latency:
+        await asyncio.sleep(OVERHEAD + prompt_tokens * SECONDS_PER_TOKEN)
+    return answer
+
+
+def test_turn_50_prompt_tokens_and_latency_stay_flat():
+    async def debate() -> dict:
+        window = ContextWindow()
+        transcript_tokens = 0  # What the unbounded stores resent every turn
+        results = {}
+        for turn in range(1, 51):
+            query, answer = statement("Opponent", turn), statement("Debater", turn)
+            windowed = sum(m.tokens for m in window.messages("debate", query))
+            unbounded = transcript_tokens + estimate_tokens(query)
+            measure = turn in (1, 50)
+
+            started_at = time.perf_counter()
+            await stub_model(windowed, answer, measure)
+            windowed_latency = time.perf_counter() - started_at
+            started_at = time.perf_counter()
+            await stub_model(unbounded, answer, measure)
+            unbounded_latency = time.perf_counter() - started_at
+
+            window.add_exchange("debate", query, answer)
+            transcript_tokens += estimate_tokens(query) + estimate_tokens(answer)
+            if measure:
+                results[turn] = (windowed, unbounded, windowed_latency, unbounded_latency)
+        return results
+
+    results = asyncio.run(debate())
+    windowed, unbounded, windowed_latency, unbounded_latency = results[50]
+
+    assert windowed <= ContextWindow().token_budget + estimate_tokens(statement("Opponent", 50))
+    assert unbounded > 4 * windowed
+    assert windowed_latency < unbounded_latency / 2
+    # The first turn costs the same either way
+    assert results[1][0] == results[1][1]
@@ -0,0 +1,69 @@
+import json
+import os
+import subprocess
+import sys
+
+# Builds a host in a fresh process and reports its startup time and peak RSS
+# as personas are added. The personas in AGENTS_CONFIG are repeated under new
+# keys to reach the larger counts.
+PROBE = """
+import json
+import os
+import resource
+import sys
+import time
+
+def peak_rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10  # Bytes on macOS, KiB elsewhere
+
+started = time.perf_counter()
+from debaters.agents_config import AGENTS_CONFIG
+from servers.multi_agent_host import MultiAgentHost
+imported = time.perf_counter()
+
+host = MultiAgentHost(port=10008)
+personas = list(AGENTS_CONFIG)
+results = []
+for count in map(int, sys.argv[1:]):
+    while len(host.cards) < count:
+        i = len(host.cards)
+        config = AGENTS_CONFIG[personas[i % len(personas)]]
+        key = f"persona-{i}"
+        AGENTS_CONFIG[key] = {**config, "name": f"{config['name']} {i}"}
+        host.add_persona(key, "langgraph" if i % 2 == 0 else "openai")
+    host.build()
+    results.append({
+        "personas": count,
+        "startup_s": time.perf_counter() - started,
+        "personas_s": time.perf_counter() - imported,
+        "peak_rss_mib": peak_rss_mib(),
+    })
+print(json.dumps(results))
+"""
+
+COUNTS = (1, 2, 10, 50)
+
+
+def test_hosting_personas_in_one_process_costs_far_less_than_one_process_each():
+    env = {**os.environ, "GOOGLE_API_KEY": "unused", "OPENAI_API_KEY": "unused"}
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, *map(str, COUNTS)],
+        capture_output=True, text=True, check=True, env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ).stdout
+    results = {r["personas"]: r for r in json.loads(output.splitlines()[-1])}
+
+    # One persona per process is what separate servers would each cost
+    single = results[1]
+    print()
+    for count in COUNTS[1:]:
+        r = results[count]
+        print(
+            f"{count} personas: one process starts in {r['startup_s']:.1f} s and peaks at {r['peak_rss_mib']:.0f} MiB; "
+            f"{count} processes start in {count} x {single['startup_s']:.1f} s and take ~{count * single['peak_rss_mib']:.0f} MiB"
+        )
+
+    # The shared model clients and imports dominate; each added persona is cheap
+    assert results[50]["peak_rss_mib"] < 2 * single["peak_rss_mib"]
+    assert results[50]["personas_s"] < single["startup_s"]
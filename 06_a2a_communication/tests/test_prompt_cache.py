@@ -0,0 +1,60 @@
+import asyncio
+
+from debaters.prompt_cache import PromptCacheRegistry, track_prompt_cache
+
+PROMPT = "You are Isaac Newton. " * 40
+
+
+def test_prompts_are_registered_once_per_process():
+    registry = PromptCacheRegistry()
+    first = registry.register(PROMPT)
+    assert registry.register(PROMPT) is first
+    assert registry.register("Another persona.") is not first
+    assert first.prefix_tokens == len(PROMPT) // 4
+
+
+def test_each_block_reports_only_its_own_model_calls():
+    prompt = PromptCacheRegistry().register(PROMPT)
+
+    async def turn(model_calls: int, cached_tokens: int) -> dict:
+        with track_prompt_cache() as usage:
+            for _ in range(model_calls):
+                await asyncio.sleep(0)
+                prompt.record_call(cached_tokens)
+        return usage
+
+    async def main():
+        return await asyncio.gather(turn(3, 100), turn(1, 0), turn(2, 50))
+
+    first, second, third = asyncio.run(main())
+
+    assert first == {
+        "key": prompt.key,
+        "prefix_tokens": prompt.prefix_tokens,
+        "model_calls": 3,
+        # The very first call in the process has no earlier prefix to reuse
+        "cacheable_tokens": 2 * prompt.prefix_tokens,
+        "provider_cached_tokens": 300,
+    }
+    assert (second["model_calls"], second["cacheable_tokens"], second["provider_cached_tokens"]) == (
+        1, prompt.prefix_tokens, 0
+    )
+    assert (third["model_calls"], third["cacheable_tokens"], third["provider_cached_tokens"]) == (
+        2, 2 * prompt.prefix_tokens, 100
+    )
+    assert prompt.stats() == {
+        "key": prompt.key,
+        "prefix_tokens": prompt.prefix_tokens,
+        "model_calls": 6,
+        "cacheable_tokens": 5 * prompt.prefix_tokens,
+        "provider_cached_tokens": 400,
+    }
+
+
+def test_calls_outside_a_block_only_count_towards_the_totals():
+    prompt = PromptCacheRegistry().register(PROMPT)
+    prompt.record_call(10)
+    with track_prompt_cache() as usage:
+        pass
+    assert usage == {"model_calls": 0, "cacheable_tokens": 0, "provider_cached_tokens": 0}
+    assert prompt.stats()["model_calls"] == 1
@@ -0,0 +1,94 @@
+import asyncio
+
+from debaters.context_window import estimate_tokens
+from debaters.search_compaction import (
+    SearchResultCache,
+    compact_results,
+    compacted_search,
+    track_search_savings,
+)
+
+RESPONSE = {
+    "query": "speed of light",
+    "results": [
+        {
+            "title": "Light",
+            "url": "https://example.org/light",
+            "score": 0.9,
+            "content": (
+                "The speed of light in vacuum is exactly 299,792,458 metres per second. "
+                "The museum shop is open daily. "
+                "Light travels slower in glass than in air."
+            ),
+        },
+        {
+            "title": "Physics notes",
+            "url": "https://example.org/notes",
+            "score": 0.7,
+            "content": (
+                "The speed of light in vacuum is exactly 299,792,458 metres per second. "
+                "Roemer first estimated the speed of light in 1676."
+            ),
+        },
+    ],
+}
+
+
+def test_keeps_relevant_sentences_once_in_original_order():
+    text = compact_results("speed of light", RESPONSE)
+    assert text.splitlines() == [
+        "- The speed of light in vacuum is exactly 299,792,458 metres per second. (Light)",
+        "- Light travels slower in glass than in air. (Light)",
+        "- Roemer first estimated the speed of light in 1676. (Physics notes)",
+    ]
+    # Off-topic sentences, URLs and scores are left out
+    assert "museum" not in text and "https://" not in text and "0.9" not in text
+
+
+def test_token_budget_keeps_the_best_scoring_sentences():
+    text = compact_results("speed of light", RESPONSE, token_budget=30)
+    # Sentences with both query terms outrank the one that only mentions light
+    assert "speed of light in vacuum" in text and "Roemer" in text
+    assert "glass" not in text
+
+
+def test_long_sentences_are_clipped():
+    response = {"results": [{"title": "Long", "content": "Light " * 100 + "ends here."}]}
+    (line,) = compact_results("light", response, max_snippet_chars=60).splitlines()
+    assert line.endswith("... (Long)")
+    assert len(line) < 60 + len("- ... (Long)")
+
+
+def test_unrelated_results_are_kept_when_nothing_matches():
+    response = {"results": [{"title": "Misc", "content": "Nothing relevant. Still something."}]}
+    assert compact_results("quantum gravity", response).splitlines() == [
+        "- Nothing relevant. (Misc)",
+        "- Still something. (Misc)",
+    ]
+    assert compact_results("quantum gravity", {"results": []}) == "No relevant results found for 'quantum gravity'."
+
+
+class StubTavily:
+    def __init__(self):
+        self.searches = 0
+
+    async def search(self, query: str, **kwargs) -> dict:
+        self.searches += 1
+        return RESPONSE
+
+
+def test_cache_hits_do_not_count_as_savings():
+    async def main():
+        tavily, cache = StubTavily(), SearchResultCache()
+        with track_search_savings() as first:
+            await compacted_search(tavily, "speed of light", cache)
+        with track_search_savings() as repeated:
+            await compacted_search(tavily, "Speed of  light?", cache)
+        return tavily.searches, first, repeated
+
+    searches, first, repeated = asyncio.run(main())
+    assert searches == 1
+    assert first["cache_hits"] == 0
+    assert first["raw_tokens"] == estimate_tokens(str(RESPONSE)) > first["compact_tokens"]
+    assert repeated["cache_hits"] == 1
+    assert repeated["raw_tokens"] == repeated["compact_tokens"] == first["compact_tokens"]
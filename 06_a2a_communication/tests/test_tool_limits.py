@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+
+from debaters.tool_limits import ToolTimeout, limit_tool, track_tool_calls
+
+# Injected latency of the fake search backend
+SEARCH_LATENCY = 0.05
+
+
+async def fake_search(query: str) -> str:
+    await asyncio.sleep(SEARCH_LATENCY)
+    return f"results for {query}"
+
+
+def run_turn(search, queries: list[str]) -> tuple[list, list[dict], float]:
+    """Runs one model step's tool calls the way the agent frameworks do, all at once."""
+    async def main():
+        with track_tool_calls() as records:
+            started_at = time.perf_counter()
+            results = await asyncio.gather(*(search(query) for query in queries), return_exceptions=True)
+            return results, records, time.perf_counter() - started_at
+
+    return asyncio.run(main())
+
+
+QUERIES = [f"query {i}" for i in range(5)]
+
+
+def test_five_searches_take_one_search_latency():
+    search = limit_tool(max_concurrency=5, timeout=1.0)(fake_search)
+    results, records, elapsed = run_turn(search, QUERIES)
+
+    assert results == [f"results for {query}" for query in QUERIES]
+    # Serial execution would take 5 * SEARCH_LATENCY
+    assert elapsed < 2 * SEARCH_LATENCY
+    assert [record["status"] for record in records] == ["ok"] * 5
+    assert all(record["tool"] == "fake_search" for record in records)
+    assert all(record["latency_ms"] >= SEARCH_LATENCY * 1000 * 0.9 for record in records)
+    assert all(record["wait_ms"] < SEARCH_LATENCY * 1000 / 2 for record in records)
+
+
+def test_concurrency_limit_queues_the_extra_calls():
+    search = limit_tool(max_concurrency=3, timeout=1.0)(fake_search)
+    results, records, elapsed = run_turn(search, QUERIES)
+
+    assert len(results) == 5
+    # Three calls run at once, then the remaining two
+    assert 2 * SEARCH_LATENCY * 0.9 <= elapsed < 4 * SEARCH_LATENCY
+    waited = sorted(record["wait_ms"] for record in records)
+    assert all(wait < SEARCH_LATENCY * 1000 / 2 for wait in waited[:3])
+    assert all(wait >= SEARCH_LATENCY * 1000 * 0.9 for wait in waited[3:])
+
+
+def test_timeout_raises_an_error_the_framework_can_report():
+    async def slow_search(query: str) -> str:
+        if query == "slow":
+            await asyncio.sleep(10)
+        return await fake_search(query)
+
+    search = limit_tool(max_concurrency=5, timeout=SEARCH_LATENCY * 2)(slow_search)
+    results, records, elapsed = run_turn(search, ["fast", "slow"])
+
+    assert results[0] == "results for fast"
+    assert isinstance(results[1], ToolTimeout)
+    assert "slow_search" in str(results[1])
+    assert elapsed < 10
+    assert sorted(record["status"] for record in records) == ["ok", "timeout"]
+
+
+def test_errors_are_recorded_and_raised():
+    @limit_tool(max_concurrency=1, timeout=1.0)
+    async def broken_search(query: str) -> str:
+        raise RuntimeError("backend down")
+
+    async def main():
+        with track_tool_calls() as records:
+            with pytest.raises(RuntimeError):
+                await broken_search("query")
+        return records
+
+    records = asyncio.run(main())
+    assert [record["status"] for record in records] == ["error"]
+
+
+def test_calls_outside_a_turn_are_not_recorded():
+    search = limit_tool(max_concurrency=1, timeout=1.0)(fake_search)
+    assert asyncio.run(search("query")) == "results for query"